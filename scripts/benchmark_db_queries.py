@@ -0,0 +1,192 @@
+"""
+Benchmark für die Kurshistorien-Abfrage (get_historical_data_for_ticker) auf einer synthetischen
+Datenbank: ohne Indizes und PRAGMAs gegenüber dem Stand nach DatabaseMigration.tune_schema().
+Zusätzlich wird das zeilenweise Lesen (ein Dict pro Zeile) mit get_historical_panel verglichen.
+
+Standard ist ein Universum von 1000 Tickern mit je 10 Jahren Handelstagen (~2,5 Mio. Zeilen).
+
+Aufruf aus dem Projektverzeichnis:
+    python -m scripts.benchmark_db_queries --tickers 1000 --years 10 --queries 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.database.db_access import DBAccess
+from src.database.db_migration import DatabaseMigration
+
+TRADING_DAYS_PER_YEAR = 252
+
+SCHEMA = """
+    CREATE TABLE candidates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker TEXT NOT NULL UNIQUE,
+        selection_reason TEXT,
+        timestamp TEXT NOT NULL,
+        is_complete INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE historical_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        candidate_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        open REAL, high REAL, low REAL, close REAL, volume INTEGER,
+        rsi REAL, macd REAL, macd_signal REAL, macd_hist REAL,
+        ema10 REAL, ema20 REAL, ema50 REAL,
+        bollinger_upper REAL, bollinger_middle REAL, bollinger_lower REAL,
+        atr REAL, stoch_k REAL, stoch_d REAL, roc5 REAL, roc10 REAL,
+        event_data_json TEXT,
+        FOREIGN KEY (candidate_id) REFERENCES candidates(id)
+    );
+"""
+
+
+def build_database(db_path: str, tickers: int, years: int, seed: int = 0) -> int:
+    """
+    Erzeugt die synthetische Datenbank. Die Zeilen werden tageweise über alle Ticker
+    geschrieben (wie bei täglichen Updates), die Ticker liegen also verstreut in der Tabelle.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-01", periods=years * TRADING_DAYS_PER_YEAR).strftime("%Y-%m-%d")
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO candidates (id, ticker, timestamp) VALUES (?, ?, datetime('now'))",
+        [(i + 1, f"T{i:04d}") for i in range(tickers)]
+    )
+
+    close = 100 * np.ones(tickers)
+    candidate_ids = np.arange(1, tickers + 1)
+    for date in dates:
+        close = close * np.exp(rng.normal(0, 0.02, tickers))
+        indicators = rng.normal(0, 1, (tickers, 15))
+        rows = (
+            (int(candidate_ids[i]), date, close[i], close[i] * 1.01, close[i] * 0.99, close[i],
+             int(rng.integers(100_000, 5_000_000)), *indicators[i].tolist(), None)
+            for i in range(tickers)
+        )
+        conn.executemany(
+            f"INSERT INTO historical_data VALUES (NULL, {', '.join('?' * 23)})", rows
+        )
+    conn.commit()
+    row_count = conn.execute("SELECT COUNT(*) FROM historical_data").fetchone()[0]
+    conn.close()
+    return row_count
+
+
+async def time_queries(db: DBAccess, tickers: list, concurrency: int) -> dict:
+    """Misst die Latenz pro Abfrage (sequenziell) und den Durchsatz bei parallelen Abfragen."""
+    latencies = []
+    for ticker in tickers:
+        start = time.perf_counter()
+        await db.get_historical_data_for_ticker(ticker)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(ticker: str):
+        async with semaphore:
+            return await db.get_historical_data_for_ticker(ticker)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited(ticker) for ticker in tickers))
+    parallel_seconds = time.perf_counter() - start
+
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "queries_per_s": len(tickers) / parallel_seconds,
+    }
+
+
+def run_benchmark(db_path: str, tickers: list, concurrency: int, pragmas) -> dict:
+    db = DBAccess()
+    db.db_path = db_path
+    if pragmas is not None:
+        db.pragmas = pragmas
+    try:
+        return asyncio.run(time_queries(db, tickers, concurrency))
+    finally:
+        db.close()
+
+
+async def time_row_vs_panel(db: DBAccess, tickers: list) -> tuple:
+    """
+    Liest dieselben Ticker als Dict-Zeilen plus DataFrame-Aufbau (wie in ScoringEngine und
+    DataPreparation) bzw. spaltenweise mit get_historical_panel (Sekunden gesamt, warmer Cache).
+    """
+    await db.get_historical_panel(tickers)
+
+    start = time.perf_counter()
+    for ticker in tickers:
+        frame = pd.DataFrame(await db.get_historical_data_for_ticker(ticker))
+        frame["date"] = pd.to_datetime(frame["date"])
+    row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await db.get_historical_panel(tickers)
+    panel_seconds = time.perf_counter() - start
+    return row_seconds, panel_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="historical_data query benchmark")
+    parser.add_argument("--tickers", type=int, default=1000, help="Anzahl Ticker")
+    parser.add_argument("--years", type=int, default=10, help="Jahre Kurshistorie pro Ticker")
+    parser.add_argument("--queries", type=int, default=50, help="Anzahl Abfragen pro Durchlauf")
+    parser.add_argument("--concurrency", type=int, default=5, help="Parallele Abfragen")
+    parser.add_argument("--db", help="Pfad der Benchmark-Datenbank (Standard: temporäre Datei)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="daki-bench-"), "bench.db")
+    if os.path.exists(db_path):
+        raise SystemExit(f"{db_path} exists already, please choose a new path")
+
+    start = time.perf_counter()
+    rows = build_database(db_path, args.tickers, args.years)
+    print(f"Built {db_path}: {rows:,} rows in {time.perf_counter() - start:.1f} s")
+
+    rng = np.random.default_rng(1)
+    sample = [f"T{i:04d}" for i in rng.integers(0, args.tickers, args.queries)]
+
+    # Ausgangslage: keine Indizes, sqlite3-Standardeinstellungen
+    before = run_benchmark(db_path, sample, args.concurrency, pragmas={})
+
+    start = time.perf_counter()
+    created = DatabaseMigration(db_path).tune_schema()
+    print(f"tune_schema: created {created} in {time.perf_counter() - start:.1f} s")
+
+    after = run_benchmark(db_path, sample, args.concurrency, pragmas=None)
+
+    print(f"{'':22}{'p50 ms':>10}{'p95 ms':>10}{'queries/s':>12}")
+    for label, result in (("untuned", before), ("indexes + pragmas", after)):
+        print(f"{label:22}{result['p50_ms']:10.2f}{result['p95_ms']:10.2f}{result['queries_per_s']:12.1f}")
+    print(f"Speedup (p50): {before['p50_ms'] / after['p50_ms']:.1f}x")
+
+    db = DBAccess()
+    db.db_path = db_path
+    try:
+        row_s, panel_s = asyncio.run(time_row_vs_panel(db, sorted(set(sample))))
+    finally:
+        db.close()
+    print(f"Rows as dicts + DataFrame: {row_s:8.3f} s")
+    print(f"get_historical_panel:      {panel_s:8.3f} s")
+    print(f"Speedup: {row_s / panel_s:.1f}x")
+
+    if not args.db:
+        os.remove(db_path)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    main()
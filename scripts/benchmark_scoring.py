@@ -0,0 +1,101 @@
+"""
+Benchmark für die ScoringEngine: Gesamtscore pro Ticker mit und ohne gespeicherte Indikatoren
+sowie Batch-Scoring (calculate_total_scores) für ein ganzes Ticker-Universum.
+
+Aufruf aus dem Projektverzeichnis:
+    python -m scripts.benchmark_scoring --days 750 --runs 200 --tickers 500
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.backend_components.scoring_engine import ScoringEngine
+from src.technical_indicators import indicators
+
+
+def build_history(days: int, with_indicators: bool, seed: int = 0) -> list:
+    """Erzeugt eine synthetische Kurshistorie im Format von get_historical_data_for_ticker."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-01", periods=days)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    high = close * (1 + rng.uniform(0, 0.02, days))
+    low = close * (1 - rng.uniform(0, 0.02, days))
+    frame = pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d"),
+        "open": close,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": rng.integers(100_000, 5_000_000, days),
+    })
+
+    if with_indicators:
+        panel = indicators.calculate_all_indicators_panel(
+            frame[["close"]], frame[["high"]].set_axis(["close"], axis=1), frame[["low"]].set_axis(["close"], axis=1)
+        )
+        for column, values in panel.items():
+            frame[column] = values["close"]
+
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+
+async def time_scoring(engine: ScoringEngine, history: list, runs: int) -> float:
+    """Gibt die durchschnittliche Laufzeit pro Ticker in Millisekunden zurück."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        await engine.calculate_total_score("BENCH", history)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+async def time_batch_scoring(engine: ScoringEngine, days: int, tickers: int) -> tuple:
+    """Vergleicht Einzel-Scoring in einer Schleife mit einem Batch-Aufruf (Sekunden gesamt)."""
+    histories = {f"T{i:04d}": build_history(days, with_indicators=False, seed=i) for i in range(tickers)}
+    panel = pd.concat(
+        [pd.DataFrame(rows).assign(ticker=ticker) for ticker, rows in histories.items()], ignore_index=True
+    )
+
+    start = time.perf_counter()
+    for ticker, rows in histories.items():
+        await engine.calculate_total_score(ticker, rows)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await engine.calculate_total_scores(panel)
+    batch_seconds = time.perf_counter() - start
+    return loop_seconds, batch_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ScoringEngine benchmark")
+    parser.add_argument("--days", type=int, default=750, help="Anzahl Handelstage pro Ticker")
+    parser.add_argument("--runs", type=int, default=200, help="Anzahl Wiederholungen")
+    parser.add_argument("--tickers", type=int, default=500, help="Anzahl Ticker für den Batch-Vergleich")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    engine = ScoringEngine()
+
+    raw = build_history(args.days, with_indicators=False)
+    stored = build_history(args.days, with_indicators=True)
+
+    raw_ms = asyncio.run(time_scoring(engine, raw, args.runs))
+    stored_ms = asyncio.run(time_scoring(engine, stored, args.runs))
+
+    print(f"History: {args.days} days, {args.runs} runs")
+    print(f"Computed indicators (OHLCV only):   {raw_ms:8.2f} ms/ticker")
+    print(f"Stored indicators (historical_data): {stored_ms:8.2f} ms/ticker")
+    print(f"Speedup: {raw_ms / stored_ms:.2f}x")
+
+    loop_s, batch_s = asyncio.run(time_batch_scoring(engine, args.days, args.tickers))
+    print(f"Universe: {args.tickers} tickers")
+    print(f"calculate_total_score loop: {loop_s:8.2f} s")
+    print(f"calculate_total_scores:     {batch_s:8.2f} s")
+    print(f"Speedup: {loop_s / batch_s:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
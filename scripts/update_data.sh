@@ -28,17 +28,17 @@ source /opt/da-ki/app/venv/bin/activate
 # Python-Script für Datenupdate aufrufen
 cd /opt/da-ki/app
 python -c "
-import sys
-sys.path.append('src')
-from plugins.plugin_manager import PluginManager
-from services.analysis_service import AnalysisService
 import asyncio
+from src.services.ingestion_service import run_ingestion
 
 async def update_data():
     print('Aktualisiere Marktdaten...')
-    # Plugin Manager initialisieren und Daten abrufen
-    # Implementierung folgt in der nächsten Phase
-    pass
+    # Kurse aller Kandidaten über den PluginManager laden, Indikatoren berechnen und speichern.
+    # Ein abgebrochener Lauf wird beim nächsten Aufruf am selben Tag fortgesetzt.
+    summary = await run_ingestion()
+    print(f'Ingestion abgeschlossen: {summary}')
+    if summary['failed']:
+        print(f\"Warnung: {summary['failed']} Ticker ohne Daten\")
 
 asyncio.run(update_data())
 "
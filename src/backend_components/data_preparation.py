@@ -1,25 +1,77 @@
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
+import hashlib
+import json
 import logging
 import datetime
 
 logger = logging.getLogger(__name__)
 
+# Abgeleitete Features: Name -> (Quellspalte, Operation, Parameter)
+FEATURE_DEFINITIONS = {
+    # Beispiel: Lagged Features für Schlusskurse und RSI
+    "close_lag1": ("close", "lag", 1),
+    "rsi_lag1": ("rsi", "lag", 1),
+    # Beispiel: Rolling Mean für Schlusskurse
+    "close_rolling_mean5": ("close", "rolling_mean", 5),
+}
+
+# Bei Änderungen an der Berechnung erhöhen (ändert den Hash und damit die Version im Feature Store)
+FEATURE_VERSION = 1
+
+
+def feature_definition_hash() -> str:
+    """Kurzer Hash über Feature-Definitionen und -Version; identifiziert die Version gespeicherter Features."""
+    definition = json.dumps({"version": FEATURE_VERSION, "features": FEATURE_DEFINITIONS}, sort_keys=True)
+    return hashlib.sha256(definition.encode("utf-8")).hexdigest()[:16]
+
+
+def feature_warmup_rows() -> int:
+    """Anzahl vorheriger Zeilen, die für die Features einer neuen Zeile benötigt werden."""
+    return max((parameter for _, _, parameter in FEATURE_DEFINITIONS.values()), default=0)
+
+
+def compute_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fügt die abgeleiteten Features an einen nach Datum sortierten DataFrame an (in-place).
+    Zeilen ohne ausreichende Historie erhalten NaN.
+    """
+    for name, (source, operation, parameter) in FEATURE_DEFINITIONS.items():
+        if operation == "lag":
+            df[name] = df[source].shift(parameter)
+        elif operation == "rolling_mean":
+            df[name] = df[source].rolling(window=parameter).mean()
+        else:
+            raise ValueError(f"Unknown feature operation: {operation}")
+    return df
+
+
 class DataPreparation:
     """
     Bereitet Daten für Machine Learning Modelle vor, inklusive Feature Engineering.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, feature_store=None):
+        """
+        Args:
+            feature_store: Optionaler FeatureStore; berechnete Features werden dort gespeichert
+                           und bei späteren Aufrufen nur um neue Tage ergänzt.
+        """
+        self.feature_store = feature_store
+
+    @classmethod
+    def from_config(cls) -> "DataPreparation":
+        """DataPreparation mit dem Feature Store aus der Konfiguration (analysis.feature_store)."""
+        from src.backend_components.feature_store import FeatureStore
+        return cls(feature_store=FeatureStore.from_config())
 
-    async def prepare_data_for_ml(self, ticker: str, historical_raw_data: List[Dict[str, Any]], lookback_period: int = 90, forecast_period: int = 30) -> pd.DataFrame:
+    async def prepare_data_for_ml(self, ticker: str, historical_raw_data: Union[List[Dict[str, Any]], pd.DataFrame], lookback_period: int = 90, forecast_period: int = 30) -> pd.DataFrame:
         """
         Ruft historische Daten ab, führt Feature Engineering durch und berechnet die Zielvariable.
 
         Args:
             ticker: Das Tickersymbol der Aktie.
-            historical_raw_data: Liste von Dictionaries mit historischen Rohdaten, Indikatoren und Scores.
+            historical_raw_data: Liste von Dictionaries (oder DataFrame) mit historischen Rohdaten, Indikatoren und Scores.
             lookback_period: Anzahl der Tage, die für die Feature-Berechnung zurückgeschaut werden sollen.
             forecast_period: Anzahl der Tage, für die die Wertsteigerung vorhergesagt werden soll.
 
@@ -28,23 +80,19 @@ class DataPreparation:
         """
         logger.info(f"Preparing ML data for ticker: {ticker}")
 
-        if not historical_raw_data:
+        if historical_raw_data is None or len(historical_raw_data) == 0:
             logger.warning(f"No sufficient historical data found for {ticker} for ML preparation.")
             return pd.DataFrame()
 
-        df = pd.DataFrame(historical_raw_data)
+        df = historical_raw_data.copy() if isinstance(historical_raw_data, pd.DataFrame) else pd.DataFrame(historical_raw_data)
         df['date'] = pd.to_datetime(df['date'])
         df = df.sort_values(by='date').set_index('date')
 
-        # 2. Feature Engineering
-        features_df = df.copy()
-
-        # Beispiel: Lagged Features für Schlusskurse und RSI
-        features_df['close_lag1'] = features_df['close'].shift(1)
-        features_df['rsi_lag1'] = features_df['rsi'].shift(1)
-
-        # Beispiel: Rolling Mean für Schlusskurse
-        features_df['close_rolling_mean5'] = features_df['close'].rolling(window=5).mean()
+        # 2. Feature Engineering (aus dem Feature Store, falls vorhanden; dort nur numerische Spalten)
+        if self.feature_store is not None:
+            features_df = self.feature_store.update(ticker, df)
+        else:
+            features_df = compute_features(df.copy())
 
         # Integration der Scores (angenommen, sie sind bereits in historical_raw_data enthalten)
         # features_df['technical_score'] = features_df['total_technical_score']
@@ -68,5 +116,8 @@ class DataPreparation:
             "status": "OK",
             "message": "DataPreparation ready",
             "last_checked": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-            "details": {}
+            "details": {
+                "feature_version": feature_definition_hash(),
+                "feature_store": self.feature_store.get_status() if self.feature_store is not None else None
+            }
         }
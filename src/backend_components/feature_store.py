@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.backend_components.data_preparation import (
+    FEATURE_DEFINITIONS, compute_features, feature_definition_hash, feature_warmup_rows
+)
+from src.config.config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: keine Dateisperren, nur ein Prozess sollte schreiben
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../')
+
+
+class FeatureStore:
+    """
+    Speichert berechnete Feature-Matrizen pro Ticker spaltenweise auf der Festplatte.
+
+    Ablage: <base_path>/<Feature-Hash>/<TICKER>/ mit einer Binärdatei pro Spalte (float64),
+    den Datumswerten (int64, ns) und meta.json (Spalten, Zeilenzahl, letztes Datum).
+    Gelesen wird per Memory-Mapping. Neue Tage werden an die Spaltendateien angehängt, statt
+    die Matrix neu zu berechnen; ändern sich die Feature-Definitionen, entsteht ein neues
+    Verzeichnis (neuer Hash), alte Versionen werden nicht mehr gelesen.
+
+    Es werden nur numerische Spalten gespeichert. Bereits gespeicherte Tage werden nicht
+    aktualisiert; beginnt die Historie früher oder ändern sich die Spalten, wird neu berechnet.
+    """
+
+    def __init__(self, base_path: str = "data/feature_store"):
+        self.base_path = base_path if os.path.isabs(base_path) else os.path.join(PROJECT_ROOT, base_path)
+        self.definition_hash = feature_definition_hash()
+        self.path = os.path.join(self.base_path, self.definition_hash)
+        self.stats = {"hits": 0, "appends": 0, "rebuilds": 0}
+
+    @classmethod
+    def from_config(cls) -> Optional["FeatureStore"]:
+        """FeatureStore aus analysis.feature_store (None, falls deaktiviert)."""
+        config = Config.get("analysis", {}).get("feature_store", {})
+        if not config.get("enabled", True):
+            return None
+        return cls(config.get("path", "data/feature_store"))
+
+    def _ticker_path(self, ticker: str) -> str:
+        # Ticker wie BRK.B oder ^GSPC als Verzeichnisname absichern
+        return os.path.join(self.path, re.sub(r"[^A-Za-z0-9._-]", "_", ticker.upper()))
+
+    def _read_meta(self, ticker: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._ticker_path(ticker), "meta.json"), encoding="utf-8") as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, ticker: str, meta: Dict[str, Any]) -> None:
+        # Atomar ersetzen: meta.json bestimmt die gültige Zeilenzahl
+        path = os.path.join(self._ticker_path(ticker), "meta.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(path + ".tmp", path)
+
+    @contextmanager
+    def _lock(self, ticker: str):
+        """Exklusive Sperre für Schreibzugriffe auf einen Ticker (auch zwischen Prozessen)."""
+        ticker_path = self._ticker_path(ticker)
+        os.makedirs(ticker_path, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(ticker_path, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _column_file(index: int) -> str:
+        return f"col_{index:04d}.f64"
+
+    def load(self, ticker: str) -> Optional[pd.DataFrame]:
+        """
+        Liest die gespeicherten Features eines Tickers (Memory-Mapping, Index: date).
+        Zeilen ohne ausreichende Historie enthalten NaN. None, falls nichts gespeichert ist.
+        """
+        meta = self._read_meta(ticker)
+        if meta is None:
+            return None
+        ticker_path = self._ticker_path(ticker)
+        rows = meta["rows"]
+        if rows == 0:
+            return pd.DataFrame(columns=meta["columns"], index=pd.DatetimeIndex([], name="date"), dtype=np.float64)
+        dates = np.memmap(os.path.join(ticker_path, "dates.i8"), dtype=np.int64, mode="r", shape=(rows,))
+        data = {
+            column: np.memmap(os.path.join(ticker_path, self._column_file(i)), dtype=np.float64, mode="r", shape=(rows,))
+            for i, column in enumerate(meta["columns"])
+        }
+        index = pd.DatetimeIndex(np.asarray(dates).view("datetime64[ns]"), name="date")
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def update(self, ticker: str, raw_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Bringt die gespeicherten Features auf den Stand der Rohdaten und gibt sie zurück.
+
+        Args:
+            ticker: Tickersymbol
+            raw_df: Rohdaten mit Datumsindex, aufsteigend sortiert
+
+        Returns:
+            Rohspalten und abgeleitete Features (ohne Zielvariable) für den Zeitraum von raw_df;
+            frühere oder spätere gespeicherte Tage werden nicht zurückgegeben
+        """
+        raw = raw_df.select_dtypes(include="number").astype(np.float64)
+        raw.index = pd.DatetimeIndex(raw.index).as_unit("ns")
+        source_columns = list(raw.columns)
+        missing = sorted({source for source, _, _ in FEATURE_DEFINITIONS.values()} - set(source_columns))
+        if missing:
+            raise KeyError(f"Missing source columns for features: {missing}")
+
+        with self._lock(ticker):
+            meta = self._read_meta(ticker)
+            if (
+                meta is not None and meta["rows"] > 0
+                and meta["source_columns"] == source_columns
+                and raw.index[0] >= pd.Timestamp(meta["first_date"])
+            ):
+                new_rows = raw[raw.index > pd.Timestamp(meta["last_date"])]
+                if new_rows.empty:
+                    self.stats["hits"] += 1
+                    return self.load(ticker).loc[raw.index[0]:raw.index[-1]]
+                # Nur die neuen Tage berechnen, mit den letzten gespeicherten Rohwerten als Vorlauf
+                warmup = feature_warmup_rows()
+                stored = self.load(ticker)
+                history = stored[source_columns].iloc[max(0, len(stored) - warmup):] if warmup else stored.iloc[:0][source_columns]
+                combined = pd.concat([history, new_rows])
+                features = compute_features(combined).iloc[len(history):]
+                self._append(ticker, meta, features)
+                self.stats["appends"] += 1
+            else:
+                self._rebuild(ticker, compute_features(raw.copy()), source_columns)
+                self.stats["rebuilds"] += 1
+
+        return self.load(ticker).loc[raw.index[0]:raw.index[-1]]
+
+    def _rebuild(self, ticker: str, features: pd.DataFrame, source_columns: List[str]) -> None:
+        meta = {
+            "ticker": ticker.upper(),
+            "definition_hash": self.definition_hash,
+            "source_columns": source_columns,
+            "columns": list(features.columns),
+            "rows": 0,
+        }
+        self._write_meta(ticker, meta)
+        ticker_path = self._ticker_path(ticker)
+        for filename in os.listdir(ticker_path):
+            if filename.endswith((".f64", ".i8")):
+                # Löschen statt kürzen: bestehende Memory-Mappings anderer Leser bleiben gültig
+                os.remove(os.path.join(ticker_path, filename))
+        for filename in ["dates.i8"] + [self._column_file(i) for i in range(len(meta["columns"]))]:
+            open(os.path.join(ticker_path, filename), "wb").close()
+        self._append(ticker, meta, features)
+
+    def _append(self, ticker: str, meta: Dict[str, Any], features: pd.DataFrame) -> None:
+        ticker_path = self._ticker_path(ticker)
+        rows = meta["rows"]
+        arrays = [("dates.i8", features.index.values.astype("datetime64[ns]").view(np.int64), 8)]
+        arrays += [
+            (self._column_file(i), features[column].to_numpy(dtype=np.float64), 8)
+            for i, column in enumerate(meta["columns"])
+        ]
+        for filename, values, itemsize in arrays:
+            with open(os.path.join(ticker_path, filename), "r+b") as column_file:
+                # Reste eines abgebrochenen Schreibvorgangs hinter der gültigen Zeilenzahl verwerfen
+                column_file.truncate(rows * itemsize)
+                column_file.seek(rows * itemsize)
+                column_file.write(np.ascontiguousarray(values).tobytes())
+
+        if rows == 0:
+            meta["first_date"] = features.index[0].isoformat()
+        meta["rows"] = rows + len(features)
+        meta["last_date"] = features.index[-1].isoformat()
+        self._write_meta(ticker, meta)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"path": self.path, "definition_hash": self.definition_hash, **self.stats}
@@ -1,26 +1,46 @@
+import numpy as np
 import pandas as pd
 import xgboost as xgb # Oder lightgbm
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import json
 import logging
-import joblib # Für Modell-Speicherung
+import joblib # Nur noch zum Lesen alter Modelle
 import os
 import datetime
 
 # Annahme: DataPreparation Klasse ist verfügbar
-from src.backend_components.data_preparation import DataPreparation
+from src.backend_components.data_preparation import DataPreparation, feature_definition_hash
+from src.config.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Version des Artefakt-Formats (Booster + Schema-Datei)
+MODEL_ARTIFACT_VERSION = 1
+
 class MLPredictor:
     """
     Verwaltet das Training, Speichern und die Vorhersage mit Machine Learning Modellen.
     """
 
-    def __init__(self, model_path: str = "data/models/xgboost_model.joblib"):
+    def __init__(self, model_path: str = "data/models/xgboost_model.ubj"):
+        """
+        Args:
+            model_path: Pfad des Boosters im nativen XGBoost-Format (.ubj oder .json). Daneben liegt
+                        das Schema (<name>.schema.json); ein altes joblib-Modell (<name>.joblib)
+                        wird gelesen, falls noch kein Artefakt existiert.
+        """
         self.model = None
+        self.schema: Optional[Dict[str, Any]] = None
+        self.last_training: Optional[Dict[str, Any]] = None
         self.model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../', model_path)
+        base_path, extension = os.path.splitext(self.model_path)
+        if extension == ".joblib":
+            # Alter Pfad: neue Artefakte daneben im UBJ-Format ablegen
+            self.model_path = base_path + ".ubj"
+        self.schema_path = base_path + ".schema.json"
+        self.legacy_model_path = base_path + ".joblib"
         self.data_preparer = DataPreparation() # Instanz der Datenvorbereitung
-        self.load_model() # Versuche, das Modell beim Start zu laden
+        # Das Modell wird erst bei der ersten Vorhersage bzw. in warm_up() geladen
 
     async def train_model(self, all_historical_data: List[Dict[str, Any]]):
         """
@@ -65,41 +85,198 @@ class MLPredictor:
             logger.warning("No data available for ML model training after preparation.")
             return
 
+        self._fit(X_train, y_train)
+
+    async def train_from_database(self, tickers: Optional[List[str]] = None, dataset_builder=None, incremental: Optional[bool] = None):
+        """
+        Trainiert das ML-Modell über viele Ticker: Die Features werden pro Ticker mit der
+        DataPreparation erzeugt (TrainingDatasetBuilder) und zeitbasiert in Training und
+        Validierung aufgeteilt.
+        Args:
+            tickers: Ticker für das Training (Standard: alle Ticker der candidates-Tabelle).
+            dataset_builder: Optionaler TrainingDatasetBuilder (Standard: aus der Konfiguration).
+            incremental: Vorhandenes Modell fortsetzen, wenn seit dem letzten Training nur neue Tage
+                         hinzugekommen sind (Standard: analysis.training.incremental).
+        """
+        from src.backend_components.training_dataset import TrainingDatasetBuilder
+
+        training_config = Config.get("analysis", {}).get("training", {})
+        builder = dataset_builder or TrainingDatasetBuilder()
+        dataset = await builder.build(tickers)
+        if len(dataset) == 0:
+            logger.warning("No data available for ML model training after preparation.")
+            return
+
+        data_end_date = str(np.datetime_as_string(dataset.dates.max(), unit="D"))
+        warm_start = False
+        if incremental if incremental is not None else training_config.get("incremental", True):
+            if self.model is None:
+                self.load_model()
+            if self._can_continue(dataset.feature_names, builder.forecast_period, data_end_date):
+                if self.schema["data_end_date"] == data_end_date:
+                    logger.info(f"ML model is already trained up to {data_end_date}.")
+                    return
+                warm_start = True
+
+        validation_fraction = training_config.get("validation_fraction", 0.2)
+        X_train, y_train, X_val, y_val = dataset.split(validation_fraction, gap=builder.forecast_period)
+        if len(y_train) == 0:
+            logger.warning("Not enough history for a time-based training split.")
+            return
+
+        logger.info(f"Training on {len(y_train)} rows, validating on {len(y_val)} rows (warm_start={warm_start})")
+        self._fit(
+            pd.DataFrame(X_train, columns=dataset.feature_names, copy=False), y_train,
+            pd.DataFrame(X_val, columns=dataset.feature_names, copy=False) if len(y_val) else None, y_val,
+            forecast_period=builder.forecast_period, data_end_date=data_end_date, warm_start=warm_start
+        )
+
+    def _can_continue(self, feature_names: List[str], forecast_period: int, data_end_date: str) -> bool:
+        """Prüft, ob das vorhandene Modell mit denselben Features trainiert wurde und nur neue Tage fehlen."""
+        schema = self.schema or {}
+        return (
+            self.model is not None
+            and schema.get("feature_names") == list(feature_names)
+            and schema.get("feature_version") == feature_definition_hash()
+            and schema.get("forecast_period") == forecast_period
+            and schema.get("data_end_date") is not None
+            and schema["data_end_date"] <= data_end_date
+        )
+
+    def _fit(
+        self,
+        X_train: pd.DataFrame,
+        y_train,
+        X_val: Optional[pd.DataFrame] = None,
+        y_val=None,
+        forecast_period: int = 30,
+        data_end_date: Optional[str] = None,
+        warm_start: bool = False
+    ):
+        """
+        Initialisiert und trainiert das Modell und speichert es.
+
+        Mit Validierungsdaten wird nach early_stopping_rounds Runden ohne Verbesserung abgebrochen
+        und nur der beste Stand behalten. Mit warm_start wird der vorhandene Booster um höchstens
+        incremental_rounds Runden fortgesetzt, statt neu zu trainieren.
+        """
+        training_config = Config.get("analysis", {}).get("training", {})
+        previous_booster = self._booster() if warm_start and self.model is not None else None
+        previous_rounds = previous_booster.num_boosted_rounds() if previous_booster is not None else 0
+
         # 2. Modell initialisieren und trainieren
         self.model = xgb.XGBRegressor(
-            n_estimators=1000,
+            n_estimators=training_config.get("incremental_rounds", 50) if previous_booster is not None
+            else training_config.get("n_estimators", 1000),
             max_depth=6,
-            learning_rate=0.01,
+            learning_rate=training_config.get("learning_rate", 0.01),
             subsample=0.8,
             colsample_bytree=0.8,
             objective='reg:squarederror',
+            tree_method=training_config.get("tree_method", "hist"),
+            early_stopping_rounds=training_config.get("early_stopping_rounds", 50) if X_val is not None else None,
             n_jobs=-1 # Nutze alle verfügbaren Kerne
         )
 
-        self.model.fit(X_train, y_train)
-        logger.info("ML model training completed.")
+        if X_val is not None:
+            self.model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False, xgb_model=previous_booster)
+            best_iteration, best_score = self.model.best_iteration, self.model.best_score
+            # Nur die Bäume bis zur besten Iteration behalten
+            self.model = self.model.get_booster()[:best_iteration + 1]
+            logger.info(f"ML model training completed. Validation RMSE: {best_score:.6f} (best iteration {best_iteration})")
+        else:
+            self.model.fit(X_train, y_train, xgb_model=previous_booster)
+            logger.info("ML model training completed.")
+
+        rounds = self._booster().num_boosted_rounds()
+        self.last_training = {
+            "mode": "incremental" if previous_booster is not None else "full",
+            "new_rounds": rounds - previous_rounds,
+            "total_rounds": rounds,
+            "train_rows": len(X_train),
+            "validation_rows": len(X_val) if X_val is not None else 0,
+        }
+
+        self.schema = {
+            "artifact_version": MODEL_ARTIFACT_VERSION,
+            "feature_names": [str(name) for name in X_train.columns],
+            "feature_dtypes": ["float32"] * len(X_train.columns),
+            "feature_version": feature_definition_hash(),
+            "forecast_period": forecast_period,
+            "data_end_date": data_end_date,
+            "xgboost_version": xgb.__version__,
+            "trained_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
 
         # 3. Modell speichern
         self._save_model()
 
+    def _booster(self) -> xgb.Booster:
+        """Booster des Modells (geladene Artefakte sind Booster, frisch trainierte Modelle XGBRegressor)."""
+        return self.model.get_booster() if hasattr(self.model, "get_booster") else self.model
+
     def _save_model(self):
-        """Speichert das trainierte Modell auf der Festplatte."""
+        """Speichert Booster (natives XGBoost-Format) und Feature-Schema auf der Festplatte."""
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
         if self.model:
-            joblib.dump(self.model, self.model_path)
+            # Erst in temporäre Dateien schreiben, dann ersetzen: Leser sehen nie halbe Artefakte
+            extension = os.path.splitext(self.model_path)[1]
+            self._booster().save_model(self.model_path + ".tmp" + extension)
+            with open(self.schema_path + ".tmp", "w", encoding="utf-8") as schema_file:
+                json.dump(self.schema, schema_file, indent=2)
+            os.replace(self.model_path + ".tmp" + extension, self.model_path)
+            os.replace(self.schema_path + ".tmp", self.schema_path)
             logger.info(f"ML model saved to {self.model_path}")
         else:
             logger.warning("No model to save. Train the model first.")
 
     def load_model(self):
-        """Lädt ein trainiertes Modell von der Festplatte."""
+        """Lädt ein trainiertes Modell (Booster und Schema) von der Festplatte."""
         if os.path.exists(self.model_path):
-            self.model = joblib.load(self.model_path)
+            try:
+                with open(self.schema_path, encoding="utf-8") as schema_file:
+                    schema = json.load(schema_file)
+            except (OSError, ValueError) as e:
+                logger.error(f"ML model schema missing or unreadable at {self.schema_path}: {str(e)}")
+                self.model = None
+                return
+            if schema.get("feature_version") != feature_definition_hash():
+                # Features wurden seit dem Training anders definiert: Modell muss neu trainiert werden
+                logger.error(
+                    f"ML model at {self.model_path} was trained with feature version {schema.get('feature_version')}, "
+                    f"current version is {feature_definition_hash()}. Model needs to be retrained."
+                )
+                self.model = None
+                return
+            booster = xgb.Booster()
+            booster.load_model(self.model_path)
+            self.model, self.schema = booster, schema
             logger.info(f"ML model loaded from {self.model_path}")
+        elif os.path.exists(self.legacy_model_path):
+            self.model = joblib.load(self.legacy_model_path)
+            names = getattr(self.model, "feature_names_in_", None)
+            self.schema = {"feature_names": list(names)} if names is not None else None
+            logger.warning(f"Legacy ML model loaded from {self.legacy_model_path}; retrain to store the feature schema.")
         else:
             logger.warning(f"No model found at {self.model_path}. Model needs to be trained.")
             self.model = None
 
+    def warm_up(self) -> bool:
+        """
+        Lädt das Modell und führt eine Probevorhersage aus, damit die erste echte Anfrage
+        nicht die Lade- und Initialisierungszeit von XGBoost trägt.
+        Returns:
+            True, falls ein Modell geladen ist.
+        """
+        if self.model is None:
+            self.load_model()
+        if self.model is None:
+            return False
+        feature_names = self._model_feature_names() or []
+        self._booster().inplace_predict(np.zeros((1, len(feature_names)), dtype=np.float32))
+        logger.info("ML model warmed up.")
+        return True
+
     async def predict(self, ticker: str, historical_raw_data: List[Dict[str, Any]]) -> float:
         """
         Macht eine Vorhersage für die 30-Tage Wertsteigerung einer Aktie.
@@ -109,39 +286,77 @@ class MLPredictor:
         Returns:
             Die vorhergesagte 30-Tage Wertsteigerung.
         """
-        if self.model is None:
-            self.load_model() # Versuche, das Modell zu laden, falls noch nicht geschehen
-            if self.model is None:
-                logger.error("ML model not loaded or trained. Cannot make prediction.")
-                return 0.0 # Oder raise Exception
-
         logger.info(f"Making ML prediction for ticker: {ticker}")
 
         # 1. Daten für die Vorhersage vorbereiten (nur die neuesten Daten)
         prediction_data_df = await self.data_preparer.prepare_data_for_ml(ticker, historical_raw_data, forecast_period=0) # forecast_period=0, da wir keine zukünftigen Targets haben
-
-        if prediction_data_df.empty:
+        feature_row = self.latest_feature_row(prediction_data_df)
+        if feature_row is None:
             logger.warning(f"No sufficient data to make prediction for {ticker}.")
             return 0.0
 
-        # WICHTIG: Nur die Features für die Vorhersage verwenden, nicht das Target
-        # Sicherstellen, dass die Spaltenreihenfolge und -namen mit dem Training übereinstimmen
-        # Dies ist ein häufiger Fallstrick. Man sollte die Feature-Namen vom Training speichern.
-        X_predict = prediction_data_df.drop(columns=['target'], errors='ignore').iloc[-1:].copy()
-
-        prediction = self.model.predict(X_predict)[0]
+        prediction = (await self.predict_many({ticker: feature_row})).get(ticker, 0.0)
         logger.info(f"ML prediction for {ticker}: {prediction}")
         return prediction
 
+    @staticmethod
+    def latest_feature_row(prepared_data: pd.DataFrame) -> Optional[Dict[str, float]]:
+        """Features des jüngsten Tages aus vorbereiteten Daten (ohne Target); None ohne Daten."""
+        if prepared_data is None or prepared_data.empty:
+            return None
+        return prepared_data.drop(columns=['target'], errors='ignore').iloc[-1].to_dict()
+
+    def _model_feature_names(self) -> Optional[List[str]]:
+        """Feature-Namen in der Reihenfolge des Trainings (aus dem Schema bzw. dem Booster)."""
+        if self.schema and self.schema.get("feature_names"):
+            return list(self.schema["feature_names"])
+        feature_names = self._booster().feature_names
+        return list(feature_names) if feature_names is not None else None
+
+    async def predict_many(self, feature_rows: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+        """
+        Vorhersagen für viele Ticker mit einem einzigen Modellaufruf.
+        Args:
+            feature_rows: Ticker -> Features des jüngsten Tages (siehe latest_feature_row).
+        Returns:
+            Ticker -> vorhergesagte 30-Tage Wertsteigerung (leer, falls kein Modell verfügbar ist).
+        """
+        if not feature_rows:
+            return {}
+        if self.model is None:
+            self.load_model() # Versuche, das Modell zu laden, falls noch nicht geschehen
+            if self.model is None:
+                logger.error("ML model not loaded or trained. Cannot make prediction.")
+                return {}
+
+        tickers = list(feature_rows)
+        X_predict = pd.DataFrame.from_records([feature_rows[ticker] for ticker in tickers], index=tickers)
+        # Spalten nach Namen an die Trainingsreihenfolge anpassen (fehlende Features werden NaN)
+        feature_names = self._model_feature_names()
+        if feature_names is not None:
+            X_predict = X_predict.reindex(columns=feature_names)
+
+        predictions = self._booster().inplace_predict(X_predict.to_numpy(dtype=np.float32))
+        logger.info(f"ML predictions for {len(tickers)} tickers in one model call")
+        return {ticker: float(prediction) for ticker, prediction in zip(tickers, predictions)}
+
     async def get_status(self) -> Dict[str, Any]:
         """
         Gibt den aktuellen Status des MLPredictor zurück.
         """
         status = "OK"
         message = "MLPredictor ready"
-        details = {"model_loaded": self.model is not None}
+        details = {
+            "model_loaded": self.model is not None,
+            "model_available": os.path.exists(self.model_path) or os.path.exists(self.legacy_model_path),
+            "feature_version": (self.schema or {}).get("feature_version"),
+            "trained_at": (self.schema or {}).get("trained_at"),
+            "last_training": self.last_training,
+        }
 
-        if self.model is None:
+        if self.model is None and details["model_available"]:
+            message = "MLPredictor ready (model is loaded on first prediction)"
+        elif self.model is None:
             status = "WARNING"
             message = "ML model not loaded."
 
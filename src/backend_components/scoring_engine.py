@@ -1,5 +1,5 @@
 import pandas as pd
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Union
 import logging
 import numpy as np
 import datetime
@@ -37,13 +37,14 @@ class ScoringEngine:
                 "events": 0.10
             }
 
-    async def calculate_total_score(self, ticker: str, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def calculate_total_score(self, ticker: str, historical_data: Union[List[Dict[str, Any]], pd.DataFrame]) -> Dict[str, Any]:
         """
         Berechnet den gesamten technischen Score für einen gegebenen Ticker.
 
         Args:
             ticker: Das Tickersymbol der Aktie.
-            historical_data: Liste von Dictionaries mit historischen Kursdaten.
+            historical_data: Liste von Dictionaries mit historischen Kursdaten oder ein DataFrame
+                             (z.B. aus DBAccess.get_historical_panel).
                              Muss 'date', 'open', 'high', 'low', 'close', 'volume' enthalten.
                              Sollte auch bereits berechnete Indikatoren enthalten, falls verfügbar.
 
@@ -53,12 +54,12 @@ class ScoringEngine:
         """
         logger.info(f"Calculating technical score for ticker: {ticker}")
 
-        if not historical_data:
+        if historical_data is None or len(historical_data) == 0:
             logger.warning(f"No historical data provided for {ticker}. Cannot calculate score.")
             return self._create_empty_score_output()
 
         # Konvertiere Daten in Pandas DataFrame für einfache Berechnung
-        df = pd.DataFrame(historical_data)
+        df = historical_data.copy() if isinstance(historical_data, pd.DataFrame) else pd.DataFrame(historical_data)
         df['date'] = pd.to_datetime(df['date'])
         df = df.sort_values(by='date').set_index('date')
         
@@ -67,7 +68,10 @@ class ScoringEngine:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce')
 
-        # Individuelle Indikator-Scores berechnen
+        # Gespeicherte Indikatoren übernehmen, fehlende einmalig berechnen
+        df = self._prepare_indicator_frame(df)
+
+        # Individuelle Indikator-Scores berechnen (alle lesen aus demselben Frame)
         individual_scores = {
             "rsi": self._calculate_rsi_score(df),
             "macd": self._calculate_macd_score(df),
@@ -97,6 +101,382 @@ class ScoringEngine:
         logger.info(f"Finished calculating score for {ticker}: {output['total_score']}")
         return output
 
+    async def calculate_total_scores(self, panel: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """
+        Berechnet den technischen Score für viele Ticker in einem Durchlauf.
+
+        Die Kurse werden je Ticker rechtsbündig (letzter Balken in der letzten Zeile) in
+        Panels (Position × Ticker) übertragen. Indikatoren und Sub-Scores werden anschließend
+        als vektorisierte Spaltenoperationen über alle Ticker ausgewertet. Das Ergebnis
+        entspricht calculate_total_score für jeden einzelnen Ticker.
+
+        Args:
+            panel: Long-Format DataFrame mit einer Zeile pro Ticker und Datum.
+                   Muss 'ticker', 'date', 'open', 'high', 'low', 'close', 'volume' enthalten.
+                   Kann bereits berechnete Indikatorspalten aus historical_data enthalten.
+
+        Returns:
+            Ein Dictionary {Ticker: Score-Ausgabe wie bei calculate_total_score}.
+        """
+        if panel is None or panel.empty:
+            logger.warning("No historical data provided for batch scoring.")
+            return {}
+
+        tickers, lengths, panels = self._build_aligned_panels(panel)
+        logger.info(f"Calculating technical scores for {len(tickers)} tickers")
+
+        panels = self._prepare_indicator_panels(panels)
+
+        score_arrays = {
+            "rsi": self._rsi_scores(panels, lengths),
+            "macd": self._macd_scores(panels, lengths),
+            "ma": self._ma_scores(panels, lengths),
+            "bollinger": self._bollinger_scores(panels, lengths),
+            "volume": self._volume_scores(panels, lengths),
+            "volatility": self._volatility_scores(panels, lengths),
+            "momentum": self._momentum_scores(panels, lengths),
+        }
+
+        results = {}
+        for i, ticker in enumerate(tickers):
+            individual_scores = {name: int(scores[i]) for name, scores in score_arrays.items()}
+            individual_scores["events"] = 0 # Event-Scoring wird in Phase 2, Aufgabe 2 behandelt
+
+            total_score = self._normalize_total_score(individual_scores)
+            results[ticker] = {
+                "total_score": total_score,
+                "individual_scores": individual_scores,
+                "signal_strength": self._derive_signal_strength(total_score),
+                "recommendation": self._derive_recommendation(total_score),
+                "score_percentage": self._calculate_score_percentage(total_score)
+            }
+
+        logger.info(f"Finished calculating scores for {len(results)} tickers")
+        return results
+
+    # --- Batch-Scoring: Panel-Aufbau ---
+
+    def _build_aligned_panels(self, panel: pd.DataFrame) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Überträgt ein Long-Format in rechtsbündige Panels (Position × Ticker).
+        Kürzere Historien werden am Anfang mit NaN aufgefüllt.
+        """
+        df = panel.copy()
+        df['date'] = pd.to_datetime(df['date'])
+        df = df.sort_values(by=['ticker', 'date'], kind='mergesort')
+
+        codes, tickers = pd.factorize(df['ticker'], sort=False)
+        lengths = np.bincount(codes, minlength=len(tickers))
+        # Mindestens zwei Zeilen, damit aktuelle und vorherige Werte immer adressierbar sind
+        max_length = max(int(lengths.max()), 2)
+
+        # Position vom Ende der jeweiligen Historie -> Zeile im Panel
+        position_from_end = df.groupby(codes, sort=False).cumcount(ascending=False).to_numpy()
+        rows = max_length - 1 - position_from_end
+
+        value_columns = ['open', 'high', 'low', 'close', 'volume'] + [
+            c for cols in self.INDICATOR_GROUPS.values() for c in cols
+        ]
+        panels = {}
+        for col in value_columns:
+            if col not in df.columns:
+                continue
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            matrix = np.full((max_length, len(tickers)), np.nan)
+            matrix[rows, codes] = values
+            panels[col] = matrix
+
+        return [str(t) for t in tickers], lengths, panels
+
+    def _prepare_indicator_panels(self, panels: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Panel-Variante von _prepare_indicator_frame: gespeicherte Spalten je Ticker übernehmen,
+        fehlende Gruppen einmal für alle Ticker berechnen.
+        """
+        close = pd.DataFrame(panels['close'])
+        has_high_low = 'high' in panels and 'low' in panels
+        high = pd.DataFrame(panels['high']) if has_high_low else None
+        low = pd.DataFrame(panels['low']) if has_high_low else None
+
+        n_tickers = close.shape[1]
+        stored_ok = {
+            col: self._stored_indicator_mask(panels[col]) if col in panels else np.zeros(n_tickers, dtype=bool)
+            for cols in self.INDICATOR_GROUPS.values() for col in cols
+        }
+
+        for group, columns in self.INDICATOR_GROUPS.items():
+            # Eine Gruppe gilt pro Ticker nur dann als gespeichert, wenn alle ihre Spalten vollständig sind
+            group_ok = np.logical_and.reduce([stored_ok[col] for col in columns])
+            if group_ok.all():
+                continue
+
+            if group == "rsi":
+                computed = {'rsi': indicators.calculate_rsi_panel(close, period=14)}
+            elif group == "macd":
+                macd = indicators.calculate_macd_panel(close)
+                computed = {'macd': macd['MACD'], 'macd_signal': macd['Signal'], 'macd_hist': macd['Histogram']}
+            elif group == "ema":
+                computed = {f'ema{period}': indicators.calculate_ema_panel(close, period) for period in (10, 20, 50)}
+            elif group == "bollinger":
+                bb = indicators.calculate_bollinger_bands_panel(close)
+                computed = {'bollinger_upper': bb['Upper'], 'bollinger_middle': bb['Middle'], 'bollinger_lower': bb['Lower']}
+            elif group == "atr" and has_high_low:
+                computed = {'atr': indicators.calculate_atr_panel(high, low, close)}
+            elif group == "stochastic" and has_high_low:
+                stoch = indicators.calculate_stochastic_oscillator_panel(high, low, close)
+                computed = {'stoch_k': stoch['K'], 'stoch_d': stoch['D']}
+            elif group == "roc":
+                computed = {'roc5': indicators.calculate_roc_panel(close, 5), 'roc10': indicators.calculate_roc_panel(close, 10)}
+            else:
+                continue
+
+            for col, values in computed.items():
+                values = values.to_numpy()
+                panels[col] = np.where(group_ok, panels[col], values) if col in panels else values
+
+        return panels
+
+    # --- Batch-Scoring: vektorisierte Sub-Scores (Logik wie die Einzel-Scorer) ---
+
+    @staticmethod
+    def _all_nan(matrix: np.ndarray) -> np.ndarray:
+        return np.isnan(matrix).all(axis=0)
+
+    def _rsi_scores(self, panels: Dict[str, np.ndarray], lengths: np.ndarray) -> np.ndarray:
+        rsi = panels['rsi']
+        current, previous = rsi[-1], rsi[-2]
+        rsi_ma14 = pd.DataFrame(rsi).rolling(window=14).mean().to_numpy()[-1]
+
+        with np.errstate(invalid='ignore'):
+            score = np.select([current < 20, current < 30, current > 80, current > 70], [3, 2, -3, -2], 0)
+            # Momentum-Wendepunkte
+            score += 2 * ((previous < 30) & (current >= 30)) - 2 * ((previous > 70) & (current <= 70))
+            # 50-Linie Kreuzungen
+            score += ((previous < 50) & (current >= 50)).astype(int) - ((previous > 50) & (current <= 50))
+            # Trend-Analyse
+            score += np.select([current > rsi_ma14, current < rsi_ma14], [1, -1], 0)
+
+        score = np.clip(score, -3, 3)
+        return np.where((lengths < 30) | self._all_nan(rsi), 0, score)
+
+    def _macd_scores(self, panels: Dict[str, np.ndarray], lengths: np.ndarray) -> np.ndarray:
+        macd, signal, hist = panels['macd'], panels['macd_signal'], panels['macd_hist']
+        current_macd, current_signal, current_hist = macd[-1], signal[-1], hist[-1]
+        previous_macd, previous_signal, previous_hist = macd[-2], signal[-2], hist[-2]
+
+        with np.errstate(invalid='ignore'):
+            # Signal Line Kreuzungen
+            bullish = (previous_macd < previous_signal) & (current_macd >= current_signal)
+            bearish = ~bullish & (previous_macd > previous_signal) & (current_macd <= current_signal)
+            score = np.select(
+                [bullish & (current_macd < 0), bullish, bearish & (current_macd > 0), bearish],
+                [3, 2, -3, -2], 0
+            )
+            # Nulllinie Kreuzungen
+            score += np.select(
+                [(previous_macd < 0) & (current_macd >= 0), (previous_macd > 0) & (current_macd <= 0)], [2, -2], 0
+            )
+            # Histogram Momentum
+            score += np.select([current_hist > previous_hist, current_hist < previous_hist], [1, -1], 0)
+
+        score = np.clip(score, -3, 3)
+        return np.where((lengths < 30) | self._all_nan(macd), 0, score)
+
+    def _ma_scores(self, panels: Dict[str, np.ndarray], lengths: np.ndarray) -> np.ndarray:
+        ema10, ema20, ema50 = panels['ema10'], panels['ema20'], panels['ema50']
+        price = panels['close'][-1]
+        current_ema10, current_ema20, current_ema50 = ema10[-1], ema20[-1], ema50[-1]
+        previous_ema10, previous_ema20 = ema10[-2], ema20[-2]
+
+        with np.errstate(invalid='ignore'):
+            # Preis-Position Bewertung
+            score = np.select(
+                [
+                    (price > current_ema10) & (current_ema10 > current_ema20) & (current_ema20 > current_ema50),
+                    (price < current_ema10) & (current_ema10 < current_ema20) & (current_ema20 < current_ema50),
+                    (price > current_ema10) & (current_ema10 > current_ema20),
+                    (price < current_ema10) & (current_ema10 < current_ema20),
+                    price > current_ema10,
+                    price < current_ema10,
+                ],
+                [3, -3, 2, -2, 1, -1], 0
+            )
+            # Golden/Death Cross
+            score += np.select(
+                [
+                    (previous_ema10 < previous_ema20) & (current_ema10 >= current_ema20),
+                    (previous_ema10 > previous_ema20) & (current_ema10 <= current_ema20),
+                ],
+                [2, -2], 0
+            )
+            # EMA-Steigung
+            score += np.select([current_ema10 > previous_ema10, current_ema10 < previous_ema10], [1, -1], 0)
+
+        score = np.clip(score, -3, 3)
+        invalid = self._all_nan(ema10) | self._all_nan(ema20) | self._all_nan(ema50)
+        return np.where((lengths < 50) | invalid, 0, score)
+
+    def _bollinger_scores(self, panels: Dict[str, np.ndarray], lengths: np.ndarray) -> np.ndarray:
+        upper, middle, lower = panels['bollinger_upper'][-1], panels['bollinger_middle'][-1], panels['bollinger_lower'][-1]
+        price, previous_price = panels['close'][-1], panels['close'][-2]
+
+        with np.errstate(invalid='ignore'):
+            # Band-Position
+            band_range = upper - lower
+            lower_10_percent = lower + band_range * 0.1
+            upper_10_percent = upper - band_range * 0.1
+            in_range = band_range > 0
+            score = np.select(
+                [in_range & (price < lower_10_percent), in_range & (price > upper_10_percent)], [2, -2], 0
+            )
+            # Band-Durchbrüche
+            score += np.select([price < lower, price > upper], [-3, 3], 0)
+            # Mittellinie-Kreuzungen
+            score += np.select(
+                [
+                    (previous_price < middle) & (price >= middle),
+                    (previous_price > middle) & (price <= middle),
+                ],
+                [1, -1], 0
+            )
+
+        score = np.clip(score, -3, 3)
+        return np.where((lengths < 20) | self._all_nan(panels['bollinger_middle']), 0, score)
+
+    def _volume_scores(self, panels: Dict[str, np.ndarray], lengths: np.ndarray) -> np.ndarray:
+        volume, close = panels['volume'], panels['close']
+        current_volume, previous_volume = volume[-1], volume[-2]
+        current_price, previous_price = close[-1], close[-2]
+
+        with np.errstate(invalid='ignore'):
+            # Volume-Bestätigung
+            high_volume = current_volume > previous_volume * 1.5
+            score = np.select(
+                [(current_price > previous_price) & high_volume, (current_price < previous_price) & high_volume],
+                [2, -2], 0
+            )
+
+        score = np.clip(score, -3, 3)
+        return np.where(lengths < 2, 0, score)
+
+    def _volatility_scores(self, panels: Dict[str, np.ndarray], lengths: np.ndarray) -> np.ndarray:
+        if 'atr' not in panels:
+            return np.zeros(len(lengths), dtype=int)
+
+        atr = panels['atr']
+        bb_width = panels['bollinger_upper'] - panels['bollinger_lower']
+        with np.errstate(invalid='ignore'):
+            atr_mean = pd.DataFrame(atr).mean().to_numpy()
+            bb_width_mean = pd.DataFrame(bb_width).mean().to_numpy()
+
+            # Niedrige Volatilität (Ruhe vor Sturm)
+            score = (atr[-1] < atr_mean * 0.7).astype(int)
+            score += bb_width[-1] < bb_width_mean * 0.7
+
+        score = np.clip(score, -3, 3)
+        invalid = self._all_nan(atr) | self._all_nan(panels['bollinger_upper'])
+        return np.where((lengths < 14) | invalid, 0, score)
+
+    def _momentum_scores(self, panels: Dict[str, np.ndarray], lengths: np.ndarray) -> np.ndarray:
+        if 'stoch_k' not in panels:
+            return np.zeros(len(lengths), dtype=int)
+
+        stoch_k, stoch_d = panels['stoch_k'], panels['stoch_d']
+        roc5, roc10 = panels['roc5'][-1], panels['roc10'][-1]
+        current_k, current_d, previous_k, previous_d = stoch_k[-1], stoch_d[-1], stoch_k[-2], stoch_d[-2]
+
+        with np.errstate(invalid='ignore'):
+            # Stochastik Überverkauft/Überkauft
+            score = np.select(
+                [(current_k < 20) & (current_d < 20), (current_k > 80) & (current_d > 80)], [2, -2], 0
+            )
+            # Stochastik Kreuzungen (%K kreuzt %D)
+            score += np.select(
+                [
+                    (previous_k < previous_d) & (current_k >= current_d),
+                    (previous_k > previous_d) & (current_k <= current_d),
+                ],
+                [3, -3], 0
+            )
+            # ROC Momentum
+            score += np.select([(roc5 > 0) & (roc10 > 0), (roc5 < 0) & (roc10 < 0)], [2, -2], 0)
+
+        score = np.clip(score, -3, 3)
+        invalid = self._all_nan(stoch_k) | self._all_nan(panels['roc5']) | self._all_nan(panels['roc10'])
+        return np.where((lengths < 14) | invalid, 0, score)
+
+    # --- Gemeinsamer Indikator-Frame ---
+
+    # Indikator-Gruppen: Spalten aus historical_data und ihre Berechnung aus OHLCV
+    INDICATOR_GROUPS = {
+        "rsi": ["rsi"],
+        "macd": ["macd", "macd_signal", "macd_hist"],
+        "ema": ["ema10", "ema20", "ema50"],
+        "bollinger": ["bollinger_upper", "bollinger_middle", "bollinger_lower"],
+        "atr": ["atr"],
+        "stochastic": ["stoch_k", "stoch_d"],
+        "roc": ["roc5", "roc10"],
+    }
+
+    def _prepare_indicator_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Ergänzt den Kurs-Frame um alle Indikatorspalten, die die Sub-Scorer benötigen.
+
+        Gespeicherte Spalten aus der Datenbank werden verwendet, wenn sie ab dem ersten
+        gültigen Wert lückenlos sind. Fehlende Gruppen werden genau einmal aus df['close']
+        (bzw. High/Low) berechnet.
+        """
+        df = df.copy()
+        stored_columns = [c for cols in self.INDICATOR_GROUPS.values() for c in cols if c in df.columns]
+        stored_ok = set()
+        if stored_columns:
+            # Ein Block-Zugriff statt einer Konvertierung pro Spalte
+            try:
+                values = df[stored_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+            except (TypeError, ValueError):
+                values = df[stored_columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+            df[stored_columns] = values
+            stored_ok = {col for col, ok in zip(stored_columns, self._stored_indicator_mask(values)) if ok}
+
+        missing_groups = [
+            group for group, columns in self.INDICATOR_GROUPS.items()
+            if not all(col in stored_ok for col in columns)
+        ]
+        if not missing_groups:
+            return df
+
+        close = df['close']
+        for group in missing_groups:
+            if group == "rsi":
+                df['rsi'] = indicators.calculate_rsi(close, period=14)
+            elif group == "macd":
+                macd_df = indicators.calculate_macd(close)
+                df['macd'], df['macd_signal'], df['macd_hist'] = macd_df['MACD'], macd_df['Signal'], macd_df['Histogram']
+            elif group == "ema":
+                for period in (10, 20, 50):
+                    df[f'ema{period}'] = indicators.calculate_ema(close, period)
+            elif group == "bollinger":
+                bb_df = indicators.calculate_bollinger_bands(close)
+                df['bollinger_upper'], df['bollinger_middle'], df['bollinger_lower'] = bb_df['Upper'], bb_df['Middle'], bb_df['Lower']
+            elif group == "atr" and 'high' in df.columns and 'low' in df.columns:
+                df['atr'] = indicators.calculate_atr(df['high'], df['low'], close)
+            elif group == "stochastic" and 'high' in df.columns and 'low' in df.columns:
+                stoch_df = indicators.calculate_stochastic_oscillator(df['high'], df['low'], close)
+                df['stoch_k'], df['stoch_d'] = stoch_df['K'], stoch_df['D']
+            elif group == "roc":
+                df['roc5'] = indicators.calculate_roc(close, 5)
+                df['roc10'] = indicators.calculate_roc(close, 10)
+
+        return df
+
+    @staticmethod
+    def _stored_indicator_mask(values: np.ndarray) -> np.ndarray:
+        """Prüft je Spalte, ob die gespeicherten Werte ab dem ersten gültigen Wert lückenlos sind."""
+        valid = ~np.isnan(values)
+        # Nach dem ersten gültigen Wert darf kein NaN mehr folgen
+        seen_valid = np.logical_or.accumulate(valid, axis=0)
+        return valid.any(axis=0) & ~(seen_valid & ~valid).any(axis=0)
+
     # --- Private Methoden für individuelle Indikator-Scores ---
 
     def _calculate_rsi_score(self, df: pd.DataFrame) -> int:
@@ -105,7 +485,7 @@ class ScoringEngine:
             logger.warning("Not enough historical data for RSI calculation. Returning neutral score.")
             return 0
 
-        rsi_series = indicators.calculate_rsi(df['close'], period=14)
+        rsi_series = df['rsi']
 
         if rsi_series.isnull().all() or len(rsi_series) < 2:
             logger.warning("RSI calculation resulted in insufficient valid data. Returning neutral score.")
@@ -157,16 +537,19 @@ class ScoringEngine:
             logger.warning("Not enough historical data for MACD calculation. Returning neutral score.")
             return 0
         
-        macd_df = indicators.calculate_macd(df['close'])
-        if macd_df.empty or macd_df['MACD'].isnull().all():
+        macd_series = df['macd']
+        signal_series = df['macd_signal']
+        hist_series = df['macd_hist']
+        if macd_series.isnull().all():
             logger.warning("MACD calculation resulted in insufficient valid data. Returning neutral score.")
             return 0
 
-        current_macd = macd_df['MACD'].iloc[-1]
-        current_signal = macd_df['Signal'].iloc[-1]
-        current_hist = macd_df['Histogram'].iloc[-1]
-        previous_macd = macd_df['MACD'].iloc[-2]
-        previous_signal = macd_df['Signal'].iloc[-2]
+        current_macd = macd_series.iloc[-1]
+        current_signal = signal_series.iloc[-1]
+        current_hist = hist_series.iloc[-1]
+        previous_macd = macd_series.iloc[-2]
+        previous_signal = signal_series.iloc[-2]
+        previous_hist = hist_series.iloc[-2]
 
         score = 0
 
@@ -191,10 +574,10 @@ class ScoringEngine:
                 score -= 2
 
         # Histogram Momentum
-        if not pd.isna(current_hist) and not pd.isna(macd_df['Histogram'].iloc[-2]):
-            if current_hist > macd_df['Histogram'].iloc[-2]:
+        if not pd.isna(current_hist) and not pd.isna(previous_hist):
+            if current_hist > previous_hist:
                 score += 1
-            elif current_hist < macd_df['Histogram'].iloc[-2]:
+            elif current_hist < previous_hist:
                 score -= 1
 
         return max(-3, min(3, score))
@@ -205,9 +588,9 @@ class ScoringEngine:
             logger.warning("Not enough historical data for Moving Averages calculation. Returning neutral score.")
             return 0
 
-        ema10 = indicators.calculate_ema(df['close'], 10)
-        ema20 = indicators.calculate_ema(df['close'], 20)
-        ema50 = indicators.calculate_ema(df['close'], 50)
+        ema10 = df['ema10']
+        ema20 = df['ema20']
+        ema50 = df['ema50']
 
         if ema10.isnull().all() or ema20.isnull().all() or ema50.isnull().all():
             logger.warning("EMA calculation resulted in insufficient valid data. Returning neutral score.")
@@ -258,15 +641,14 @@ class ScoringEngine:
             logger.warning("Not enough historical data for Bollinger Bands calculation. Returning neutral score.")
             return 0
 
-        bb_df = indicators.calculate_bollinger_bands(df['close'])
-        if bb_df.empty or bb_df['Middle'].isnull().all():
+        if df['bollinger_middle'].isnull().all():
             logger.warning("Bollinger Bands calculation resulted in insufficient valid data. Returning neutral score.")
             return 0
 
         current_price = df['close'].iloc[-1]
-        current_upper = bb_df['Upper'].iloc[-1]
-        current_middle = bb_df['Middle'].iloc[-1]
-        current_lower = bb_df['Lower'].iloc[-1]
+        current_upper = df['bollinger_upper'].iloc[-1]
+        current_middle = df['bollinger_middle'].iloc[-1]
+        current_lower = df['bollinger_lower'].iloc[-1]
 
         score = 0
 
@@ -298,7 +680,7 @@ class ScoringEngine:
 
         # Squeeze-Erkennung (vereinfacht: Bandbreite im Vergleich zu historischem Durchschnitt)
         # Dies erfordert eine komplexere Logik, hier nur ein Platzhalter
-        # if (current_upper - current_lower) < (bb_df['Upper'] - bb_df['Lower']).mean() * 0.8:
+        # if (current_upper - current_lower) < (df['bollinger_upper'] - df['bollinger_lower']).mean() * 0.8:
         #     score += 1
 
         return max(-3, min(3, score))
@@ -344,15 +726,19 @@ class ScoringEngine:
             logger.warning("Not enough historical data for Volatility Indicators calculation. Returning neutral score.")
             return 0
 
-        atr_series = indicators.calculate_atr(df['high'], df['low'], df['close'])
-        bb_df = indicators.calculate_bollinger_bands(df['close'])
+        if 'atr' not in df.columns:
+            logger.warning("No ATR available (missing high/low data). Returning neutral score.")
+            return 0
 
-        if atr_series.isnull().all() or bb_df.empty or bb_df['Upper'].isnull().all():
+        atr_series = df['atr']
+        bb_width_series = df['bollinger_upper'] - df['bollinger_lower']
+
+        if atr_series.isnull().all() or df['bollinger_upper'].isnull().all():
             logger.warning("Volatility calculation resulted in insufficient valid data. Returning neutral score.")
             return 0
 
         current_atr = atr_series.iloc[-1]
-        current_bb_width = bb_df['Upper'].iloc[-1] - bb_df['Lower'].iloc[-1]
+        current_bb_width = bb_width_series.iloc[-1]
 
         score = 0
 
@@ -361,8 +747,8 @@ class ScoringEngine:
             if current_atr < atr_series.mean() * 0.7: # ATR ist deutlich unter dem Durchschnitt
                 score += 1
         
-        if not pd.isna(current_bb_width) and not pd.isna((bb_df['Upper'] - bb_df['Lower']).mean()):
-            if current_bb_width < (bb_df['Upper'] - bb_df['Lower']).mean() * 0.7: # BB-Breite ist deutlich unter dem Durchschnitt
+        if not pd.isna(current_bb_width) and not pd.isna(bb_width_series.mean()):
+            if current_bb_width < bb_width_series.mean() * 0.7: # BB-Breite ist deutlich unter dem Durchschnitt
                 score += 1
 
         # Squeeze-Erkennung (stärker als nur niedrige Volatilität)
@@ -382,18 +768,23 @@ class ScoringEngine:
             logger.warning("Not enough historical data for Momentum Indicators calculation. Returning neutral score.")
             return 0
 
-        stoch_df = indicators.calculate_stochastic_oscillator(df['high'], df['low'], df['close'])
-        roc5 = indicators.calculate_roc(df['close'], 5)
-        roc10 = indicators.calculate_roc(df['close'], 10)
+        if 'stoch_k' not in df.columns:
+            logger.warning("No stochastic oscillator available (missing high/low data). Returning neutral score.")
+            return 0
+
+        stoch_k_series = df['stoch_k']
+        stoch_d_series = df['stoch_d']
+        roc5 = df['roc5']
+        roc10 = df['roc10']
 
-        if stoch_df.empty or stoch_df['K'].isnull().all() or roc5.isnull().all() or roc10.isnull().all():
+        if stoch_k_series.isnull().all() or roc5.isnull().all() or roc10.isnull().all():
             logger.warning("Momentum calculation resulted in insufficient valid data. Returning neutral score.")
             return 0
 
-        current_stoch_k = stoch_df['K'].iloc[-1]
-        current_stoch_d = stoch_df['D'].iloc[-1]
-        previous_stoch_k = stoch_df['K'].iloc[-2]
-        previous_stoch_d = stoch_df['D'].iloc[-2]
+        current_stoch_k = stoch_k_series.iloc[-1]
+        current_stoch_d = stoch_d_series.iloc[-1]
+        previous_stoch_k = stoch_k_series.iloc[-2]
+        previous_stoch_d = stoch_d_series.iloc[-2]
         current_roc5 = roc5.iloc[-1]
         current_roc10 = roc10.iloc[-1]
 
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.backend_components.data_preparation import FEATURE_DEFINITIONS, DataPreparation
+from src.config.config import Config
+from src.database.historical_panel import HISTORICAL_PANEL_COLUMNS, fetch_historical_panel, panel_to_frame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data/daki.db')
+
+# Standard-Featurespalten des Trainings: Rohspalten aus historical_data und abgeleitete Features
+DEFAULT_FEATURE_NAMES = list(HISTORICAL_PANEL_COLUMNS) + list(FEATURE_DEFINITIONS)
+
+# (X float32, y float32, Datum datetime64[ns], Ticker) eines Ticker-Blocks
+ChunkArrays = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class TrainingDataset:
+    """
+    Trainingsmatrix über viele Ticker (float32), Zeilen nach Ticker und Datum sortiert.
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, dates: np.ndarray, tickers: np.ndarray, feature_names: List[str]):
+        self.X = X
+        self.y = y
+        self.dates = dates
+        self.tickers = tickers
+        self.feature_names = feature_names
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def time_split(self, validation_fraction: float = 0.2, gap: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Zeitbasierte Aufteilung über alle Ticker: Die jüngsten Handelstage (validation_fraction der
+        verschiedenen Datumswerte) bilden die Validierung. Die letzten 'gap' Handelstage davor werden
+        verworfen, damit Zielwerte des Trainings (Kurse der folgenden Tage) nicht in die
+        Validierung reichen.
+
+        Returns:
+            (Trainingsmaske, Validierungsmaske) als boolesche Arrays
+        """
+        unique_dates = np.unique(self.dates)
+        n_validation = int(round(len(unique_dates) * validation_fraction))
+        if n_validation <= 0 or n_validation >= len(unique_dates):
+            return np.ones(len(self), dtype=bool), np.zeros(len(self), dtype=bool)
+        validation_start = unique_dates[len(unique_dates) - n_validation]
+        train_end_index = len(unique_dates) - n_validation - gap
+        if train_end_index <= 0:
+            return np.zeros(len(self), dtype=bool), self.dates >= validation_start
+        return self.dates < unique_dates[train_end_index], self.dates >= validation_start
+
+    def split(self, validation_fraction: float = 0.2, gap: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(X_train, y_train, X_validation, y_validation) nach time_split."""
+        train_mask, validation_mask = self.time_split(validation_fraction, gap)
+        return self.X[train_mask], self.y[train_mask], self.X[validation_mask], self.y[validation_mask]
+
+
+# Worker-Prozesse behalten ihre DataPreparation zwischen den Aufgaben
+_worker_preparations: Dict[bool, DataPreparation] = {}
+
+
+def _get_worker_preparation(use_feature_store: bool) -> DataPreparation:
+    if use_feature_store not in _worker_preparations:
+        _worker_preparations[use_feature_store] = DataPreparation.from_config() if use_feature_store else DataPreparation()
+    return _worker_preparations[use_feature_store]
+
+
+def _empty_chunk(n_features: int) -> ChunkArrays:
+    return (
+        np.empty((0, n_features), dtype=np.float32), np.empty(0, dtype=np.float32),
+        np.empty(0, dtype="datetime64[ns]"), np.empty(0, dtype=object)
+    )
+
+
+async def _prepare_chunk(
+    db_path: str,
+    tickers: List[str],
+    feature_names: List[str],
+    forecast_period: int,
+    use_feature_store: bool
+) -> ChunkArrays:
+    """Liest einen Block Ticker aus der Datenbank und bereitet deren Features vor."""
+    columns = [column for column in HISTORICAL_PANEL_COLUMNS if column in feature_names]
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        frame = panel_to_frame(fetch_historical_panel(conn, tickers, columns))
+    finally:
+        conn.close()
+
+    preparation = _get_worker_preparation(use_feature_store)
+    parts = []
+    for ticker, ticker_frame in frame.groupby("ticker", sort=False):
+        prepared = await preparation.prepare_data_for_ml(
+            ticker, ticker_frame.drop(columns=["ticker"]), forecast_period=forecast_period
+        )
+        # Nur Tage, die aus der Datenbank gelesen wurden (der Feature Store kann mehr Historie enthalten)
+        prepared = prepared[prepared.index.isin(ticker_frame["date"].values)]
+        if prepared.empty:
+            continue
+        parts.append((
+            prepared.reindex(columns=feature_names).to_numpy(dtype=np.float32),
+            prepared["target"].to_numpy(dtype=np.float32),
+            prepared.index.values.astype("datetime64[ns]"),
+            np.full(len(prepared), ticker, dtype=object)
+        ))
+    if not parts:
+        return _empty_chunk(len(feature_names))
+    return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+
+def _prepare_chunk_in_worker(*args) -> ChunkArrays:
+    """_prepare_chunk in einem Worker-Prozess."""
+    return asyncio.run(_prepare_chunk(*args))
+
+
+class TrainingDatasetBuilder:
+    """
+    Baut die Trainingsmatrix für MLPredictor aus der Kurshistorie vieler Ticker.
+
+    Die Ticker werden in Blöcken auf einem Prozess-Pool vorbereitet (Datenbank lesen,
+    DataPreparation inkl. Feature Store); jeder Block liefert nur float32-Arrays zurück.
+    Die Gesamtmatrix wird vorab nach der Zeilenzahl der Datenbank angelegt, jeder Block wird
+    direkt nach seiner Fertigstellung hineinkopiert und freigegeben. Höchstens 'workers' Blöcke
+    sind gleichzeitig unterwegs, der Speicherbedarf liegt daher kaum über der Matrix selbst.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DATABASE_PATH,
+        feature_names: Optional[Sequence[str]] = None,
+        forecast_period: int = 30,
+        workers: Optional[int] = None,
+        tickers_per_task: Optional[int] = None,
+        use_feature_store: bool = True
+    ):
+        """
+        Args:
+            db_path: Pfad der SQLite-Datenbank
+            feature_names: Featurespalten der Matrix (Standard: DEFAULT_FEATURE_NAMES; fehlende Spalten werden NaN)
+            forecast_period: Prognosehorizont der Zielvariable in Handelstagen
+            workers: Prozesse für die Vorbereitung (Standard: analysis.training.workers oder min(4, CPUs);
+                     0 bereitet im aufrufenden Prozess vor)
+            tickers_per_task: Ticker pro Block (Standard: analysis.training.tickers_per_task oder 25)
+            use_feature_store: Features aus dem Feature Store (analysis.feature_store) lesen und dort speichern
+        """
+        config = Config.get("analysis", {}).get("training", {})
+        self.db_path = db_path
+        self.feature_names = list(feature_names or DEFAULT_FEATURE_NAMES)
+        self.forecast_period = forecast_period
+        self.workers = max(0, int(workers if workers is not None else config.get("workers", min(4, os.cpu_count() or 1))))
+        self.tickers_per_task = max(1, int(tickers_per_task or config.get("tickers_per_task", 25)))
+        self.use_feature_store = use_feature_store
+        # Höchstzahl gleichzeitig gehaltener Blöcke im letzten build()
+        self.peak_pending_blocks = 0
+
+    def _load_tickers(self) -> List[str]:
+        conn = sqlite3.connect(f"file:{os.path.abspath(self.db_path)}?mode=ro", uri=True)
+        try:
+            return [row[0] for row in conn.execute("SELECT ticker FROM candidates ORDER BY ticker")]
+        finally:
+            conn.close()
+
+    async def build(self, tickers: Optional[Sequence[str]] = None) -> TrainingDataset:
+        """
+        Baut den Datensatz für die angegebenen Ticker (Standard: alle Ticker der candidates-Tabelle).
+        """
+        tickers = list(dict.fromkeys(tickers)) if tickers is not None else self._load_tickers()
+        blocks = [tickers[i:i + self.tickers_per_task] for i in range(0, len(tickers), self.tickers_per_task)]
+        logger.info(f"Building training dataset for {len(tickers)} tickers in {len(blocks)} blocks (workers={self.workers})")
+
+        # Erwartete Obergrenze der Zeilen: die Vorbereitung verwirft Zeilen (Vorlauf, Zielhorizont), fügt aber keine hinzu
+        capacity = self._count_rows(tickers)
+        X = np.empty((capacity, len(self.feature_names)), dtype=np.float32)
+        y = np.empty(capacity, dtype=np.float32)
+        dates = np.empty(capacity, dtype="datetime64[ns]")
+        tickers_column = np.empty(capacity, dtype=object)
+        offset = 0
+        async for chunk_X, chunk_y, chunk_dates, chunk_tickers in self._iter_chunks(blocks):
+            end = offset + len(chunk_y)
+            if end > capacity:
+                # Seit der Zählung von der Ingestion geschriebene Zeilen: Puffer verdoppeln
+                capacity = max(end, 2 * capacity)
+                X.resize((capacity, len(self.feature_names)), refcheck=False)
+                for column in (y, dates, tickers_column):
+                    column.resize(capacity, refcheck=False)
+            X[offset:end], y[offset:end], dates[offset:end], tickers_column[offset:end] = chunk_X, chunk_y, chunk_dates, chunk_tickers
+            offset = end
+            # Block sofort freigeben, nicht erst beim nächsten Schleifendurchlauf
+            del chunk_X, chunk_y, chunk_dates, chunk_tickers
+
+        # Ungenutzte Zeilen in place abschneiden statt die Matrix zu kopieren
+        X.resize((offset, len(self.feature_names)), refcheck=False)
+        for column in (y, dates, tickers_column):
+            column.resize(offset, refcheck=False)
+        logger.info(f"Training dataset built: {offset} rows x {len(self.feature_names)} features")
+        return TrainingDataset(X, y, dates, tickers_column, self.feature_names)
+
+    def _count_rows(self, tickers: List[str]) -> int:
+        """Anzahl der Rohzeilen in historical_data für die Ticker."""
+        conn = sqlite3.connect(f"file:{os.path.abspath(self.db_path)}?mode=ro", uri=True)
+        try:
+            total = 0
+            # In Gruppen abfragen: SQLite begrenzt die Anzahl der Parameter
+            for start in range(0, len(tickers), 500):
+                group = tickers[start:start + 500]
+                total += conn.execute(
+                    "SELECT COUNT(*) FROM historical_data hd JOIN candidates c ON hd.candidate_id = c.id "
+                    f"WHERE c.ticker IN ({','.join('?' * len(group))})", group
+                ).fetchone()[0]
+            return total
+        finally:
+            conn.close()
+
+    async def _iter_chunks(self, blocks: List[List[str]]) -> AsyncIterator[ChunkArrays]:
+        """
+        Liefert die vorbereiteten Blöcke in Blockreihenfolge. Es sind höchstens 'workers' Blöcke
+        gleichzeitig in Arbeit oder fertig und noch nicht kopiert, unabhängig von der Tickerzahl.
+        """
+        args = (self.feature_names, self.forecast_period, self.use_feature_store)
+        self.peak_pending_blocks = 0
+        if self.workers == 0:
+            for block in blocks:
+                self.peak_pending_blocks = 1
+                yield await _prepare_chunk(self.db_path, block, *args)
+            return
+
+        loop = asyncio.get_running_loop()
+        # 'spawn' statt fork: der aufrufende Prozess betreibt Event-Loop und Server-Threads
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pending: Deque[asyncio.Future] = deque()
+            next_block = 0
+            try:
+                while pending or next_block < len(blocks):
+                    while next_block < len(blocks) and len(pending) < self.workers:
+                        pending.append(loop.run_in_executor(pool, _prepare_chunk_in_worker, self.db_path, blocks[next_block], *args))
+                        next_block += 1
+                    self.peak_pending_blocks = max(self.peak_pending_blocks, len(pending))
+                    # Ältesten Block abwarten; später fertige Blöcke belegen bis dahin ihren Platz im Fenster
+                    yield await pending.popleft()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "db_path": self.db_path,
+            "feature_count": len(self.feature_names),
+            "forecast_period": self.forecast_period,
+            "workers": self.workers,
+            "tickers_per_task": self.tickers_per_task,
+            "use_feature_store": self.use_feature_store,
+            "peak_pending_blocks": self.peak_pending_blocks,
+        }
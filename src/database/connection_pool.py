@@ -0,0 +1,179 @@
+"""
+Async-safe SQLite connection pool.
+
+sqlite3 calls block the calling thread. The pool keeps a fixed number of long-lived
+connections and runs every query on a dedicated thread pool of the same size, so the
+event loop never waits on the database. Because the connections stay open, sqlite3's
+per-connection statement cache reuses the prepared statements of repeated queries.
+"""
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_CACHED_STATEMENTS = 256
+
+# Applied to every new connection. WAL lets readers run alongside a writer,
+# synchronous=NORMAL is durable enough in WAL mode and avoids an fsync per commit,
+# mmap_size and cache_size (negative = KiB) keep the hot historical data in memory.
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,
+    "cache_size": -65536,
+}
+
+
+def pragmas_from_config() -> Dict[str, Any]:
+    """Get the connection PRAGMAs (defaults overridden by config database.pragmas)."""
+    pragmas = dict(DEFAULT_PRAGMAS)
+    pragmas.update(Config.get("database", {}).get("pragmas", {}) or {})
+    return pragmas
+
+
+def configure_connection(conn: sqlite3.Connection, pragmas: Optional[Dict[str, Any]] = None) -> sqlite3.Connection:
+    """Apply PRAGMAs to a freshly opened connection."""
+    for name, value in (DEFAULT_PRAGMAS if pragmas is None else pragmas).items():
+        if not name.isidentifier():
+            raise ValueError(f"Invalid PRAGMA name: {name}")
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def _fetchone(conn: sqlite3.Connection, sql: str, params: Sequence[Any]) -> Any:
+    return conn.execute(sql, params).fetchone()
+
+
+def _fetchall(conn: sqlite3.Connection, sql: str, params: Sequence[Any]) -> List[Any]:
+    return conn.execute(sql, params).fetchall()
+
+
+def _execute(conn: sqlite3.Connection, sql: str, params: Sequence[Any]) -> Tuple[int, Optional[int]]:
+    cursor = conn.execute(sql, params)
+    conn.commit()
+    return cursor.rowcount, cursor.lastrowid
+
+
+class ConnectionPool:
+    """Pool of long-lived SQLite connections served by a thread pool of the same size."""
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        row_factory: Optional[Callable] = None,
+        cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+        pragmas: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize the pool. Connections and worker threads are created lazily.
+
+        Args:
+            db_path: Path to the SQLite database file
+            pool_size: Maximum number of open connections and worker threads
+            row_factory: Optional row factory for all connections (e.g. sqlite3.Row)
+            cached_statements: Size of the prepared statement cache per connection
+            pragmas: PRAGMAs for every new connection (default: DEFAULT_PRAGMAS)
+        """
+        self.db_path = db_path
+        self.pool_size = max(1, int(pool_size))
+        self.row_factory = row_factory
+        self.cached_statements = cached_statements
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Lazy create the worker threads that run the queries."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="sqlite-pool")
+            return self._executor
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """Open a new connection that may be used from any pool thread."""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        configure_connection(conn, self.pragmas)
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._connections) < self.pool_size:
+                conn = self._create_connection()
+                self._connections.append(conn)
+                return conn
+        return self._idle.get()
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        # Never hand out a connection with an open transaction (and its locks)
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection for synchronous use (blocks until one is free)."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def run_sync(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Call func(connection, *args) with a pooled connection in the current thread."""
+        with self.connection() as conn:
+            return func(conn, *args)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Call func(connection, *args) on a pool thread without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.run_sync, func, *args)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Any:
+        """Execute a query and return its first row."""
+        return await self.run(_fetchone, sql, params)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[Any]:
+        """Execute a query and return all rows."""
+        return await self.run(_fetchall, sql, params)
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> Tuple[int, Optional[int]]:
+        """Execute and commit a single write statement. Returns (rowcount, lastrowid)."""
+        return await self.run(_execute, sql, params)
+
+    def close(self) -> None:
+        """Wait for running queries, then close the worker threads and all connections."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    logger.warning(f"Error closing pooled connection: {str(e)}")
+            self._connections.clear()
+            self._idle = queue.LifoQueue()
@@ -1,8 +1,13 @@
 import sqlite3
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
 
 from src.config.config import Config
+from src.database.connection_pool import ConnectionPool, DEFAULT_POOL_SIZE, configure_connection, pragmas_from_config
+from src.database.historical_panel import DateLike, fetch_historical_panel, normalize_panel_request, panel_to_frame
 
 DATABASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data')
 DATABASE_PATH = os.path.join(DATABASE_DIR, 'daki.db')
@@ -10,51 +15,61 @@ DATABASE_PATH = os.path.join(DATABASE_DIR, 'daki.db')
 class DBAccess:
     def __init__(self):
         self.db_path = DATABASE_PATH
+        self.pool_size = int(Config.get("database", {}).get("connection_pool_size", DEFAULT_POOL_SIZE))
+        self.pragmas = pragmas_from_config()
+        # Verbindungspool wird erst bei der ersten Abfrage angelegt
+        self._pool: Optional[ConnectionPool] = None
 
     def _get_connection(self):
-        return sqlite3.connect(self.db_path)
+        return configure_connection(sqlite3.connect(self.db_path), self.pragmas)
+
+    @property
+    def pool(self) -> ConnectionPool:
+        """
+        Verbindungspool, der alle Abfragen in Worker-Threads ausführt und die Event-Loop nicht blockiert.
+        """
+        if self._pool is None:
+            self._pool = ConnectionPool(self.db_path, pool_size=self.pool_size, pragmas=self.pragmas)
+        return self._pool
+
+    def close(self) -> None:
+        """
+        Schließt den Verbindungspool.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
 
     async def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, username, hashed_password FROM users WHERE username = ?", (username,))
-        user = cursor.fetchone()
-        conn.close()
+        user = await self.pool.fetchone("SELECT id, username, hashed_password FROM users WHERE username = ?", (username,))
         if user:
             return {"id": user[0], "username": user[1], "hashed_password": user[2]}
         return None
 
     async def create_user(self, username: str, hashed_password: str) -> Dict[str, Any]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("INSERT INTO users (username, hashed_password, created_at) VALUES (?, ?, datetime('now'))",
-                           (username, hashed_password))
-            conn.commit()
-            user_id = cursor.lastrowid
+            _, user_id = await self.pool.execute(
+                "INSERT INTO users (username, hashed_password, created_at) VALUES (?, ?, datetime('now'))",
+                (username, hashed_password)
+            )
             return {"id": user_id, "username": username}
         except sqlite3.IntegrityError:
             return None # Benutzername existiert bereits
-        finally:
-            conn.close()
 
     async def check_connection(self) -> bool:
         """
         Prüft die Datenbankverbindung.
         """
         try:
-            conn = self._get_connection()
-            conn.close()
+            await self.pool.fetchone("SELECT 1")
             return True
         except sqlite3.Error:
             return False
 
     async def get_stocks_by_user_id(self, user_id: int) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, ticker, quantity, average_buy_price, created_at, updated_at FROM portfolios WHERE user_id = ?", (user_id,))
+        rows = await self.pool.fetchall("SELECT id, ticker, quantity, average_buy_price, created_at, updated_at FROM portfolios WHERE user_id = ?", (user_id,))
         stocks = []
-        for row in cursor.fetchall():
+        for row in rows:
             stocks.append({
                 "id": row[0],
                 "ticker": row[1],
@@ -63,19 +78,14 @@ class DBAccess:
                 "created_at": row[4],
                 "updated_at": row[5]
             })
-        conn.close()
         return stocks
 
     async def add_stock_to_portfolio(self, user_id: int, ticker: str, quantity: float, average_buy_price: float) -> Optional[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute(
+            _, stock_id = await self.pool.execute(
                 "INSERT INTO portfolios (user_id, ticker, quantity, average_buy_price, created_at, updated_at) VALUES (?, ?, ?, ?, datetime('now'), datetime('now'))",
                 (user_id, ticker, quantity, average_buy_price)
             )
-            conn.commit()
-            stock_id = cursor.lastrowid
             return {
                 "id": stock_id,
                 "user_id": user_id,
@@ -87,15 +97,9 @@ class DBAccess:
             # Handle case where user already has this stock (e.g., update instead of insert)
             # For now, just return None to indicate failure due to unique constraint
             return None
-        finally:
-            conn.close()
 
     async def get_stock_by_id(self, stock_id: int) -> Optional[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, user_id, ticker, quantity, average_buy_price, created_at, updated_at FROM portfolios WHERE id = ?", (stock_id,))
-        stock = cursor.fetchone()
-        conn.close()
+        stock = await self.pool.fetchone("SELECT id, user_id, ticker, quantity, average_buy_price, created_at, updated_at FROM portfolios WHERE id = ?", (stock_id,))
         if stock:
             return {
                 "id": stock[0],
@@ -109,29 +113,17 @@ class DBAccess:
         return None
 
     async def update_stock_in_portfolio(self, stock_id: int, quantity: float, average_buy_price: float) -> bool:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
+        rows_affected, _ = await self.pool.execute(
             "UPDATE portfolios SET quantity = ?, average_buy_price = ?, updated_at = datetime('now') WHERE id = ?",
             (quantity, average_buy_price, stock_id)
         )
-        conn.commit()
-        rows_affected = cursor.rowcount
-        conn.close()
         return rows_affected > 0
 
     async def delete_stock_from_portfolio(self, stock_id: int) -> bool:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM portfolios WHERE id = ?", (stock_id,))
-        conn.commit()
-        rows_affected = cursor.rowcount
-        conn.close()
+        rows_affected, _ = await self.pool.execute("DELETE FROM portfolios WHERE id = ?", (stock_id,))
         return rows_affected > 0
 
     async def get_historical_data_for_ticker(self, ticker: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
         query = """
             SELECT
                 hd.date, hd.open, hd.high, hd.low, hd.close, hd.volume,
@@ -149,7 +141,7 @@ class DBAccess:
             query += " LIMIT ?"
             params = (ticker, limit)
 
-        cursor.execute(query, params)
+        rows = await self.pool.fetchall(query, params)
         
         columns = [
             "date", "open", "high", "low", "close", "volume",
@@ -159,68 +151,92 @@ class DBAccess:
         ]
         
         data = []
-        for row in cursor.fetchall():
+        for row in rows:
             data.append(dict(zip(columns, row)))
         
-        conn.close()
         return data
 
+    async def get_historical_panel(
+        self,
+        tickers: Union[str, Iterable[str]],
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        columns: Optional[Sequence[str]] = None,
+        as_frame: bool = True
+    ) -> Union[pd.DataFrame, Dict[str, np.ndarray]]:
+        """
+        Liest die Kurshistorie eines oder mehrerer Ticker spaltenweise (ohne ein Dict pro Zeile).
+
+        Args:
+            tickers: Ein Ticker oder eine Liste von Tickern.
+            start_date: Optionales erstes Datum (inklusive).
+            end_date: Optionales letztes Datum (inklusive).
+            columns: Optionale Auswahl numerischer Spalten (Standard: alle aus HISTORICAL_PANEL_COLUMNS).
+            as_frame: True liefert ein Long-Format DataFrame ('ticker', 'date', Spalten),
+                      False ein Dict mit zusammenhängenden NumPy-Arrays (float64 je Spalte).
+        """
+        tickers, columns = normalize_panel_request(tickers, columns)
+        panel = await self.pool.run(fetch_historical_panel, tickers, columns, start_date, end_date)
+        return panel_to_frame(panel) if as_frame else panel
+
     async def get_user_cash_balance(self, user_id: int) -> float:
-        conn = self._get_connection()
-        cursor = conn.cursor()
         # Hole den letzten Cash-Bestand des Benutzers
-        cursor.execute("SELECT cash_balance_after FROM transactions WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1", (user_id,))
-        result = cursor.fetchone()
-        conn.close()
+        result = await self.pool.fetchone("SELECT cash_balance_after FROM transactions WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1", (user_id,))
         return result[0] if result else 0.0 # Standardmäßig 0, wenn keine Transaktionen
 
     async def record_transaction(self, user_id: int, ticker: str, type: str, quantity: float, price: float, transaction_cost: float, cash_balance_after: float) -> Dict[str, Any]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
+        _, transaction_id = await self.pool.execute(
             "INSERT INTO transactions (user_id, ticker, type, quantity, price, transaction_cost, timestamp, cash_balance_after) VALUES (?, ?, ?, ?, ?, ?, datetime('now'), ?)",
             (user_id, ticker, type, quantity, price, transaction_cost, cash_balance_after)
         )
-        conn.commit()
-        transaction_id = cursor.lastrowid
-        conn.close()
         return {"id": transaction_id, "user_id": user_id, "ticker": ticker, "type": type, "quantity": quantity, "price": price}
 
     async def update_portfolio_after_trade(self, user_id: int, ticker: str, quantity_change: float, cost_change: float):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        # Prüfen, ob Aktie bereits im Portfolio
-        cursor.execute("SELECT id, quantity, average_buy_price FROM portfolios WHERE user_id = ? AND ticker = ?", (user_id, ticker))
-        existing_stock = cursor.fetchone()
-
-        if existing_stock:
-            stock_id, current_quantity, current_avg_price = existing_stock
-            new_quantity = current_quantity + quantity_change
-
-            if new_quantity <= 0:
-                # Aktie komplett verkauft, aus Portfolio entfernen
-                cursor.execute("DELETE FROM portfolios WHERE id = ?", (stock_id,))
-            else:
-                # Durchschnittlichen Kaufpreis neu berechnen (nur bei Kauf relevant)
-                if quantity_change > 0: # Kauf
-                    new_total_cost = (current_quantity * current_avg_price) + cost_change
-                    new_average_buy_price = new_total_cost / new_quantity
-                else: # Verkauf, Durchschnittspreis bleibt gleich
-                    new_average_buy_price = current_avg_price
-
-                cursor.execute(
-                    "UPDATE portfolios SET quantity = ?, average_buy_price = ?, updated_at = datetime('now') WHERE id = ?",
-                    (new_quantity, new_average_buy_price, stock_id)
-                )
-        else:
-            # Neue Aktie zum Portfolio hinzufügen (nur bei Kauf relevant)
-            if quantity_change > 0:
-                cursor.execute(
-                    "INSERT INTO portfolios (user_id, ticker, quantity, average_buy_price, created_at, updated_at) VALUES (?, ?, ?, ?, datetime('now'), datetime('now'))",
-                    (user_id, ticker, quantity_change, cost_change / quantity_change)
-                )
+        def apply_trade(conn: sqlite3.Connection) -> None:
+            # Schreibsperre vor dem Lesen holen: gleichzeitige Trades desselben Tickers lesen sonst
+            # beide den alten Bestand und eine Änderung geht verloren
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                _apply_trade(conn.cursor())
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        def _apply_trade(cursor: sqlite3.Cursor) -> None:
+            # Prüfen, ob Aktie bereits im Portfolio
+            cursor.execute("SELECT id, quantity, average_buy_price FROM portfolios WHERE user_id = ? AND ticker = ?", (user_id, ticker))
+            existing_stock = cursor.fetchone()
+
+            if existing_stock:
+                stock_id, current_quantity, current_avg_price = existing_stock
+                new_quantity = current_quantity + quantity_change
+
+                if new_quantity <= 0:
+                    # Aktie komplett verkauft, aus Portfolio entfernen
+                    cursor.execute("DELETE FROM portfolios WHERE id = ?", (stock_id,))
+                else:
+                    # Durchschnittlichen Kaufpreis neu berechnen (nur bei Kauf relevant)
+                    if quantity_change > 0: # Kauf
+                        new_total_cost = (current_quantity * current_avg_price) + cost_change
+                        new_average_buy_price = new_total_cost / new_quantity
+                    else: # Verkauf, Durchschnittspreis bleibt gleich
+                        new_average_buy_price = current_avg_price
+
+                    cursor.execute(
+                        "UPDATE portfolios SET quantity = ?, average_buy_price = ?, updated_at = datetime('now') WHERE id = ?",
+                        (new_quantity, new_average_buy_price, stock_id)
+                    )
             else:
-                # Sollte nicht passieren: Verkauf einer nicht vorhandenen Aktie
-                raise ValueError("Cannot sell stock not in portfolio.")
-        conn.commit()
-        conn.close()
+                # Neue Aktie zum Portfolio hinzufügen (nur bei Kauf relevant)
+                if quantity_change > 0:
+                    cursor.execute(
+                        "INSERT INTO portfolios (user_id, ticker, quantity, average_buy_price, created_at, updated_at) VALUES (?, ?, ?, ?, datetime('now'), datetime('now'))",
+                        (user_id, ticker, quantity_change, cost_change / quantity_change)
+                    )
+                else:
+                    # Sollte nicht passieren: Verkauf einer nicht vorhandenen Aktie
+                    raise ValueError("Cannot sell stock not in portfolio.")
+
+        # Lesen und Schreiben laufen in einer Transaktion auf derselben Verbindung
+        await self.pool.run(apply_trade)
@@ -3,11 +3,16 @@ Extended database access layer with improved error handling and additional metho
 """
 import sqlite3
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Union
 from datetime import datetime
 import logging
 
+import numpy as np
+import pandas as pd
+
 from src.config.config import Config
+from src.database.connection_pool import ConnectionPool, DEFAULT_POOL_SIZE, configure_connection, pragmas_from_config
+from src.database.historical_panel import DateLike, fetch_historical_panel, normalize_panel_request, panel_to_frame
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +23,11 @@ class DBAccessExtended:
     def __init__(self):
         """Initialize database access with configuration."""
         self.db_path = self._get_database_path()
+        self.pool_size = int(Config.get("database", {}).get("connection_pool_size", DEFAULT_POOL_SIZE))
+        self.pragmas = pragmas_from_config()
         self._ensure_database_exists()
+        # Connection pool is created lazily on first query
+        self._pool: Optional[ConnectionPool] = None
     
     def _get_database_path(self) -> str:
         """Get database path from configuration."""
@@ -37,25 +46,36 @@ class DBAccessExtended:
     def _get_connection(self) -> sqlite3.Connection:
         """Get database connection with proper configuration."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = configure_connection(sqlite3.connect(self.db_path), self.pragmas)
             conn.row_factory = sqlite3.Row  # Enable dictionary-like access
             return conn
         except sqlite3.Error as e:
             logger.error(f"Database connection error: {str(e)}")
             raise
     
+    @property
+    def pool(self) -> ConnectionPool:
+        """Lazy create the connection pool that runs all queries off the event loop."""
+        if self._pool is None:
+            self._pool = ConnectionPool(
+                self.db_path, pool_size=self.pool_size, row_factory=sqlite3.Row, pragmas=self.pragmas
+            )
+        return self._pool
+    
+    def close(self) -> None:
+        """Close the connection pool."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+    
     # User management methods
     async def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
+            row = await self.pool.fetchone(
                 "SELECT id, username, hashed_password, created_at, last_login FROM users WHERE username = ?",
                 (username,)
             )
-            row = cursor.fetchone()
-            conn.close()
             
             if row:
                 return {
@@ -74,14 +94,10 @@ class DBAccessExtended:
     async def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
+            row = await self.pool.fetchone(
                 "SELECT id, username, hashed_password, created_at, last_login FROM users WHERE id = ?",
                 (user_id,)
             )
-            row = cursor.fetchone()
-            conn.close()
             
             if row:
                 return {
@@ -100,16 +116,10 @@ class DBAccessExtended:
     async def create_user(self, username: str, hashed_password: str) -> Optional[Dict[str, Any]]:
         """Create new user."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
+            _, user_id = await self.pool.execute(
                 "INSERT INTO users (username, hashed_password, created_at) VALUES (?, ?, ?)",
                 (username, hashed_password, datetime.utcnow())
             )
-            conn.commit()
-            user_id = cursor.lastrowid
-            conn.close()
             
             logger.info(f"Created user '{username}' with ID {user_id}")
             return {
@@ -129,11 +139,7 @@ class DBAccessExtended:
     async def get_all_users(self) -> List[Dict[str, Any]]:
         """Get all users (admin only)."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, username, created_at, last_login FROM users ORDER BY created_at")
-            rows = cursor.fetchall()
-            conn.close()
+            rows = await self.pool.fetchall("SELECT id, username, created_at, last_login FROM users ORDER BY created_at")
             
             return [
                 {
@@ -152,12 +158,7 @@ class DBAccessExtended:
     async def delete_user(self, user_id: int) -> bool:
         """Delete user by ID."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-            conn.commit()
-            rows_affected = cursor.rowcount
-            conn.close()
+            rows_affected, _ = await self.pool.execute("DELETE FROM users WHERE id = ?", (user_id,))
             
             success = rows_affected > 0
             if success:
@@ -172,15 +173,10 @@ class DBAccessExtended:
     async def update_last_login(self, user_id: int) -> bool:
         """Update user's last login timestamp."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
+            rows_affected, _ = await self.pool.execute(
                 "UPDATE users SET last_login = ? WHERE id = ?",
                 (datetime.utcnow(), user_id)
             )
-            conn.commit()
-            rows_affected = cursor.rowcount
-            conn.close()
             
             return rows_affected > 0
             
@@ -192,15 +188,11 @@ class DBAccessExtended:
     async def get_stocks_by_user_id(self, user_id: int) -> List[Dict[str, Any]]:
         """Get all stocks in user's portfolio."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
+            rows = await self.pool.fetchall(
                 """SELECT id, user_id, ticker, quantity, average_buy_price, created_at, updated_at 
                    FROM portfolios WHERE user_id = ? ORDER BY ticker""",
                 (user_id,)
             )
-            rows = cursor.fetchall()
-            conn.close()
             
             return [
                 {
@@ -222,15 +214,11 @@ class DBAccessExtended:
     async def get_stock_by_id(self, stock_id: int) -> Optional[Dict[str, Any]]:
         """Get stock by ID."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
+            row = await self.pool.fetchone(
                 """SELECT id, user_id, ticker, quantity, average_buy_price, created_at, updated_at 
                    FROM portfolios WHERE id = ?""",
                 (stock_id,)
             )
-            row = cursor.fetchone()
-            conn.close()
             
             if row:
                 return {
@@ -257,18 +245,12 @@ class DBAccessExtended:
     ) -> Optional[Dict[str, Any]]:
         """Add stock to user's portfolio."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
             now = datetime.utcnow()
-            cursor.execute(
+            _, stock_id = await self.pool.execute(
                 """INSERT INTO portfolios (user_id, ticker, quantity, average_buy_price, created_at, updated_at) 
                    VALUES (?, ?, ?, ?, ?, ?)""",
                 (user_id, ticker, quantity, average_buy_price, now, now)
             )
-            conn.commit()
-            stock_id = cursor.lastrowid
-            conn.close()
             
             logger.info(f"Added stock {ticker} to portfolio for user {user_id}")
             return {
@@ -296,16 +278,11 @@ class DBAccessExtended:
     ) -> bool:
         """Update stock in portfolio."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
+            rows_affected, _ = await self.pool.execute(
                 """UPDATE portfolios SET quantity = ?, average_buy_price = ?, updated_at = ? 
                    WHERE id = ?""",
                 (quantity, average_buy_price, datetime.utcnow(), stock_id)
             )
-            conn.commit()
-            rows_affected = cursor.rowcount
-            conn.close()
             
             success = rows_affected > 0
             if success:
@@ -320,12 +297,7 @@ class DBAccessExtended:
     async def delete_stock_from_portfolio(self, stock_id: int) -> bool:
         """Delete stock from portfolio."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM portfolios WHERE id = ?", (stock_id,))
-            conn.commit()
-            rows_affected = cursor.rowcount
-            conn.close()
+            rows_affected, _ = await self.pool.execute("DELETE FROM portfolios WHERE id = ?", (stock_id,))
             
             success = rows_affected > 0
             if success:
@@ -345,9 +317,6 @@ class DBAccessExtended:
     ) -> List[Dict[str, Any]]:
         """Get historical data for ticker."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
             query = """
                 SELECT
                     hd.date, hd.open, hd.high, hd.low, hd.close, hd.volume,
@@ -367,9 +336,7 @@ class DBAccessExtended:
                 query += " LIMIT ?"
                 params.append(limit)
             
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            conn.close()
+            rows = await self.pool.fetchall(query, params)
             
             return [dict(row) for row in rows]
             
@@ -377,6 +344,34 @@ class DBAccessExtended:
             logger.error(f"Error getting historical data for {ticker}: {str(e)}")
             raise
     
+    async def get_historical_panel(
+        self,
+        tickers: Union[str, Iterable[str]],
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        columns: Optional[Sequence[str]] = None,
+        as_frame: bool = True
+    ) -> Union[pd.DataFrame, Dict[str, np.ndarray]]:
+        """
+        Get historical data for one or many tickers as columns instead of one dict per row.
+        
+        Args:
+            tickers: Ticker symbol or list of ticker symbols
+            start_date: Optional first date (inclusive)
+            end_date: Optional last date (inclusive)
+            columns: Optional subset of numeric columns (default: all of HISTORICAL_PANEL_COLUMNS)
+            as_frame: Return a long-format DataFrame ('ticker', 'date', columns) if True,
+                      else a dict of contiguous NumPy arrays (float64 per column)
+        """
+        tickers, columns = normalize_panel_request(tickers, columns)
+        try:
+            panel = await self.pool.run(fetch_historical_panel, tickers, columns, start_date, end_date)
+            return panel_to_frame(panel) if as_frame else panel
+            
+        except sqlite3.Error as e:
+            logger.error(f"Error getting historical panel for {len(tickers)} tickers: {str(e)}")
+            raise
+    
     async def get_event_data_for_ticker(self, ticker: str) -> List[Dict[str, Any]]:
         """Get event data for ticker (placeholder implementation)."""
         try:
@@ -392,11 +387,7 @@ class DBAccessExtended:
     async def check_connection(self) -> bool:
         """Check database connection health."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-            conn.close()
+            await self.pool.fetchone("SELECT 1")
             return True
             
         except sqlite3.Error as e:
@@ -405,8 +396,7 @@ class DBAccessExtended:
     
     async def get_database_info(self) -> Dict[str, Any]:
         """Get database information for monitoring."""
-        try:
-            conn = self._get_connection()
+        def collect_info(conn: sqlite3.Connection) -> Dict[str, Any]:
             cursor = conn.cursor()
             
             # Get table counts
@@ -425,9 +415,12 @@ class DBAccessExtended:
             page_count = cursor.fetchone()[0]
             cursor.execute("PRAGMA page_size")
             page_size = cursor.fetchone()[0]
-            db_size_bytes = page_count * page_size
-            
-            conn.close()
+            return {"table_counts": table_counts, "db_size_bytes": page_count * page_size}
+        
+        try:
+            info = await self.pool.run(collect_info)
+            table_counts = info["table_counts"]
+            db_size_bytes = info["db_size_bytes"]
             
             return {
                 "database_path": self.db_path,
@@ -9,8 +9,85 @@ import os
 from datetime import datetime
 import logging
 
+from src.database.connection_pool import configure_connection, pragmas_from_config
+
 logger = logging.getLogger(__name__)
 
+# Indizes für die Kursdaten-Abfragen (Ticker -> Historie sortiert nach Datum).
+# historical_data bekommt einen UNIQUE-Index, damit die Ingestion per Upsert schreiben kann.
+PERFORMANCE_INDEXES = {
+    "idx_historical_data_candidate_date": ("historical_data", ("candidate_id", "date"), True),
+    "idx_stock_historical_data_ticker_date": ("stock_historical_data", ("ticker", "date"), False),
+}
+
+
+def _has_index_on(cursor, table: str, columns, unique: bool = False) -> bool:
+    """Prüft, ob bereits ein Index (auch ein impliziter UNIQUE-Index) mit diesen Spalten existiert"""
+    for index in cursor.execute(f"PRAGMA index_list({table})").fetchall():
+        index_columns = [row[2] for row in cursor.execute(f"PRAGMA index_info({index[1]})").fetchall()]
+        if unique:
+            # Eindeutigkeit gilt nur für genau diese Spalten
+            if index[2] and index_columns == list(columns):
+                return True
+        elif index_columns[:len(columns)] == list(columns):
+            return True
+    return False
+
+
+def has_performance_index(cursor, index_name: str) -> bool:
+    """Prüft, ob der Performance-Index (oder ein gleichwertiger) existiert"""
+    table, columns, unique = PERFORMANCE_INDEXES[index_name]
+    return _has_index_on(cursor, table, columns, unique)
+
+
+def _count_duplicate_rows(cursor, table: str, columns) -> int:
+    """Zählt die Zeilen, die bzgl. der Spalten ein Duplikat einer anderen Zeile sind"""
+    column_list = ", ".join(columns)
+    cursor.execute(f"SELECT COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) AS n FROM {table} GROUP BY {column_list})")
+    return cursor.fetchone()[0]
+
+
+def _remove_duplicate_rows(cursor, table: str, columns) -> int:
+    """Entfernt Duplikate bzgl. der Spalten und behält jeweils die zuletzt eingefügte Zeile"""
+    column_list = ", ".join(columns)
+    cursor.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT MAX(id) FROM {table} GROUP BY {column_list})")
+    if cursor.rowcount:
+        logger.warning(f"⚠️ {cursor.rowcount} doppelte Zeilen in {table} entfernt")
+    return cursor.rowcount
+
+
+def create_performance_indexes(cursor, remove_duplicates: bool = False) -> list:
+    """
+    Legt fehlende Performance-Indizes an und gibt die Namen der neu erstellten zurück.
+
+    Enthält eine Tabelle Duplikate für einen UNIQUE-Index, wird dieser übersprungen, außer
+    remove_duplicates ist gesetzt (nur über DatabaseMigration.tune_schema mit Backup).
+    """
+    created = []
+    for index_name, (table, columns, unique) in PERFORMANCE_INDEXES.items():
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        if cursor.fetchone() is None or _has_index_on(cursor, table, columns, unique):
+            continue
+        if unique:
+            if remove_duplicates:
+                _remove_duplicate_rows(cursor, table, columns)
+            else:
+                duplicates = _count_duplicate_rows(cursor, table, columns)
+                if duplicates:
+                    logger.error(
+                        f"❌ {duplicates} doppelte Zeilen in {table} ({', '.join(columns)}), UNIQUE-Index {index_name} "
+                        "nicht angelegt. Bereinigen mit: python -m src.database.db_migration --remove-duplicates"
+                    )
+                    continue
+            # Ein älterer, nicht eindeutiger Index gleichen Namens wird ersetzt
+            cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+        cursor.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {index_name} ON {table} ({', '.join(columns)})"
+        )
+        created.append(index_name)
+    return created
+
+
 class DatabaseMigration:
     """Database Migration Manager"""
     
@@ -47,7 +124,7 @@ class DatabaseMigration:
         conn.close()
         return status
     
-    def migrate_to_unified_schema(self):
+    def migrate_to_unified_schema(self, remove_duplicates: bool = False):
         """Migriere zu einheitlichem Schema"""
         print("🔄 Starte Database Migration...")
         
@@ -74,7 +151,37 @@ class DatabaseMigration:
         conn.commit()
         conn.close()
         
+        # 6. Performance-Tuning (Indizes, WAL); Backup wurde bereits in Schritt 1 erstellt
+        self.tune_schema(remove_duplicates=remove_duplicates, backup=False)
+        
         print("✅ Database Migration abgeschlossen")
+    
+    def tune_schema(self, remove_duplicates: bool = False, backup: bool = True):
+        """
+        Performance-Tuning: WAL-Modus und Indizes für die Kursdaten-Abfragen.
+
+        Args:
+            remove_duplicates: Doppelte Zeilen in historical_data löschen (neueste bleibt), damit der
+                               UNIQUE-Index angelegt werden kann; vorher wird ein Backup erstellt
+            backup: Backup vor dem Löschen von Duplikaten erstellen
+        """
+        if remove_duplicates and backup:
+            self.backup_database()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # journal_mode=WAL wird in der Datenbankdatei gespeichert
+            configure_connection(conn, pragmas_from_config())
+            cursor = conn.cursor()
+            created = create_performance_indexes(cursor, remove_duplicates=remove_duplicates)
+            conn.commit()
+            if created:
+                # Statistiken für den Query-Planer aktualisieren
+                cursor.execute("ANALYZE")
+                conn.commit()
+            logger.info(f"✅ Schema-Tuning abgeschlossen, neue Indizes: {created or 'keine'}")
+            return created
+        finally:
+            conn.close()
         
     def _create_unified_tables(self, cursor):
         """Erstelle einheitliche Tabellen-Struktur"""
@@ -198,6 +305,15 @@ class DatabaseMigration:
 
 def main():
     """Hauptfunktion für Migration"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="DA-KI Database Migration Tool")
+    parser.add_argument(
+        "--remove-duplicates", action="store_true",
+        help="Doppelte Zeilen in historical_data löschen (nach Backup), damit der UNIQUE-Index angelegt wird"
+    )
+    args = parser.parse_args()
+
     print("🗄️ DA-KI Database Migration Tool")
     print("=" * 40)
     
@@ -209,10 +325,14 @@ def main():
     
     if not status["legacy"] and not status["new_api"]:
         print("📋 Neue Installation - erstelle frisches Schema")
-        migration._create_unified_tables(sqlite3.connect(migration.db_path).cursor())
+        conn = sqlite3.connect(migration.db_path)
+        migration._create_unified_tables(conn.cursor())
+        conn.commit()
+        conn.close()
+        migration.tune_schema(remove_duplicates=args.remove_duplicates)
     else:
         print("🔄 Migration erforderlich")
-        migration.migrate_to_unified_schema()
+        migration.migrate_to_unified_schema(remove_duplicates=args.remove_duplicates)
     
     print("✅ Migration abgeschlossen!")
 
@@ -1,6 +1,9 @@
 import sqlite3
 import os
 
+from src.database.connection_pool import configure_connection, pragmas_from_config
+from src.database.db_migration import create_performance_indexes
+
 DATABASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data')
 DATABASE_PATH = os.path.join(DATABASE_DIR, 'daki.db')
 
@@ -12,7 +15,7 @@ def initialize_db():
 
     conn = None
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = configure_connection(sqlite3.connect(DATABASE_PATH), pragmas_from_config())
         cursor = conn.cursor()
 
         # Tabelle: candidates
@@ -99,6 +102,9 @@ def initialize_db():
             )
         ''')
 
+        # Indizes für die Kursdaten-Abfragen
+        create_performance_indexes(cursor)
+
         conn.commit()
         print(f"Database initialized successfully at {DATABASE_PATH}")
     except sqlite3.Error as e:
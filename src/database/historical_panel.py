@@ -0,0 +1,99 @@
+"""
+Columnar bulk reads of historical_data.
+
+Rows are fetched as plain tuples and transposed once into contiguous column arrays
+(float64 for all numeric columns), instead of allocating one dict per row.
+"""
+import datetime
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Numeric columns of historical_data that can be read into a panel
+HISTORICAL_PANEL_COLUMNS = [
+    "open", "high", "low", "close", "volume",
+    "rsi", "macd", "macd_signal", "macd_hist", "ema10", "ema20", "ema50",
+    "bollinger_upper", "bollinger_middle", "bollinger_lower",
+    "atr", "stoch_k", "stoch_d", "roc5", "roc10",
+]
+
+DateLike = Union[str, datetime.date]
+
+
+def normalize_panel_request(
+    tickers: Union[str, Iterable[str]],
+    columns: Optional[Sequence[str]] = None
+) -> tuple:
+    """Validate tickers and columns. Returns (unique tickers in request order, columns)."""
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    tickers = list(dict.fromkeys(tickers))
+    columns = list(HISTORICAL_PANEL_COLUMNS if columns is None else columns)
+    unknown = [column for column in columns if column not in HISTORICAL_PANEL_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown historical_data columns: {unknown}")
+    return tickers, columns
+
+
+def _format_date(value: DateLike) -> str:
+    """Dates are stored as ISO text (YYYY-MM-DD); date objects are converted to that format."""
+    if isinstance(value, str):
+        return value
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def fetch_historical_panel(
+    conn: sqlite3.Connection,
+    tickers: List[str],
+    columns: List[str],
+    start_date: Optional[DateLike] = None,
+    end_date: Optional[DateLike] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Read the history of several tickers into column arrays.
+
+    Rows are ordered by ticker (in request order) and date. Tickers without data are omitted.
+
+    Returns:
+        Dict with 'ticker' (object array), 'date' (datetime64[ns]) and one float64 array per column.
+    """
+    query = (
+        f"SELECT hd.date{''.join(f', hd.{column}' for column in columns)} "
+        "FROM historical_data hd JOIN candidates c ON hd.candidate_id = c.id WHERE c.ticker = ?"
+    )
+    date_params = []
+    if start_date is not None:
+        query += " AND hd.date >= ?"
+        date_params.append(_format_date(start_date))
+    if end_date is not None:
+        query += " AND hd.date <= ?"
+        date_params.append(_format_date(end_date))
+    query += " ORDER BY hd.date ASC"
+
+    cursor = conn.cursor()
+    cursor.row_factory = None  # plain tuples, also on connections using sqlite3.Row
+    found_tickers, counts, rows = [], [], []
+    for ticker in tickers:
+        # Same SQL text for every ticker, so the prepared statement is reused
+        ticker_rows = cursor.execute(query, [ticker, *date_params]).fetchall()
+        if ticker_rows:
+            found_tickers.append(ticker)
+            counts.append(len(ticker_rows))
+            rows.extend(ticker_rows)
+
+    column_values = list(zip(*rows)) if rows else [()] * (len(columns) + 1)
+    panel = {
+        "ticker": np.repeat(np.array(found_tickers, dtype=object), counts),
+        "date": pd.to_datetime(pd.Index(column_values[0], dtype=object)).values.astype("datetime64[ns]"),
+    }
+    for column, values in zip(columns, column_values[1:]):
+        # NULL becomes NaN
+        panel[column] = np.array(values, dtype=np.float64)
+    return panel
+
+
+def panel_to_frame(panel: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Long-format DataFrame (one row per ticker and date) as expected by ScoringEngine.calculate_total_scores."""
+    return pd.DataFrame(panel, copy=False)
@@ -75,7 +75,7 @@ class DAKIApiClient:
             dict: Token-Daten oder Fehler
         """
         data = {"username": username, "password": password}
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/api/auth/token",
             data=data,  # Form-encoded für OAuth2
             headers={"Content-Type": "application/x-www-form-urlencoded"}
@@ -48,6 +48,8 @@ class DAKIDashboardApp:
         )
         self.app.title = app_title
         self.api_base_url = api_base_url
+        # Eine Session für alle API-Calls: Verbindungen werden per Keep-Alive wiederverwendet
+        self.http_session = requests.Session()
         
         # Services initialisieren
         try:
@@ -219,7 +221,7 @@ class DAKIDashboardApp:
         """Hole aktuellen System-Status"""
         try:
             # API-Call für System-Status
-            response = requests.get(f"{self.api_base_url}/api/system/status", timeout=5)
+            response = self.http_session.get(f"{self.api_base_url}/api/system/status", timeout=5)
             if response.status_code == 200:
                 status_data = response.json()
                 return self.layout_components.create_status_cards(status_data)
@@ -250,13 +252,13 @@ class DAKIDashboardApp:
                 headers['Authorization'] = f"Bearer {auth_token}"
             
             if method == "GET":
-                response = requests.get(url, headers=headers, timeout=10)
+                response = self.http_session.get(url, headers=headers, timeout=10)
             elif method == "POST":
-                response = requests.post(url, headers=headers, json=data, timeout=10)
+                response = self.http_session.post(url, headers=headers, json=data, timeout=10)
             elif method == "PUT":
-                response = requests.put(url, headers=headers, json=data, timeout=10)
+                response = self.http_session.put(url, headers=headers, json=data, timeout=10)
             elif method == "DELETE":
-                response = requests.delete(url, headers=headers, timeout=10)
+                response = self.http_session.delete(url, headers=headers, timeout=10)
             else:
                 return {"error": f"Unsupported method: {method}"}
             
@@ -25,6 +25,7 @@ from src.services.analysis_service import AnalysisService
 # Import utilities
 from src.auth.jwt_utils import create_access_token, create_refresh_token, verify_token
 from src.database.db_access_extended import DBAccessExtended
+from src.plugins.plugin_manager import PluginManager
 from src.config.config import Config
 
 # Configure logging
@@ -54,10 +55,41 @@ app.add_middleware(
 
 # Initialize services
 db_access = DBAccessExtended()
+plugin_manager = PluginManager()
 user_service = UserService(db_access)
-portfolio_service = PortfolioService(db_access)
+portfolio_service = PortfolioService(db_access, plugin_manager=plugin_manager)
 analysis_service = AnalysisService(db_access)
 
+
+async def start_plugins():
+    """Load the data source plugins and initialize them from config (schema defaults if not configured)."""
+    await plugin_manager.load_plugins()
+    configured = Config.get("plugins", {})
+    plugin_configs = {}
+    for name in plugin_manager.plugins:
+        plugin_config = configured.get(name)
+        if not plugin_config:
+            schema = plugin_manager.get_plugin_config_schema(name) or {}
+            plugin_config = {key: spec["default"] for key, spec in schema.items() if "default" in spec}
+        plugin_configs[name] = plugin_config
+    await plugin_manager.initialize_plugins(plugin_configs)
+
+
+@app.on_event("startup")
+async def warm_up_services():
+    """Start the data source plugins and load the ML model before the first request."""
+    await start_plugins()
+    await analysis_service.warm_up()
+
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    """Release plugins, worker pools and database connections held by the services."""
+    await plugin_manager.close_plugins()
+    analysis_service.close()
+    db_access.close()
+
+
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
 
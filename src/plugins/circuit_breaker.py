@@ -0,0 +1,143 @@
+"""
+Circuit breaker for data source plugins.
+
+Plugins retry failed requests several times with growing pauses, so a provider that is down
+used to stall every request touching it. After failure_threshold consecutive failures the
+circuit opens and requests fail immediately. Once reset_timeout has passed, a limited number
+of probe requests are let through (half-open); a successful probe closes the circuit again.
+"""
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.config.config import Config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request while the circuit of a plugin is open."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker for the requests of one plugin."""
+
+    def __init__(
+        self,
+        name: str = "",
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize CircuitBreaker.
+
+        Args:
+            name: Plugin name (for error messages)
+            failure_threshold: Consecutive failed attempts that open the circuit
+            reset_timeout: Seconds the circuit stays open before probe requests are allowed
+            half_open_max_calls: Probe requests allowed at the same time while half-open
+            clock: Monotonic time source
+        """
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+        self.clock = clock
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls, name: str) -> "CircuitBreaker":
+        """Create a breaker from the data_sources.circuit_breaker config section."""
+        config = Config.get("data_sources", {}).get("circuit_breaker", {})
+        return cls(
+            name,
+            failure_threshold=config.get("failure_threshold", 5),
+            reset_timeout=config.get("reset_timeout_seconds", 30),
+            half_open_max_calls=config.get("half_open_max_calls", 1),
+        )
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now (counts as a probe while half-open)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now."""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit of {self.name or 'plugin'} is open, request not sent")
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self._state = CLOSED
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self._state == HALF_OPEN or (self._state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self._state = OPEN
+            self._opened_at = self.clock()
+            self.trips += 1
+
+    def record_cancelled(self) -> None:
+        """A request was cancelled without an outcome; free its probe slot."""
+        if self._state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def get_status(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "retry_in": round(max(0.0, self._opened_at + self.reset_timeout - self.clock()), 2) if state == OPEN else 0.0,
+        }
+
+
+def guarded_request(request: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorator for a plugin's request method: fail fast while the plugin's circuit_breaker
+    (set by PluginManager) is open, and report the outcome of each request to it.
+    """
+    @functools.wraps(request)
+    async def wrapper(self, *args, **kwargs):
+        breaker: Optional[CircuitBreaker] = getattr(self, "circuit_breaker", None)
+        if breaker is None:
+            return await request(self, *args, **kwargs)
+        breaker.check()
+        try:
+            response = await request(self, *args, **kwargs)
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            raise
+        except CircuitOpenError:
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return response
+
+    return wrapper
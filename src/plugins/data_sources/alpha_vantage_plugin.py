@@ -9,6 +9,9 @@ from datetime import datetime, timedelta
 import json
 
 from .data_source_plugin import DataSourcePlugin
+from ..circuit_breaker import guarded_request
+from ..response_cache import cached_response
+from ..rate_limiter import AsyncRateLimiter, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +35,8 @@ class AlphaVantagePlugin(DataSourcePlugin):
         self.api_key: Optional[str] = None
         self.session: Optional[aiohttp.ClientSession] = None
         self.rate_limit_delay = 12  # 5 calls per minute = 12 seconds between calls
+        self.max_concurrent_requests = 1
+        self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
         self.last_call_time = 0
         self.max_retries = 3
         self.timeout = 30
@@ -82,6 +87,13 @@ class AlphaVantagePlugin(DataSourcePlugin):
                 "min": 1,
                 "max": 60
             },
+            "max_concurrent_requests": {
+                "type": "integer",
+                "description": "Maximum number of requests in flight at the same time",
+                "default": 1,
+                "min": 1,
+                "max": 20
+            },
             "max_retries": {
                 "type": "integer",
                 "description": "Maximum number of retry attempts for failed requests",
@@ -111,12 +123,14 @@ class AlphaVantagePlugin(DataSourcePlugin):
                 raise ValueError("Alpha Vantage API key is required")
             
             self.rate_limit_delay = config.get("rate_limit_delay", 12)
+            self.max_concurrent_requests = config.get("max_concurrent_requests", 1)
+            self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
             self.max_retries = config.get("max_retries", 3)
             self.timeout = config.get("timeout", 30)
             
             # Create aiohttp session
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            self.session = self._create_session(timeout=timeout)
             
             logger.info(f"Alpha Vantage plugin initialized with rate limit: {self.rate_limit_delay}s")
             
@@ -124,20 +138,13 @@ class AlphaVantagePlugin(DataSourcePlugin):
             logger.error(f"Failed to initialize Alpha Vantage plugin: {str(e)}")
             raise
     
+    @cached_response
+    @guarded_request
     async def _rate_limited_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Make rate-limited API request to Alpha Vantage."""
         if not self.session:
             raise RuntimeError("Plugin not initialized")
         
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        time_since_last_call = current_time - self.last_call_time
-        
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            await asyncio.sleep(sleep_time)
-        
         # Add API key to parameters
         params["apikey"] = self.api_key
         
@@ -145,7 +152,7 @@ class AlphaVantagePlugin(DataSourcePlugin):
             try:
                 logger.debug(f"Alpha Vantage API request (attempt {attempt + 1}): {params.get('function', 'unknown')}")
                 
-                async with self.session.get(self.base_url, params=params) as response:
+                async with self.rate_limiter, self.session.get(self.base_url, params=params) as response:
                     self.last_call_time = asyncio.get_event_loop().time()
                     
                     if response.status == 200:
@@ -159,7 +166,7 @@ class AlphaVantagePlugin(DataSourcePlugin):
                             # Rate limit exceeded
                             if "call frequency" in data["Note"].lower():
                                 logger.warning("Alpha Vantage rate limit exceeded, waiting longer")
-                                await asyncio.sleep(60)  # Wait 1 minute
+                                self.rate_limiter.defer(60)  # Wait 1 minute
                                 continue
                             else:
                                 logger.warning(f"Alpha Vantage note: {data['Note']}")
@@ -168,9 +175,9 @@ class AlphaVantagePlugin(DataSourcePlugin):
                     
                     elif response.status == 429:
                         # Rate limit exceeded
-                        wait_time = (attempt + 1) * 30
+                        wait_time = parse_retry_after(response.headers.get("Retry-After"), (attempt + 1) * 30)
                         logger.warning(f"Rate limit exceeded, waiting {wait_time} seconds")
-                        await asyncio.sleep(wait_time)
+                        self.rate_limiter.defer(wait_time)
                         continue
                     
                     else:
@@ -180,13 +187,13 @@ class AlphaVantagePlugin(DataSourcePlugin):
                 logger.warning(f"Alpha Vantage request timeout (attempt {attempt + 1})")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 5)
+                await self._retry_pause((attempt + 1) * 5)
             
             except Exception as e:
                 logger.error(f"Alpha Vantage request failed (attempt {attempt + 1}): {str(e)}")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 2)
+                await self._retry_pause((attempt + 1) * 2)
         
         raise RuntimeError(f"Alpha Vantage request failed after {self.max_retries} attempts")
     
@@ -506,6 +513,7 @@ class AlphaVantagePlugin(DataSourcePlugin):
             "status": "active" if self.session and not self.session.closed else "inactive",
             "api_key_configured": bool(self.api_key),
             "rate_limit_delay": self.rate_limit_delay,
+            "rate_limiter": self.rate_limiter.get_status(),
             "last_call_time": self.last_call_time,
             "max_retries": self.max_retries,
             "timeout": self.timeout,
@@ -10,6 +10,9 @@ from datetime import datetime, timedelta
 import time
 
 from .data_source_plugin import DataSourcePlugin
+from ..circuit_breaker import guarded_request
+from ..response_cache import cached_response
+from ..rate_limiter import AsyncRateLimiter, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +43,8 @@ class CoinGeckoPlugin(DataSourcePlugin):
         self.api_key: Optional[str] = None  # Optional for pro tier
         self.session: Optional[aiohttp.ClientSession] = None
         self.rate_limit_delay = 1.2  # Free tier: 50 calls/minute
+        self.max_concurrent_requests = 2
+        self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
         self.last_call_time = 0
         self.max_retries = 3
         self.timeout = 30
@@ -114,6 +119,13 @@ class CoinGeckoPlugin(DataSourcePlugin):
                 "min": 0.1,
                 "max": 5.0
             },
+            "max_concurrent_requests": {
+                "type": "integer",
+                "description": "Maximum number of requests in flight at the same time",
+                "default": 2,
+                "min": 1,
+                "max": 20
+            },
             "max_retries": {
                 "type": "integer",
                 "description": "Maximum number of retry attempts for failed requests",
@@ -146,6 +158,8 @@ class CoinGeckoPlugin(DataSourcePlugin):
         try:
             self.api_key = config.get("api_key")
             self.rate_limit_delay = config.get("rate_limit_delay", 1.2)
+            self.max_concurrent_requests = config.get("max_concurrent_requests", 2)
+            self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
             self.max_retries = config.get("max_retries", 3)
             self.timeout = config.get("timeout", 30)
             self.default_currency = config.get("default_currency", "usd")
@@ -162,7 +176,7 @@ class CoinGeckoPlugin(DataSourcePlugin):
             if self.api_key:
                 headers["x-cg-pro-api-key"] = self.api_key
             
-            self.session = aiohttp.ClientSession(timeout=timeout, headers=headers)
+            self.session = self._create_session(timeout=timeout, headers=headers)
             
             logger.info(f"CoinGecko plugin initialized (Pro: {bool(self.api_key)}) with rate limit: {self.rate_limit_delay}s")
             
@@ -175,26 +189,20 @@ class CoinGeckoPlugin(DataSourcePlugin):
         symbol_upper = symbol.upper()
         return self.coin_mappings.get(symbol_upper, symbol.lower())
     
+    @cached_response
+    @guarded_request
     async def _rate_limited_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
         """Make rate-limited API request to CoinGecko."""
         if not self.session:
             raise RuntimeError("Plugin not initialized")
         
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        time_since_last_call = current_time - self.last_call_time
-        
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            await asyncio.sleep(sleep_time)
-        
         url = f"{self.base_url}{endpoint}"
         
         for attempt in range(self.max_retries):
             try:
                 logger.debug(f"CoinGecko API request (attempt {attempt + 1}): {endpoint}")
                 
-                async with self.session.get(url, params=params) as response:
+                async with self.rate_limiter, self.session.get(url, params=params) as response:
                     self.last_call_time = asyncio.get_event_loop().time()
                     
                     if response.status == 200:
@@ -203,9 +211,9 @@ class CoinGeckoPlugin(DataSourcePlugin):
                     
                     elif response.status == 429:
                         # Rate limit exceeded
-                        wait_time = (attempt + 1) * 60  # CoinGecko suggests 1-minute wait
+                        wait_time = parse_retry_after(response.headers.get("Retry-After"), (attempt + 1) * 60)  # CoinGecko suggests 1-minute wait
                         logger.warning(f"CoinGecko rate limit exceeded, waiting {wait_time} seconds")
-                        await asyncio.sleep(wait_time)
+                        self.rate_limiter.defer(wait_time)
                         continue
                     
                     elif response.status == 404:
@@ -221,13 +229,13 @@ class CoinGeckoPlugin(DataSourcePlugin):
                 logger.warning(f"CoinGecko request timeout (attempt {attempt + 1})")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 5)
+                await self._retry_pause((attempt + 1) * 5)
             
             except Exception as e:
                 logger.error(f"CoinGecko request failed (attempt {attempt + 1}): {str(e)}")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 2)
+                await self._retry_pause((attempt + 1) * 2)
         
         raise RuntimeError(f"CoinGecko request failed after {self.max_retries} attempts")
     
@@ -359,6 +367,51 @@ class CoinGeckoPlugin(DataSourcePlugin):
             logger.error(f"Error fetching OHLCV data for {ticker}: {str(e)}")
             return []
     
+    async def fetch_quotes_batch(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch current prices for many coins with one /simple/price call.
+        
+        Args:
+            tickers: Crypto symbols (e.g. "BTC") or CoinGecko ids
+            
+        Returns:
+            Dictionary {ticker: quote}; tickers without a price are omitted
+        """
+        coin_ids = {ticker: self._get_coin_id(ticker) for ticker in tickers}
+        quotes = {}
+        try:
+            currency = self.default_currency
+            params = {
+                "ids": ",".join(sorted(set(coin_ids.values()))),
+                "vs_currencies": currency,
+                "include_24hr_change": "true",
+                "include_24hr_vol": "true",
+                "include_last_updated_at": "true"
+            }
+            data = await self._rate_limited_request(self.endpoints["simple_price"], params)
+            
+            for ticker, coin_id in coin_ids.items():
+                item = (data or {}).get(coin_id) or {}
+                if item.get(currency) is None:
+                    continue
+                updated_at = item.get("last_updated_at")
+                quotes[ticker] = {
+                    "ticker": ticker,
+                    "price": float(item[currency]),
+                    "change": None,
+                    "change_percent": item.get(f"{currency}_24h_change"),
+                    "volume": item.get(f"{currency}_24h_vol"),
+                    "timestamp": datetime.fromtimestamp(updated_at).isoformat() if updated_at else None,
+                    "source": "coingecko"
+                }
+            
+            logger.info(f"Fetched {len(quotes)} of {len(coin_ids)} prices from CoinGecko")
+            return quotes
+        
+        except Exception as e:
+            logger.error(f"Error fetching prices for {len(coin_ids)} coins: {str(e)}")
+            return quotes
+    
     async def fetch_technical_indicators(
         self,
         ticker: str,
@@ -637,6 +690,7 @@ class CoinGeckoPlugin(DataSourcePlugin):
             "api_key_configured": bool(self.api_key),
             "is_pro_account": bool(self.api_key and self.enable_pro_features),
             "rate_limit_delay": self.rate_limit_delay,
+            "rate_limiter": self.rate_limiter.get_status(),
             "last_call_time": self.last_call_time,
             "max_retries": self.max_retries,
             "timeout": self.timeout,
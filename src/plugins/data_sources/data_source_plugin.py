@@ -1,12 +1,48 @@
 import abc
+import asyncio
+import aiohttp
+from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
+from ..circuit_breaker import CLOSED, CircuitOpenError
+
 class DataSourcePlugin(abc.ABC):
     """
     Abstrakte Basisklasse für DA-KI Datenquellen-Plugins.
     Alle Datenquellen-Plugins müssen von dieser Klasse erben und ihre abstrakten Methoden implementieren.
     """
 
+    # Gemeinsamer Antwort-Cache (ResponseCache), wird vom PluginManager gesetzt.
+    # Request-Methoden mit @cached_response nutzen ihn, ohne Cache wird direkt angefragt.
+    response_cache = None
+
+    # Circuit Breaker des Plugins (CircuitBreaker), wird vom PluginManager gesetzt.
+    # Request-Methoden mit @guarded_request schlagen bei offenem Circuit sofort fehl.
+    circuit_breaker = None
+
+    # Gemeinsame HTTP-Verbindungen (HttpClientFactory), wird vom PluginManager gesetzt.
+    http_client = None
+
+    def _create_session(self, timeout: aiohttp.ClientTimeout, headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientSession:
+        """
+        Erstellt die HTTP-Session des Plugins. Mit http_client teilen sich alle Plugins einen
+        Verbindungspool (Keep-Alive, DNS-Cache), sonst erhält das Plugin einen eigenen.
+        """
+        if self.http_client is not None:
+            return self.http_client.create_session(timeout=timeout, headers=headers)
+        return aiohttp.ClientSession(timeout=timeout, headers=headers)
+
+    async def _retry_pause(self, seconds: float) -> None:
+        """
+        Wartet vor dem nächsten Versuch einer fehlgeschlagenen Anfrage. Der Fehlversuch zählt
+        für den Circuit Breaker; ist der Circuit danach offen, wird nicht erneut versucht.
+        """
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_failure()
+            if self.circuit_breaker.state != CLOSED:
+                raise CircuitOpenError(f"Circuit of {self.get_name()} opened, giving up retries")
+        await asyncio.sleep(seconds)
+
     @abc.abstractmethod
     def get_name(self) -> str:
         """
@@ -59,6 +95,63 @@ class DataSourcePlugin(abc.ABC):
         """
         pass
 
+    async def fetch_ohlcv_batch(
+        self, tickers: List[str], start_date: str, end_date: str, interval: str = "daily"
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Ruft OHLCV-Daten für mehrere Ticker ab.
+        Standard: parallele Einzelabfragen über fetch_ohlcv_data (begrenzt durch den Rate-Limiter des Plugins).
+        Plugins mit Batch-Endpunkt überschreiben diese Methode.
+        Args:
+            tickers: Liste von Tickersymbolen.
+            start_date: Startdatum im Format YYYY-MM-DD.
+            end_date: Enddatum im Format YYYY-MM-DD.
+            interval: Datenintervall.
+        Returns:
+            Dictionary {Ticker: OHLCV-Liste wie bei fetch_ohlcv_data}, leere Liste bei Fehlern.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        results = await asyncio.gather(
+            *(self.fetch_ohlcv_data(ticker, start_date, end_date, interval) for ticker in tickers),
+            return_exceptions=True
+        )
+        return {ticker: [] if isinstance(result, Exception) else result for ticker, result in zip(tickers, results)}
+
+    async def fetch_quotes_batch(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Ruft aktuelle Kurse für mehrere Ticker ab.
+        Standard: letzter Tagesbalken aus fetch_ohlcv_batch. Plugins mit Quote-Endpunkt für
+        viele Symbole (ein Aufruf für alle Ticker) überschreiben diese Methode.
+        Args:
+            tickers: Liste von Tickersymbolen.
+        Returns:
+            Dictionary {Ticker: Kurs}, Ticker ohne Daten fehlen.
+            Beispiel: {"AAPL": {"ticker": "AAPL", "price": ..., "change": ..., "change_percent": ...,
+                                "volume": ..., "timestamp": "...", "source": "..."}}
+        """
+        end = datetime.now()
+        # Eine Woche deckt Wochenenden und Feiertage ab
+        histories = await self.fetch_ohlcv_batch(
+            tickers, (end - timedelta(days=7)).strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+        )
+        quotes = {}
+        for ticker, bars in histories.items():
+            if not bars:
+                continue
+            last = bars[-1]
+            previous_close = bars[-2]["close"] if len(bars) > 1 else None
+            change = last["close"] - previous_close if previous_close else None
+            quotes[ticker] = {
+                "ticker": ticker,
+                "price": last["close"],
+                "change": change,
+                "change_percent": change / previous_close * 100 if change is not None else None,
+                "volume": last.get("volume"),
+                "timestamp": last.get("timestamp", last.get("date")),
+                "source": last.get("source", self.get_name()),
+            }
+        return quotes
+
     @abc.abstractmethod
     async def fetch_technical_indicators(
         self, ticker: str, indicator_type: str, params: Dict[str, Any]
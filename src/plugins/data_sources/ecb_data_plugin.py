@@ -10,6 +10,9 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 
 from .data_source_plugin import DataSourcePlugin
+from ..circuit_breaker import guarded_request
+from ..response_cache import cached_response
+from ..rate_limiter import AsyncRateLimiter, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +44,8 @@ class ECBDataPlugin(DataSourcePlugin):
         # No API key required
         self.session: Optional[aiohttp.ClientSession] = None
         self.rate_limit_delay = 0.2  # ECB allows reasonable rate limits
+        self.max_concurrent_requests = 4
+        self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
         self.last_call_time = 0
         self.max_retries = 3
         self.timeout = 30
@@ -156,6 +161,13 @@ class ECBDataPlugin(DataSourcePlugin):
                 "min": 0.1,
                 "max": 2.0
             },
+            "max_concurrent_requests": {
+                "type": "integer",
+                "description": "Maximum number of requests in flight at the same time",
+                "default": 4,
+                "min": 1,
+                "max": 20
+            },
             "max_retries": {
                 "type": "integer",
                 "description": "Maximum number of retry attempts for failed requests",
@@ -188,6 +200,8 @@ class ECBDataPlugin(DataSourcePlugin):
         """Initialize plugin with configuration."""
         try:
             self.rate_limit_delay = config.get("rate_limit_delay", 0.2)
+            self.max_concurrent_requests = config.get("max_concurrent_requests", 4)
+            self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
             self.max_retries = config.get("max_retries", 3)
             self.timeout = config.get("timeout", 30)
             self.default_format = config.get("default_format", "json")
@@ -200,7 +214,7 @@ class ECBDataPlugin(DataSourcePlugin):
                 "User-Agent": "DA-KI Portfolio Manager"
             }
             
-            self.session = aiohttp.ClientSession(timeout=timeout, headers=headers)
+            self.session = self._create_session(timeout=timeout, headers=headers)
             
             logger.info(f"ECB Data plugin initialized with rate limit: {self.rate_limit_delay}s")
             
@@ -208,26 +222,20 @@ class ECBDataPlugin(DataSourcePlugin):
             logger.error(f"Failed to initialize ECB Data plugin: {str(e)}")
             raise
     
+    @cached_response
+    @guarded_request
     async def _rate_limited_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
         """Make rate-limited API request to ECB."""
         if not self.session:
             raise RuntimeError("Plugin not initialized")
         
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        time_since_last_call = current_time - self.last_call_time
-        
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            await asyncio.sleep(sleep_time)
-        
         url = f"{self.base_url}{endpoint}"
         
         for attempt in range(self.max_retries):
             try:
                 logger.debug(f"ECB API request (attempt {attempt + 1}): {endpoint}")
                 
-                async with self.session.get(url, params=params) as response:
+                async with self.rate_limiter, self.session.get(url, params=params) as response:
                     self.last_call_time = asyncio.get_event_loop().time()
                     
                     if response.status == 200:
@@ -236,7 +244,14 @@ class ECBDataPlugin(DataSourcePlugin):
                         else:
                             data = await response.text()
                         return data
-                    
+
+                    elif response.status == 429:
+                        # Rate limit exceeded
+                        wait_time = parse_retry_after(response.headers.get("Retry-After"), (attempt + 1) * 10)
+                        logger.warning(f"ECB rate limit exceeded, waiting {wait_time} seconds")
+                        self.rate_limiter.defer(wait_time)
+                        continue
+
                     elif response.status == 404:
                         # Data not found
                         logger.warning(f"ECB data not found: {endpoint}")
@@ -255,13 +270,13 @@ class ECBDataPlugin(DataSourcePlugin):
                 logger.warning(f"ECB request timeout (attempt {attempt + 1})")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 5)
+                await self._retry_pause((attempt + 1) * 5)
             
             except Exception as e:
                 logger.error(f"ECB request failed (attempt {attempt + 1}): {str(e)}")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 2)
+                await self._retry_pause((attempt + 1) * 2)
         
         raise RuntimeError(f"ECB request failed after {self.max_retries} attempts")
     
@@ -714,6 +729,7 @@ class ECBDataPlugin(DataSourcePlugin):
             "name": self.name,
             "status": "active" if self.session and not self.session.closed else "inactive",
             "rate_limit_delay": self.rate_limit_delay,
+            "rate_limiter": self.rate_limiter.get_status(),
             "last_call_time": self.last_call_time,
             "max_retries": self.max_retries,
             "timeout": self.timeout,
@@ -8,6 +8,9 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 
 from .data_source_plugin import DataSourcePlugin
+from ..circuit_breaker import guarded_request
+from ..response_cache import cached_response
+from ..rate_limiter import AsyncRateLimiter, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +36,13 @@ class FinancialModelingPrepPlugin(DataSourcePlugin):
         self.api_key: Optional[str] = None
         self.session: Optional[aiohttp.ClientSession] = None
         self.rate_limit_delay = 0.2  # FMP allows good rate limits for paid plans
+        self.max_concurrent_requests = 4
+        self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
         self.last_call_time = 0
         self.max_retries = 3
         self.timeout = 30
+        self.historical_batch_size = 5  # Symbols per historical price request (API limit)
+        self.quote_batch_size = 100  # Symbols per quote request
         
         # API version
         self.api_version = "v3"
@@ -87,6 +94,13 @@ class FinancialModelingPrepPlugin(DataSourcePlugin):
                 "min": 0.1,
                 "max": 2.0
             },
+            "max_concurrent_requests": {
+                "type": "integer",
+                "description": "Maximum number of requests in flight at the same time",
+                "default": 4,
+                "min": 1,
+                "max": 20
+            },
             "max_retries": {
                 "type": "integer",
                 "description": "Maximum number of retry attempts for failed requests",
@@ -116,12 +130,14 @@ class FinancialModelingPrepPlugin(DataSourcePlugin):
                 raise ValueError("Financial Modeling Prep API key is required")
             
             self.rate_limit_delay = config.get("rate_limit_delay", 0.2)
+            self.max_concurrent_requests = config.get("max_concurrent_requests", 4)
+            self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
             self.max_retries = config.get("max_retries", 3)
             self.timeout = config.get("timeout", 30)
             
             # Create aiohttp session
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            self.session = self._create_session(timeout=timeout)
             
             logger.info(f"Financial Modeling Prep plugin initialized with rate limit: {self.rate_limit_delay}s")
             
@@ -129,19 +145,13 @@ class FinancialModelingPrepPlugin(DataSourcePlugin):
             logger.error(f"Failed to initialize Financial Modeling Prep plugin: {str(e)}")
             raise
     
+    @cached_response
+    @guarded_request
     async def _rate_limited_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
         """Make rate-limited API request to Financial Modeling Prep."""
         if not self.session:
             raise RuntimeError("Plugin not initialized")
         
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        time_since_last_call = current_time - self.last_call_time
-        
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            await asyncio.sleep(sleep_time)
-        
         # Prepare parameters
         if params is None:
             params = {}
@@ -155,7 +165,7 @@ class FinancialModelingPrepPlugin(DataSourcePlugin):
             try:
                 logger.debug(f"FMP API request (attempt {attempt + 1}): {endpoint}")
                 
-                async with self.session.get(url, params=params) as response:
+                async with self.rate_limiter, self.session.get(url, params=params) as response:
                     self.last_call_time = asyncio.get_event_loop().time()
                     
                     if response.status == 200:
@@ -169,9 +179,9 @@ class FinancialModelingPrepPlugin(DataSourcePlugin):
                     
                     elif response.status == 429:
                         # Rate limit exceeded
-                        wait_time = (attempt + 1) * 10
+                        wait_time = parse_retry_after(response.headers.get("Retry-After"), (attempt + 1) * 10)
                         logger.warning(f"FMP rate limit exceeded, waiting {wait_time} seconds")
-                        await asyncio.sleep(wait_time)
+                        self.rate_limiter.defer(wait_time)
                         continue
                     
                     elif response.status == 401:
@@ -190,13 +200,13 @@ class FinancialModelingPrepPlugin(DataSourcePlugin):
                 logger.warning(f"FMP request timeout (attempt {attempt + 1})")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 5)
+                await self._retry_pause((attempt + 1) * 5)
             
             except Exception as e:
                 logger.error(f"FMP request failed (attempt {attempt + 1}): {str(e)}")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 2)
+                await self._retry_pause((attempt + 1) * 2)
         
         raise RuntimeError(f"FMP request failed after {self.max_retries} attempts")
     
@@ -236,42 +246,7 @@ class FinancialModelingPrepPlugin(DataSourcePlugin):
                 logger.warning(f"No historical data found for {ticker}")
                 return []
             
-            historical_data = data["historical"]
-            
-            # Convert to standardized format
-            ohlcv_data = []
-            for record in historical_data:
-                try:
-                    date_str = record.get("date")
-                    if not date_str:
-                        continue
-                    
-                    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                    
-                    ohlcv_record = {
-                        "date": date_str,
-                        "timestamp": date_obj.isoformat(),
-                        "open": float(record.get("open", 0)),
-                        "high": float(record.get("high", 0)),
-                        "low": float(record.get("low", 0)),
-                        "close": float(record.get("close", 0)),
-                        "volume": int(record.get("volume", 0)),
-                        "adj_close": float(record.get("adjClose", record.get("close", 0))),
-                        "change": float(record.get("change", 0)),
-                        "change_percent": float(record.get("changePercent", 0)),
-                        "vwap": float(record.get("vwap", 0)),
-                        "source": "financial_modeling_prep",
-                        "ticker": ticker.upper()
-                    }
-                    
-                    ohlcv_data.append(ohlcv_record)
-                
-                except (ValueError, KeyError, TypeError) as e:
-                    logger.warning(f"Error parsing OHLCV data for {ticker} on {date_str}: {str(e)}")
-                    continue
-            
-            # Sort by date (newest first in FMP, we want oldest first)
-            ohlcv_data.sort(key=lambda x: x["timestamp"])
+            ohlcv_data = self._parse_historical(ticker, data["historical"])
             
             logger.info(f"Fetched {len(ohlcv_data)} OHLCV records for {ticker} from FMP")
             return ohlcv_data
@@ -280,6 +255,124 @@ class FinancialModelingPrepPlugin(DataSourcePlugin):
             logger.error(f"Error fetching OHLCV data for {ticker}: {str(e)}")
             return []
     
+    def _parse_historical(self, ticker: str, historical_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert FMP historical records to the standardized OHLCV format (oldest first)."""
+        ohlcv_data = []
+        for record in historical_data:
+            date_str = record.get("date")
+            try:
+                if not date_str:
+                    continue
+                
+                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+                
+                ohlcv_record = {
+                    "date": date_str,
+                    "timestamp": date_obj.isoformat(),
+                    "open": float(record.get("open", 0)),
+                    "high": float(record.get("high", 0)),
+                    "low": float(record.get("low", 0)),
+                    "close": float(record.get("close", 0)),
+                    "volume": int(record.get("volume", 0)),
+                    "adj_close": float(record.get("adjClose", record.get("close", 0))),
+                    "change": float(record.get("change", 0)),
+                    "change_percent": float(record.get("changePercent", 0)),
+                    "vwap": float(record.get("vwap", 0)),
+                    "source": "financial_modeling_prep",
+                    "ticker": ticker.upper()
+                }
+                
+                ohlcv_data.append(ohlcv_record)
+            
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Error parsing OHLCV data for {ticker} on {date_str}: {str(e)}")
+                continue
+        
+        # Sort by date (newest first in FMP, we want oldest first)
+        ohlcv_data.sort(key=lambda x: x["timestamp"])
+        return ohlcv_data
+    
+    async def fetch_ohlcv_batch(
+        self,
+        tickers: List[str],
+        start_date: str,
+        end_date: str,
+        interval: str = "daily"
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch OHLCV data for many tickers; the historical endpoint accepts several comma-separated symbols.
+        
+        Args:
+            tickers: Stock ticker symbols
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            interval: Data interval (daily supported)
+            
+        Returns:
+            Dictionary {ticker: OHLCV list}, empty list for tickers without data
+        """
+        requested = {ticker.upper(): ticker for ticker in tickers}
+        results = {ticker: [] for ticker in requested.values()}
+        symbols = sorted(requested)
+        
+        for i in range(0, len(symbols), self.historical_batch_size):
+            chunk = symbols[i:i + self.historical_batch_size]
+            try:
+                endpoint = f"{self.endpoints['historical_price']}/{','.join(chunk)}"
+                data = await self._rate_limited_request(endpoint, {"from": start_date, "to": end_date})
+                if not data:
+                    continue
+                # A single symbol is answered without the list wrapper
+                stock_list = data.get("historicalStockList", [data]) if isinstance(data, dict) else []
+                for item in stock_list:
+                    ticker = requested.get(str(item.get("symbol", "")).upper())
+                    if ticker is not None:
+                        results[ticker] = self._parse_historical(ticker, item.get("historical", []))
+            
+            except Exception as e:
+                logger.error(f"Error fetching OHLCV batch {chunk}: {str(e)}")
+        
+        logger.info(f"Fetched OHLCV data for {sum(1 for bars in results.values() if bars)} of {len(results)} tickers from FMP")
+        return results
+    
+    async def fetch_quotes_batch(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch real-time quotes for many tickers with the batch quote endpoint.
+        
+        Args:
+            tickers: Stock ticker symbols
+            
+        Returns:
+            Dictionary {ticker: quote}; tickers without a quote are omitted
+        """
+        requested = {ticker.upper(): ticker for ticker in tickers}
+        quotes = {}
+        symbols = sorted(requested)
+        
+        for i in range(0, len(symbols), self.quote_batch_size):
+            chunk = symbols[i:i + self.quote_batch_size]
+            try:
+                data = await self._rate_limited_request(f"{self.endpoints['real_time_price']}/{','.join(chunk)}")
+                for item in data if isinstance(data, list) else []:
+                    ticker = requested.get(str(item.get("symbol", "")).upper())
+                    if ticker is None or item.get("price") is None:
+                        continue
+                    timestamp = item.get("timestamp")
+                    quotes[ticker] = {
+                        "ticker": ticker,
+                        "price": float(item["price"]),
+                        "change": item.get("change"),
+                        "change_percent": item.get("changesPercentage"),
+                        "volume": item.get("volume"),
+                        "timestamp": datetime.fromtimestamp(timestamp).isoformat() if timestamp else None,
+                        "source": "financial_modeling_prep"
+                    }
+            
+            except Exception as e:
+                logger.error(f"Error fetching quotes batch {chunk}: {str(e)}")
+        
+        return quotes
+    
     async def fetch_technical_indicators(
         self,
         ticker: str,
@@ -701,6 +794,7 @@ class FinancialModelingPrepPlugin(DataSourcePlugin):
             "status": "active" if self.session and not self.session.closed else "inactive",
             "api_key_configured": bool(self.api_key),
             "rate_limit_delay": self.rate_limit_delay,
+            "rate_limiter": self.rate_limiter.get_status(),
             "last_call_time": self.last_call_time,
             "max_retries": self.max_retries,
             "timeout": self.timeout,
@@ -9,6 +9,9 @@ from datetime import datetime, timedelta
 import xml.etree.ElementTree as ET
 
 from .data_source_plugin import DataSourcePlugin
+from ..circuit_breaker import guarded_request
+from ..response_cache import cached_response
+from ..rate_limiter import AsyncRateLimiter, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +36,8 @@ class FREDPlugin(DataSourcePlugin):
         self.api_key: Optional[str] = None
         self.session: Optional[aiohttp.ClientSession] = None
         self.rate_limit_delay = 0.5  # FRED allows reasonable rate limits
+        self.max_concurrent_requests = 2
+        self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
         self.last_call_time = 0
         self.max_retries = 3
         self.timeout = 30
@@ -105,6 +110,13 @@ class FREDPlugin(DataSourcePlugin):
                 "min": 0.1,
                 "max": 5.0
             },
+            "max_concurrent_requests": {
+                "type": "integer",
+                "description": "Maximum number of requests in flight at the same time",
+                "default": 2,
+                "min": 1,
+                "max": 20
+            },
             "max_retries": {
                 "type": "integer",
                 "description": "Maximum number of retry attempts for failed requests",
@@ -135,13 +147,15 @@ class FREDPlugin(DataSourcePlugin):
                 raise ValueError("FRED API key is required")
             
             self.rate_limit_delay = config.get("rate_limit_delay", 0.5)
+            self.max_concurrent_requests = config.get("max_concurrent_requests", 2)
+            self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
             self.max_retries = config.get("max_retries", 3)
             self.timeout = config.get("timeout", 30)
             self.default_frequency = config.get("default_frequency", "d")
             
             # Create aiohttp session
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            self.session = self._create_session(timeout=timeout)
             
             logger.info(f"FRED plugin initialized with rate limit: {self.rate_limit_delay}s")
             
@@ -149,19 +163,13 @@ class FREDPlugin(DataSourcePlugin):
             logger.error(f"Failed to initialize FRED plugin: {str(e)}")
             raise
     
+    @cached_response
+    @guarded_request
     async def _rate_limited_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Make rate-limited API request to FRED."""
         if not self.session:
             raise RuntimeError("Plugin not initialized")
         
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        time_since_last_call = current_time - self.last_call_time
-        
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            await asyncio.sleep(sleep_time)
-        
         # Add API key and format
         params["api_key"] = self.api_key
         params["file_type"] = "json"
@@ -172,7 +180,7 @@ class FREDPlugin(DataSourcePlugin):
             try:
                 logger.debug(f"FRED API request (attempt {attempt + 1}): {endpoint}")
                 
-                async with self.session.get(url, params=params) as response:
+                async with self.rate_limiter, self.session.get(url, params=params) as response:
                     self.last_call_time = asyncio.get_event_loop().time()
                     
                     if response.status == 200:
@@ -187,9 +195,9 @@ class FREDPlugin(DataSourcePlugin):
                     
                     elif response.status == 429:
                         # Rate limit exceeded
-                        wait_time = (attempt + 1) * 10
+                        wait_time = parse_retry_after(response.headers.get("Retry-After"), (attempt + 1) * 10)
                         logger.warning(f"FRED rate limit exceeded, waiting {wait_time} seconds")
-                        await asyncio.sleep(wait_time)
+                        self.rate_limiter.defer(wait_time)
                         continue
                     
                     elif response.status == 400:
@@ -205,13 +213,13 @@ class FREDPlugin(DataSourcePlugin):
                 logger.warning(f"FRED request timeout (attempt {attempt + 1})")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 5)
+                await self._retry_pause((attempt + 1) * 5)
             
             except Exception as e:
                 logger.error(f"FRED request failed (attempt {attempt + 1}): {str(e)}")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 2)
+                await self._retry_pause((attempt + 1) * 2)
         
         raise RuntimeError(f"FRED request failed after {self.max_retries} attempts")
     
@@ -526,6 +534,7 @@ class FREDPlugin(DataSourcePlugin):
             "status": "active" if self.session and not self.session.closed else "inactive",
             "api_key_configured": bool(self.api_key),
             "rate_limit_delay": self.rate_limit_delay,
+            "rate_limiter": self.rate_limiter.get_status(),
             "last_call_time": self.last_call_time,
             "max_retries": self.max_retries,
             "timeout": self.timeout,
@@ -4,13 +4,18 @@ News sentiment analysis plugin for financial news sentiment data.
 import asyncio
 import aiohttp
 import logging
-import re
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import xml.etree.ElementTree as ET
 from urllib.parse import urlencode
 
 from .data_source_plugin import DataSourcePlugin
+from ..circuit_breaker import guarded_request
+from ..response_cache import cached_response
+from ..sentiment_lexicon import (
+    LABELS, KeywordMatcher, SentimentArrays, SentimentScorer, count_ticker_mentions, count_universe_mentions
+)
+from ..rate_limiter import AsyncRateLimiter, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +50,8 @@ class NewsSentimentPlugin(DataSourcePlugin):
         
         self.session: Optional[aiohttp.ClientSession] = None
         self.rate_limit_delay = 0.5  # Conservative rate limiting
+        self.max_concurrent_requests = 2
+        self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
         self.last_call_time = 0
         self.max_retries = 3
         self.timeout = 30
@@ -86,6 +93,20 @@ class NewsSentimentPlugin(DataSourcePlugin):
             "ceo", "management", "resignation", "appointment", "investigation",
             "sec", "regulatory", "patent", "product launch", "recall"
         ]
+        
+        # Financial context keywords for relevance scoring
+        self.financial_keywords = ["earnings", "revenue", "profit", "stock", "shares", "market", "trading"]
+        
+        # Keyword lists compiled once for all scoring calls
+        self.sentiment_scorer = SentimentScorer(
+            self.positive_keywords,
+            self.negative_keywords,
+            self.high_impact_keywords,
+            label_threshold=0.3,
+            impact_multiplier=1.5  # Amplify sentiment for high impact news
+        )
+        self.sentiment_lexicon = self.sentiment_scorer.lexicon
+        self.financial_matcher = KeywordMatcher(self.financial_keywords)
     
     def get_name(self) -> str:
         """Get plugin name."""
@@ -126,6 +147,13 @@ class NewsSentimentPlugin(DataSourcePlugin):
                 "min": 0.1,
                 "max": 5.0
             },
+            "max_concurrent_requests": {
+                "type": "integer",
+                "description": "Maximum number of requests in flight at the same time",
+                "default": 2,
+                "min": 1,
+                "max": 20
+            },
             "max_retries": {
                 "type": "integer",
                 "description": "Maximum number of retry attempts for failed requests",
@@ -171,6 +199,8 @@ class NewsSentimentPlugin(DataSourcePlugin):
                 logger.warning("No news API keys provided. Limited functionality available.")
             
             self.rate_limit_delay = config.get("rate_limit_delay", 0.5)
+            self.max_concurrent_requests = config.get("max_concurrent_requests", 2)
+            self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
             self.max_retries = config.get("max_retries", 3)
             self.timeout = config.get("timeout", 30)
             self.min_relevance_score = config.get("min_relevance_score", 0.5)
@@ -182,7 +212,7 @@ class NewsSentimentPlugin(DataSourcePlugin):
             
             # Create aiohttp session
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            self.session = self._create_session(timeout=timeout)
             
             logger.info(f"News sentiment plugin initialized with rate limit: {self.rate_limit_delay}s")
             
@@ -190,24 +220,18 @@ class NewsSentimentPlugin(DataSourcePlugin):
             logger.error(f"Failed to initialize News sentiment plugin: {str(e)}")
             raise
     
+    @cached_response
+    @guarded_request
     async def _rate_limited_request(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> Any:
         """Make rate-limited API request."""
         if not self.session:
             raise RuntimeError("Plugin not initialized")
         
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        time_since_last_call = current_time - self.last_call_time
-        
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            await asyncio.sleep(sleep_time)
-        
         for attempt in range(self.max_retries):
             try:
                 logger.debug(f"News API request (attempt {attempt + 1}): {url}")
                 
-                async with self.session.get(url, params=params, headers=headers) as response:
+                async with self.rate_limiter, self.session.get(url, params=params, headers=headers) as response:
                     self.last_call_time = asyncio.get_event_loop().time()
                     
                     if response.status == 200:
@@ -225,9 +249,9 @@ class NewsSentimentPlugin(DataSourcePlugin):
                     
                     elif response.status == 429:
                         # Rate limit exceeded
-                        wait_time = (attempt + 1) * 10
+                        wait_time = parse_retry_after(response.headers.get("Retry-After"), (attempt + 1) * 10)
                         logger.warning(f"News API rate limit exceeded, waiting {wait_time} seconds")
-                        await asyncio.sleep(wait_time)
+                        self.rate_limiter.defer(wait_time)
                         continue
                     
                     elif response.status == 401:
@@ -242,13 +266,13 @@ class NewsSentimentPlugin(DataSourcePlugin):
                 logger.warning(f"News API request timeout (attempt {attempt + 1})")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 5)
+                await self._retry_pause((attempt + 1) * 5)
             
             except Exception as e:
                 logger.error(f"News API request failed (attempt {attempt + 1}): {str(e)}")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 2)
+                await self._retry_pause((attempt + 1) * 2)
         
         raise RuntimeError(f"News API request failed after {self.max_retries} attempts")
     
@@ -279,22 +303,54 @@ class NewsSentimentPlugin(DataSourcePlugin):
         if not text:
             return {"score": 0.0, "label": "neutral", "confidence": 0.0}
         
-        text_lower = text.lower()
-        
-        positive_count = sum(1 for keyword in self.positive_keywords if keyword in text_lower)
-        negative_count = sum(1 for keyword in self.negative_keywords if keyword in text_lower)
-        high_impact_count = sum(1 for keyword in self.high_impact_keywords if keyword in text_lower)
+        return self._sentiment_from_counts(**self.sentiment_lexicon.count(text))
+    
+    def score_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Calculate sentiment scores for many texts (same result as _calculate_sentiment_score per text)."""
+        counts = self.sentiment_lexicon.count_batch(texts)
+        return [
+            self._sentiment_from_counts(*map(int, row)) if text else {"score": 0.0, "label": "neutral", "confidence": 0.0}
+            for text, row in zip(texts, counts)
+        ]
+    
+    async def score_batch(self, texts: List[str]) -> SentimentArrays:
+        """
+        Score many texts off the event loop (process pool for large batches).
         
-        total_sentiment_words = positive_count + negative_count
+        Returns:
+            (scores, label codes -1/0/1, confidences) arrays
+        """
+        return await self.sentiment_scorer.score_batch(texts)
+    
+    async def _apply_sentiment(self, records: List[Dict[str, Any]], texts: List[str]) -> List[Dict[str, Any]]:
+        """Score the texts of a batch of records in one call and fill in the records' sentiment fields."""
+        if not records:
+            return records
+        scores, labels, confidences = await self.score_batch(texts)
+        for record, score, label, confidence in zip(records, scores.tolist(), labels.tolist(), confidences.tolist()):
+            record.update({
+                "open": score,
+                "high": score,
+                "low": score,
+                "close": score,
+                "sentiment_label": LABELS[label + 1],
+                "sentiment_confidence": confidence
+            })
+        return records
+    
+    @staticmethod
+    def _sentiment_from_counts(positive: int, negative: int, high_impact: int) -> Dict[str, Any]:
+        """Sentiment score, label and confidence from keyword counts."""
+        total_sentiment_words = positive + negative
         
         if total_sentiment_words == 0:
             sentiment_score = 0.0
             sentiment_label = "neutral"
         else:
-            sentiment_score = (positive_count - negative_count) / total_sentiment_words
+            sentiment_score = (positive - negative) / total_sentiment_words
             
             # Adjust for high impact keywords
-            if high_impact_count > 0:
+            if high_impact > 0:
                 sentiment_score *= 1.5  # Amplify sentiment for high impact news
             
             if sentiment_score > 0.3:
@@ -305,37 +361,61 @@ class NewsSentimentPlugin(DataSourcePlugin):
                 sentiment_label = "neutral"
         
         # Calculate confidence based on number of sentiment words and text length
-        confidence = min((total_sentiment_words + high_impact_count) / 10, 1.0)
+        confidence = min((total_sentiment_words + high_impact) / 10, 1.0)
         
         return {
             "score": max(-1.0, min(1.0, sentiment_score)),  # Clamp to [-1, 1]
             "label": sentiment_label,
             "confidence": confidence,
-            "positive_count": positive_count,
-            "negative_count": negative_count,
-            "high_impact_count": high_impact_count
+            "positive_count": positive,
+            "negative_count": negative,
+            "high_impact_count": high_impact
         }
     
     def _calculate_relevance_score(self, article: Dict[str, Any], ticker: str) -> float:
         """Calculate how relevant an article is to the given ticker."""
-        title = article.get("title", "").lower()
-        description = article.get("description", "").lower()
-        content = article.get("content", "").lower()
-        
-        full_text = f"{title} {description} {content}"
-        
-        # Check for exact ticker mention
-        ticker_mentions = len(re.findall(rf'\b{ticker.lower()}\b', full_text))
-        
-        # Check for company name patterns (simplified)
-        company_patterns = [
-            rf'\b{ticker.lower()}\s+(corp|corporation|inc|company|ltd)\b',
-            rf'\b{ticker.lower()}\s+stock\b',
-            rf'\b{ticker.lower()}\s+shares\b'
-        ]
+        title, full_text = self._article_text(article)
+        ticker_mentions, company_mentions = count_ticker_mentions(full_text, ticker)
+        return self._relevance_from_counts(title, ticker, ticker_mentions, company_mentions,
+                                           self._financial_score(full_text))
+    
+    def score_relevance_batch(self, articles: List[Dict[str, Any]], tickers: List[str]) -> List[Dict[str, float]]:
+        """
+        Calculate the relevance of many articles for many tickers.
         
-        company_mentions = sum(len(re.findall(pattern, full_text)) for pattern in company_patterns)
+        Each article is lowercased and scanned once for all tickers instead of once per ticker.
         
+        Returns:
+            One {ticker: relevance} dict per article
+        """
+        universe = tuple(sorted(set(tickers)))
+        results = []
+        for article in articles:
+            title, full_text = self._article_text(article)
+            mentions = count_universe_mentions(full_text, universe) if universe else {}
+            financial_score = self._financial_score(full_text)
+            results.append({
+                ticker: self._relevance_from_counts(title, ticker, *mentions.get(ticker.lower(), (0, 0)), financial_score)
+                for ticker in tickers
+            })
+        return results
+    
+    @staticmethod
+    def _article_text(article: Dict[str, Any]) -> tuple:
+        """Lowercase title and combined title / description / content of an article."""
+        title = (article.get("title") or "").lower()
+        description = (article.get("description") or "").lower()
+        content = (article.get("content") or "").lower()
+        return title, f"{title} {description} {content}"
+    
+    def _financial_score(self, full_text: str) -> float:
+        """Share of financial context keywords occurring in the text."""
+        return len(self.financial_matcher.find(full_text)) / len(self.financial_keywords)
+    
+    @staticmethod
+    def _relevance_from_counts(title: str, ticker: str, ticker_mentions: int, company_mentions: int,
+                               financial_score: float) -> float:
+        """Relevance score from ticker and company mentions, title mention and financial context."""
         # Base relevance score
         relevance = min((ticker_mentions * 2 + company_mentions) / 10, 1.0)
         
@@ -344,8 +424,6 @@ class NewsSentimentPlugin(DataSourcePlugin):
             relevance += 0.3
         
         # Boost for financial context
-        financial_keywords = ["earnings", "revenue", "profit", "stock", "shares", "market", "trading"]
-        financial_score = sum(1 for keyword in financial_keywords if keyword in full_text) / len(financial_keywords)
         relevance += financial_score * 0.2
         
         return min(relevance, 1.0)
@@ -420,6 +498,7 @@ class NewsSentimentPlugin(DataSourcePlugin):
                 return []
             
             sentiment_data = []
+            texts = []
             for article in data["articles"]:
                 try:
                     # Calculate relevance
@@ -434,25 +513,17 @@ class NewsSentimentPlugin(DataSourcePlugin):
                     else:
                         continue
                     
-                    # Calculate sentiment
+                    # Text for sentiment scoring (all articles are scored in one batch)
                     title = article.get("title", "")
                     description = article.get("description", "")
                     content = f"{title} {description}"
                     
-                    sentiment = self._calculate_sentiment_score(content)
-                    
                     sentiment_record = {
                         "date": date_obj.strftime("%Y-%m-%d"),
                         "timestamp": date_obj.isoformat(),
-                        "open": sentiment["score"],
-                        "high": sentiment["score"],
-                        "low": sentiment["score"],
-                        "close": sentiment["score"],
                         "volume": int(relevance * 100),  # Use relevance as volume proxy
                         "source": "newsapi",
                         "ticker": ticker.upper(),
-                        "sentiment_label": sentiment["label"],
-                        "sentiment_confidence": sentiment["confidence"],
                         "relevance_score": relevance,
                         "title": title[:100],  # Truncated
                         "source_name": article.get("source", {}).get("name", ""),
@@ -460,12 +531,13 @@ class NewsSentimentPlugin(DataSourcePlugin):
                     }
                     
                     sentiment_data.append(sentiment_record)
+                    texts.append(content)
                 
                 except (ValueError, KeyError, TypeError) as e:
                     logger.warning(f"Error parsing NewsAPI article: {str(e)}")
                     continue
             
-            return sentiment_data
+            return await self._apply_sentiment(sentiment_data, texts)
         
         except Exception as e:
             logger.error(f"Error fetching NewsAPI articles for {ticker}: {str(e)}")
@@ -490,6 +562,7 @@ class NewsSentimentPlugin(DataSourcePlugin):
                 return []
             
             sentiment_data = []
+            texts = []
             for article in data:
                 try:
                     # Parse date
@@ -499,12 +572,11 @@ class NewsSentimentPlugin(DataSourcePlugin):
                     else:
                         continue
                     
-                    # Calculate sentiment
+                    # Text for sentiment scoring (all articles are scored in one batch)
                     headline = article.get("headline", "")
                     summary = article.get("summary", "")
                     content = f"{headline} {summary}"
                     
-                    sentiment = self._calculate_sentiment_score(content)
                     relevance = self._calculate_relevance_score({"title": headline, "description": summary}, ticker)
                     
                     if relevance < self.min_relevance_score:
@@ -513,15 +585,9 @@ class NewsSentimentPlugin(DataSourcePlugin):
                     sentiment_record = {
                         "date": date_obj.strftime("%Y-%m-%d"),
                         "timestamp": date_obj.isoformat(),
-                        "open": sentiment["score"],
-                        "high": sentiment["score"],
-                        "low": sentiment["score"],
-                        "close": sentiment["score"],
                         "volume": int(relevance * 100),
                         "source": "finnhub",
                         "ticker": ticker.upper(),
-                        "sentiment_label": sentiment["label"],
-                        "sentiment_confidence": sentiment["confidence"],
                         "relevance_score": relevance,
                         "title": headline[:100],
                         "source_name": article.get("source", ""),
@@ -529,12 +595,13 @@ class NewsSentimentPlugin(DataSourcePlugin):
                     }
                     
                     sentiment_data.append(sentiment_record)
+                    texts.append(content)
                 
                 except (ValueError, KeyError, TypeError) as e:
                     logger.warning(f"Error parsing Finnhub article: {str(e)}")
                     continue
             
-            return sentiment_data
+            return await self._apply_sentiment(sentiment_data, texts)
         
         except Exception as e:
             logger.error(f"Error fetching Finnhub news for {ticker}: {str(e)}")
@@ -559,6 +626,7 @@ class NewsSentimentPlugin(DataSourcePlugin):
                 return []
             
             sentiment_data = []
+            texts = []
             for article in data["data"]:
                 try:
                     # Parse date
@@ -568,12 +636,11 @@ class NewsSentimentPlugin(DataSourcePlugin):
                     else:
                         continue
                     
-                    # Calculate sentiment
+                    # Text for sentiment scoring (all articles are scored in one batch)
                     title = article.get("title", "")
                     description = article.get("description", "")
                     content = f"{title} {description}"
                     
-                    sentiment = self._calculate_sentiment_score(content)
                     relevance = self._calculate_relevance_score({"title": title, "description": description}, ticker)
                     
                     if relevance < self.min_relevance_score:
@@ -582,15 +649,9 @@ class NewsSentimentPlugin(DataSourcePlugin):
                     sentiment_record = {
                         "date": date_obj.strftime("%Y-%m-%d"),
                         "timestamp": date_obj.isoformat(),
-                        "open": sentiment["score"],
-                        "high": sentiment["score"],
-                        "low": sentiment["score"],
-                        "close": sentiment["score"],
                         "volume": int(relevance * 100),
                         "source": "marketaux",
                         "ticker": ticker.upper(),
-                        "sentiment_label": sentiment["label"],
-                        "sentiment_confidence": sentiment["confidence"],
                         "relevance_score": relevance,
                         "title": title[:100],
                         "source_name": article.get("source", ""),
@@ -598,12 +659,13 @@ class NewsSentimentPlugin(DataSourcePlugin):
                     }
                     
                     sentiment_data.append(sentiment_record)
+                    texts.append(content)
                 
                 except (ValueError, KeyError, TypeError) as e:
                     logger.warning(f"Error parsing MarketAux article: {str(e)}")
                     continue
             
-            return sentiment_data
+            return await self._apply_sentiment(sentiment_data, texts)
         
         except Exception as e:
             logger.error(f"Error fetching MarketAux news for {ticker}: {str(e)}")
@@ -615,6 +677,7 @@ class NewsSentimentPlugin(DataSourcePlugin):
             # This is a simplified implementation
             # In practice, you would implement RSS feed parsing for various sources
             sentiment_data = []
+            texts = []
             
             # Example: Yahoo Finance RSS (simplified)
             try:
@@ -637,7 +700,7 @@ class NewsSentimentPlugin(DataSourcePlugin):
                             except:
                                 continue
                             
-                            sentiment = self._calculate_sentiment_score(f"{title} {description}")
+                            content = f"{title} {description}"
                             relevance = self._calculate_relevance_score({"title": title, "description": description}, ticker)
                             
                             if relevance < self.min_relevance_score:
@@ -646,15 +709,9 @@ class NewsSentimentPlugin(DataSourcePlugin):
                             sentiment_record = {
                                 "date": date_obj.strftime("%Y-%m-%d"),
                                 "timestamp": date_obj.isoformat(),
-                                "open": sentiment["score"],
-                                "high": sentiment["score"],
-                                "low": sentiment["score"],
-                                "close": sentiment["score"],
                                 "volume": int(relevance * 100),
                                 "source": "yahoo_rss",
                                 "ticker": ticker.upper(),
-                                "sentiment_label": sentiment["label"],
-                                "sentiment_confidence": sentiment["confidence"],
                                 "relevance_score": relevance,
                                 "title": title[:100],
                                 "source_name": "Yahoo Finance",
@@ -662,6 +719,7 @@ class NewsSentimentPlugin(DataSourcePlugin):
                             }
                             
                             sentiment_data.append(sentiment_record)
+                            texts.append(content)
                         
                         except Exception as e:
                             logger.warning(f"Error parsing RSS article: {str(e)}")
@@ -670,7 +728,7 @@ class NewsSentimentPlugin(DataSourcePlugin):
             except Exception as e:
                 logger.warning(f"Error fetching RSS feed: {str(e)}")
             
-            return sentiment_data
+            return await self._apply_sentiment(sentiment_data, texts)
         
         except Exception as e:
             logger.error(f"Error fetching free news sources for {ticker}: {str(e)}")
@@ -963,6 +1021,7 @@ class NewsSentimentPlugin(DataSourcePlugin):
             "finnhub_key_configured": bool(self.finnhub_key),
             "marketaux_key_configured": bool(self.marketaux_key),
             "rate_limit_delay": self.rate_limit_delay,
+            "rate_limiter": self.rate_limiter.get_status(),
             "last_call_time": self.last_call_time,
             "max_retries": self.max_retries,
             "timeout": self.timeout,
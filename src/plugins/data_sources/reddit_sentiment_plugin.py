@@ -4,12 +4,16 @@ Reddit sentiment analysis plugin for social media sentiment data.
 import asyncio
 import aiohttp
 import logging
-import re
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import json
 
 from .data_source_plugin import DataSourcePlugin
+from ..circuit_breaker import guarded_request
+from ..response_cache import cached_response
+from ..sentiment_lexicon import LABELS, SentimentArrays, SentimentScorer
+from ..ticker_extractor import TickerExtractor
+from ..rate_limiter import AsyncRateLimiter, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +49,8 @@ class RedditSentimentPlugin(DataSourcePlugin):
         self.token_expires_at: Optional[datetime] = None
         
         self.rate_limit_delay = 1.0  # Reddit requires respectful rate limiting
+        self.max_concurrent_requests = 1
+        self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
         self.last_call_time = 0
         self.max_retries = 3
         self.timeout = 30
@@ -75,6 +81,11 @@ class RedditSentimentPlugin(DataSourcePlugin):
             "drop", "fall", "bad", "terrible", "awful", "hate", "dislike",
             "negative", "down", "decline", "weak", "paper hands"
         ]
+        
+        # Keyword lists compiled once for all scoring calls
+        self.sentiment_scorer = SentimentScorer(self.positive_keywords, self.negative_keywords, label_threshold=0.2)
+        self.sentiment_lexicon = self.sentiment_scorer.lexicon
+        self._ticker_extractor: Optional[TickerExtractor] = None
     
     def get_name(self) -> str:
         """Get plugin name."""
@@ -114,6 +125,13 @@ class RedditSentimentPlugin(DataSourcePlugin):
                 "min": 0.5,
                 "max": 10.0
             },
+            "max_concurrent_requests": {
+                "type": "integer",
+                "description": "Maximum number of requests in flight at the same time",
+                "default": 1,
+                "min": 1,
+                "max": 20
+            },
             "max_retries": {
                 "type": "integer",
                 "description": "Maximum number of retry attempts for failed requests",
@@ -158,6 +176,8 @@ class RedditSentimentPlugin(DataSourcePlugin):
             
             self.user_agent = config.get("user_agent", self.user_agent)
             self.rate_limit_delay = config.get("rate_limit_delay", 1.0)
+            self.max_concurrent_requests = config.get("max_concurrent_requests", 1)
+            self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
             self.max_retries = config.get("max_retries", 3)
             self.timeout = config.get("timeout", 30)
             
@@ -171,7 +191,7 @@ class RedditSentimentPlugin(DataSourcePlugin):
             # Create aiohttp session
             timeout = aiohttp.ClientTimeout(total=self.timeout)
             headers = {"User-Agent": self.user_agent}
-            self.session = aiohttp.ClientSession(timeout=timeout, headers=headers)
+            self.session = self._create_session(timeout=timeout, headers=headers)
             
             logger.info(f"Reddit sentiment plugin initialized with rate limit: {self.rate_limit_delay}s")
             
@@ -211,6 +231,8 @@ class RedditSentimentPlugin(DataSourcePlugin):
             logger.error(f"Error getting Reddit access token: {str(e)}")
             raise
     
+    @cached_response
+    @guarded_request
     async def _rate_limited_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make rate-limited API request to Reddit."""
         if not self.session:
@@ -219,14 +241,6 @@ class RedditSentimentPlugin(DataSourcePlugin):
         # Get access token
         token = await self._get_access_token()
         
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        time_since_last_call = current_time - self.last_call_time
-        
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            await asyncio.sleep(sleep_time)
-        
         # Prepare headers
         headers = {
             "Authorization": f"bearer {token}",
@@ -239,7 +253,7 @@ class RedditSentimentPlugin(DataSourcePlugin):
             try:
                 logger.debug(f"Reddit API request (attempt {attempt + 1}): {endpoint}")
                 
-                async with self.session.get(url, params=params, headers=headers) as response:
+                async with self.rate_limiter, self.session.get(url, params=params, headers=headers) as response:
                     self.last_call_time = asyncio.get_event_loop().time()
                     
                     if response.status == 200:
@@ -248,9 +262,9 @@ class RedditSentimentPlugin(DataSourcePlugin):
                     
                     elif response.status == 429:
                         # Rate limit exceeded
-                        wait_time = (attempt + 1) * 30
+                        wait_time = parse_retry_after(response.headers.get("Retry-After"), (attempt + 1) * 30)
                         logger.warning(f"Reddit rate limit exceeded, waiting {wait_time} seconds")
-                        await asyncio.sleep(wait_time)
+                        self.rate_limiter.defer(wait_time)
                         continue
                     
                     elif response.status == 401:
@@ -271,23 +285,38 @@ class RedditSentimentPlugin(DataSourcePlugin):
                 logger.warning(f"Reddit request timeout (attempt {attempt + 1})")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 5)
+                await self._retry_pause((attempt + 1) * 5)
             
             except Exception as e:
                 logger.error(f"Reddit request failed (attempt {attempt + 1}): {str(e)}")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 2)
+                await self._retry_pause((attempt + 1) * 2)
         
         raise RuntimeError(f"Reddit request failed after {self.max_retries} attempts")
     
     def _calculate_basic_sentiment(self, text: str) -> Dict[str, Any]:
         """Calculate basic sentiment score using keyword analysis."""
-        text_lower = text.lower()
-        
-        positive_count = sum(1 for keyword in self.positive_keywords if keyword in text_lower)
-        negative_count = sum(1 for keyword in self.negative_keywords if keyword in text_lower)
+        counts = self.sentiment_lexicon.count(text)
+        return self._sentiment_from_counts(counts["positive"], counts["negative"])
+    
+    def score_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Calculate basic sentiment scores for many posts or comments in one call."""
+        counts = self.sentiment_lexicon.count_batch(texts)
+        return [self._sentiment_from_counts(int(positive), int(negative)) for positive, negative in counts[:, :2]]
+    
+    async def score_batch(self, texts: List[str]) -> SentimentArrays:
+        """
+        Score many posts or comments off the event loop (process pool for large batches).
         
+        Returns:
+            (scores, label codes -1/0/1, confidences) arrays
+        """
+        return await self.sentiment_scorer.score_batch(texts)
+    
+    @staticmethod
+    def _sentiment_from_counts(positive_count: int, negative_count: int) -> Dict[str, Any]:
+        """Sentiment score, label and confidence from keyword counts."""
         total_sentiment_words = positive_count + negative_count
         
         if total_sentiment_words == 0:
@@ -310,31 +339,20 @@ class RedditSentimentPlugin(DataSourcePlugin):
             "confidence": min(total_sentiment_words / 10, 1.0)  # Confidence based on number of sentiment words
         }
     
+    @property
+    def ticker_extractor(self) -> TickerExtractor:
+        """Ticker extractor with the symbol universe of data_sources.ticker_universe (loaded on first use)."""
+        if self._ticker_extractor is None:
+            self._ticker_extractor = TickerExtractor.from_config()
+        return self._ticker_extractor
+    
     def _extract_ticker_mentions(self, text: str) -> List[str]:
         """Extract stock ticker mentions from text."""
-        # Pattern for stock tickers (1-5 uppercase letters, often preceded by $)
-        ticker_pattern = r'\$?([A-Z]{1,5})(?=\s|$|[^\w])'
-        
-        matches = re.findall(ticker_pattern, text.upper())
-        
-        # Filter out common words that might match the pattern
-        common_words = {
-            "THE", "AND", "OR", "BUT", "FOR", "NOT", "TO", "OF", "IN", "ON", "AT", "BY",
-            "UP", "DOWN", "OUT", "ALL", "ANY", "SO", "IF", "IT", "IS", "AM", "ARE", "WAS",
-            "WERE", "BE", "BEEN", "HAVE", "HAS", "HAD", "DO", "DOES", "DID", "WILL", "WOULD",
-            "COULD", "SHOULD", "MAY", "MIGHT", "CAN", "MUST", "GET", "GOT", "GO", "GOES",
-            "WENT", "COME", "CAME", "SEE", "SAW", "TAKE", "TOOK", "GIVE", "GAVE", "MAKE",
-            "MADE", "THINK", "THOUGHT", "KNOW", "KNEW", "WANT", "LIKE", "LOVE", "HATE",
-            "GOOD", "BAD", "BIG", "SMALL", "NEW", "OLD", "LONG", "SHORT", "HIGH", "LOW",
-            "BEST", "WORST", "MORE", "MOST", "LESS", "LEAST", "VERY", "TOO", "NOW", "THEN",
-            "HERE", "THERE", "THIS", "THAT", "THESE", "THOSE", "WHO", "WHAT", "WHEN",
-            "WHERE", "WHY", "HOW", "YES", "NO", "OK", "LOL", "OMG", "WTF", "FUD", "HODL",
-            "BUY", "SELL", "PUMP", "DUMP", "MOON", "YOLO", "DD"
-        }
-        
-        # Filter out common words and return unique tickers
-        valid_tickers = [ticker for ticker in matches if ticker not in common_words and len(ticker) >= 2]
-        return list(set(valid_tickers))
+        return self.ticker_extractor.extract(text)
+    
+    def extract_ticker_mentions_batch(self, texts: List[str]) -> List[List[str]]:
+        """Extract stock ticker mentions from many texts (e.g. a subreddit dump)."""
+        return self.ticker_extractor.extract_batch(texts)
     
     async def fetch_ohlcv_data(
         self,
@@ -407,7 +425,7 @@ class RedditSentimentPlugin(DataSourcePlugin):
             if not data or "data" not in data or "children" not in data["data"]:
                 return []
             
-            posts = []
+            candidates = []
             start_dt = datetime.strptime(start_date, "%Y-%m-%d")
             end_dt = datetime.strptime(end_date, "%Y-%m-%d")
             
@@ -424,23 +442,32 @@ class RedditSentimentPlugin(DataSourcePlugin):
                         continue
                     
                     # Check if post score meets minimum threshold
-                    score = post_data.get("score", 0)
-                    if score < self.min_post_score:
+                    if post_data.get("score", 0) < self.min_post_score:
                         continue
                     
                     # Extract text for sentiment analysis
-                    title = post_data.get("title", "")\n                    selftext = post_data.get("selftext", "")
-                    full_text = f"{title} {selftext}"
-                    
+                    full_text = f"{post_data.get('title', '')} {post_data.get('selftext', '')}"
+                    candidates.append((post_data, post_date, full_text))
+                
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Error parsing Reddit post: {str(e)}")
+                    continue
+            
+            # Extract ticker mentions of the whole page in one batch; the searched ticker is
+            # always part of the universe
+            self.ticker_extractor.add_symbols([ticker])
+            mentions = self.extract_ticker_mentions_batch([full_text for _, _, full_text in candidates])
+            
+            posts = []
+            texts = []
+            for (post_data, post_date, full_text), mentioned_tickers in zip(candidates, mentions):
+                try:
                     # Check if ticker is actually mentioned
-                    mentioned_tickers = self._extract_ticker_mentions(full_text)
                     if ticker.upper() not in mentioned_tickers:
                         continue
                     
-                    # Calculate sentiment
-                    sentiment = self._calculate_basic_sentiment(full_text)
-                    
                     # Calculate engagement score (combination of score, comments, etc.)
+                    score = post_data.get("score", 0)
                     num_comments = post_data.get("num_comments", 0)
                     upvote_ratio = post_data.get("upvote_ratio", 0.5)
                     engagement_score = score * upvote_ratio + num_comments * 0.5
@@ -449,26 +476,34 @@ class RedditSentimentPlugin(DataSourcePlugin):
                         "date": post_date.strftime("%Y-%m-%d"),
                         "timestamp": post_date.isoformat(),
                         "post_id": post_data.get("id", ""),
-                        "title": title,
+                        "title": post_data.get("title", ""),
                         "author": post_data.get("author", ""),
                         "score": score,
                         "num_comments": num_comments,
                         "upvote_ratio": upvote_ratio,
                         "engagement_score": engagement_score,
-                        "sentiment_score": sentiment["score"],
-                        "sentiment_label": sentiment["label"],
-                        "sentiment_confidence": sentiment["confidence"],
                         "mentioned_tickers": mentioned_tickers,
                         "url": post_data.get("url", ""),
                         "permalink": f"https://reddit.com{post_data.get('permalink', '')}"
                     }
                     
                     posts.append(post_record)
+                    texts.append(full_text)
                 
                 except (ValueError, KeyError, TypeError) as e:
                     logger.warning(f"Error parsing Reddit post: {str(e)}")
                     continue
             
+            # Score all posts of the page in one batch
+            if posts:
+                scores, labels, confidences = await self.score_batch(texts)
+                for post, score, label, confidence in zip(posts, scores.tolist(), labels.tolist(), confidences.tolist()):
+                    post.update({
+                        "sentiment_score": score,
+                        "sentiment_label": LABELS[label + 1],
+                        "sentiment_confidence": confidence
+                    })
+            
             return posts
         
         except Exception as e:
@@ -778,11 +813,13 @@ class RedditSentimentPlugin(DataSourcePlugin):
             "client_id_configured": bool(self.client_id),
             "access_token_valid": bool(self.access_token and self.token_expires_at and datetime.now() < self.token_expires_at),
             "rate_limit_delay": self.rate_limit_delay,
+            "rate_limiter": self.rate_limiter.get_status(),
             "last_call_time": self.last_call_time,
             "max_retries": self.max_retries,
             "timeout": self.timeout,
             "target_subreddits": self.stock_subreddits,
             "supported_indicators": ["sentiment_trend", "mention_volume"],
             "supported_events": ["viral_posts", "dd_posts"],
-            "min_post_score": self.min_post_score
+            "min_post_score": self.min_post_score,
+            "ticker_extractor": self._ticker_extractor.get_status() if self._ticker_extractor else None
         }
\ No newline at end of file
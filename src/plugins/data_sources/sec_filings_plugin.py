@@ -11,6 +11,9 @@ from datetime import datetime, timedelta
 import re
 
 from .data_source_plugin import DataSourcePlugin
+from ..circuit_breaker import guarded_request
+from ..response_cache import cached_response
+from ..rate_limiter import AsyncRateLimiter, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +44,8 @@ class SECFilingsPlugin(DataSourcePlugin):
         # No API key required
         self.session: Optional[aiohttp.ClientSession] = None
         self.rate_limit_delay = 0.1  # SEC requests respectful rate limiting
+        self.max_concurrent_requests = 4
+        self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
         self.last_call_time = 0
         self.max_retries = 3
         self.timeout = 30
@@ -114,6 +119,13 @@ class SECFilingsPlugin(DataSourcePlugin):
                 "min": 0.1,
                 "max": 2.0
             },
+            "max_concurrent_requests": {
+                "type": "integer",
+                "description": "Maximum number of requests in flight at the same time",
+                "default": 4,
+                "min": 1,
+                "max": 20
+            },
             "max_retries": {
                 "type": "integer",
                 "description": "Maximum number of retry attempts for failed requests",
@@ -144,13 +156,15 @@ class SECFilingsPlugin(DataSourcePlugin):
                 self.headers["User-Agent"] = user_agent
             
             self.rate_limit_delay = config.get("rate_limit_delay", 0.1)
+            self.max_concurrent_requests = config.get("max_concurrent_requests", 4)
+            self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
             self.max_retries = config.get("max_retries", 3)
             self.timeout = config.get("timeout", 30)
             self.include_amendments = config.get("include_amendments", False)
             
             # Create aiohttp session
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self.session = aiohttp.ClientSession(
+            self.session = self._create_session(
                 timeout=timeout,
                 headers=self.headers
             )
@@ -180,26 +194,20 @@ class SECFilingsPlugin(DataSourcePlugin):
         
         return ticker_to_cik.get(ticker.upper())
     
+    @cached_response
+    @guarded_request
     async def _rate_limited_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make rate-limited API request to SEC."""
         if not self.session:
             raise RuntimeError("Plugin not initialized")
         
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        time_since_last_call = current_time - self.last_call_time
-        
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            await asyncio.sleep(sleep_time)
-        
         url = f"{self.base_url}{endpoint}"
         
         for attempt in range(self.max_retries):
             try:
                 logger.debug(f"SEC API request (attempt {attempt + 1}): {endpoint}")
                 
-                async with self.session.get(url, params=params) as response:
+                async with self.rate_limiter, self.session.get(url, params=params) as response:
                     self.last_call_time = asyncio.get_event_loop().time()
                     
                     if response.status == 200:
@@ -208,9 +216,9 @@ class SECFilingsPlugin(DataSourcePlugin):
                     
                     elif response.status == 429:
                         # Rate limit exceeded
-                        wait_time = (attempt + 1) * 10
+                        wait_time = parse_retry_after(response.headers.get("Retry-After"), (attempt + 1) * 10)
                         logger.warning(f"SEC rate limit exceeded, waiting {wait_time} seconds")
-                        await asyncio.sleep(wait_time)
+                        self.rate_limiter.defer(wait_time)
                         continue
                     
                     elif response.status == 404:
@@ -226,13 +234,13 @@ class SECFilingsPlugin(DataSourcePlugin):
                 logger.warning(f"SEC request timeout (attempt {attempt + 1})")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 5)
+                await self._retry_pause((attempt + 1) * 5)
             
             except Exception as e:
                 logger.error(f"SEC request failed (attempt {attempt + 1}): {str(e)}")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 2)
+                await self._retry_pause((attempt + 1) * 2)
         
         raise RuntimeError(f"SEC request failed after {self.max_retries} attempts")
     
@@ -644,6 +652,7 @@ class SECFilingsPlugin(DataSourcePlugin):
             "name": self.name,
             "status": "active" if self.session and not self.session.closed else "inactive",
             "rate_limit_delay": self.rate_limit_delay,
+            "rate_limiter": self.rate_limiter.get_status(),
             "last_call_time": self.last_call_time,
             "max_retries": self.max_retries,
             "timeout": self.timeout,
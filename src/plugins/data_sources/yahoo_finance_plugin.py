@@ -10,6 +10,9 @@ from datetime import datetime, timedelta
 import re
 
 from .data_source_plugin import DataSourcePlugin
+from ..circuit_breaker import guarded_request
+from ..response_cache import cached_response
+from ..rate_limiter import AsyncRateLimiter, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -42,9 +45,12 @@ class YahooFinancePlugin(DataSourcePlugin):
         
         self.session: Optional[aiohttp.ClientSession] = None
         self.rate_limit_delay = 0.1  # Yahoo allows higher rate limits
+        self.max_concurrent_requests = 4
+        self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
         self.last_call_time = 0
         self.max_retries = 3
         self.timeout = 30
+        self.quote_batch_size = 100  # Symbols per quote request
         
         # User agent to avoid blocking
         self.headers = {
@@ -88,6 +94,13 @@ class YahooFinancePlugin(DataSourcePlugin):
                 "min": 0.01,
                 "max": 5.0
             },
+            "max_concurrent_requests": {
+                "type": "integer",
+                "description": "Maximum number of requests in flight at the same time",
+                "default": 4,
+                "min": 1,
+                "max": 20
+            },
             "max_retries": {
                 "type": "integer",
                 "description": "Maximum number of retry attempts for failed requests",
@@ -123,6 +136,8 @@ class YahooFinancePlugin(DataSourcePlugin):
         """Initialize plugin with configuration."""
         try:
             self.rate_limit_delay = config.get("rate_limit_delay", 0.1)
+            self.max_concurrent_requests = config.get("max_concurrent_requests", 4)
+            self.rate_limiter = AsyncRateLimiter.from_delay(self.rate_limit_delay, self.max_concurrent_requests)
             self.max_retries = config.get("max_retries", 3)
             self.timeout = config.get("timeout", 30)
             
@@ -133,7 +148,7 @@ class YahooFinancePlugin(DataSourcePlugin):
             
             # Create aiohttp session
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self.session = aiohttp.ClientSession(
+            self.session = self._create_session(
                 timeout=timeout,
                 headers=self.headers
             )
@@ -144,24 +159,18 @@ class YahooFinancePlugin(DataSourcePlugin):
             logger.error(f"Failed to initialize Yahoo Finance plugin: {str(e)}")
             raise
     
+    @cached_response
+    @guarded_request
     async def _rate_limited_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make rate-limited request to Yahoo Finance."""
         if not self.session:
             raise RuntimeError("Plugin not initialized")
         
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        time_since_last_call = current_time - self.last_call_time
-        
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            await asyncio.sleep(sleep_time)
-        
         for attempt in range(self.max_retries):
             try:
                 logger.debug(f"Yahoo Finance request (attempt {attempt + 1}): {url}")
                 
-                async with self.session.get(url, params=params) as response:
+                async with self.rate_limiter, self.session.get(url, params=params) as response:
                     self.last_call_time = asyncio.get_event_loop().time()
                     
                     if response.status == 200:
@@ -170,9 +179,9 @@ class YahooFinancePlugin(DataSourcePlugin):
                     
                     elif response.status == 429:
                         # Rate limit exceeded
-                        wait_time = (attempt + 1) * 5
+                        wait_time = parse_retry_after(response.headers.get("Retry-After"), (attempt + 1) * 5)
                         logger.warning(f"Yahoo Finance rate limit exceeded, waiting {wait_time} seconds")
-                        await asyncio.sleep(wait_time)
+                        self.rate_limiter.defer(wait_time)
                         continue
                     
                     elif response.status == 404:
@@ -188,13 +197,13 @@ class YahooFinancePlugin(DataSourcePlugin):
                 logger.warning(f"Yahoo Finance request timeout (attempt {attempt + 1})")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 2)
+                await self._retry_pause((attempt + 1) * 2)
             
             except Exception as e:
                 logger.error(f"Yahoo Finance request failed (attempt {attempt + 1}): {str(e)}")
                 if attempt == self.max_retries - 1:
                     raise
-                await asyncio.sleep((attempt + 1) * 1)
+                await self._retry_pause((attempt + 1) * 1)
         
         raise RuntimeError(f"Yahoo Finance request failed after {self.max_retries} attempts")
     
@@ -300,6 +309,49 @@ class YahooFinancePlugin(DataSourcePlugin):
             logger.error(f"Error fetching OHLCV data for {ticker}: {str(e)}")
             return []
     
+    async def fetch_quotes_batch(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch real-time quotes for many tickers with one call to the quote endpoint.
+        
+        OHLCV batches keep the default fan-out: the multi-symbol spark endpoint only returns closes.
+        
+        Args:
+            tickers: Stock ticker symbols
+            
+        Returns:
+            Dictionary {ticker: quote}; tickers without a quote are omitted
+        """
+        requested = {ticker.upper(): ticker for ticker in tickers}
+        quotes = {}
+        try:
+            # Sorted symbols: the same portfolio always maps to the same (cacheable) request
+            symbols = sorted(requested)
+            for i in range(0, len(symbols), self.quote_batch_size):
+                chunk = symbols[i:i + self.quote_batch_size]
+                data = await self._rate_limited_request(self.quote_url, {"symbols": ",".join(chunk)})
+                for item in (data or {}).get("quoteResponse", {}).get("result", []):
+                    ticker = requested.get(str(item.get("symbol", "")).upper())
+                    price = item.get("regularMarketPrice")
+                    if ticker is None or price is None:
+                        continue
+                    market_time = item.get("regularMarketTime")
+                    quotes[ticker] = {
+                        "ticker": ticker,
+                        "price": float(price),
+                        "change": item.get("regularMarketChange"),
+                        "change_percent": item.get("regularMarketChangePercent"),
+                        "volume": item.get("regularMarketVolume"),
+                        "timestamp": datetime.fromtimestamp(market_time).isoformat() if market_time else None,
+                        "source": "yahoo_finance"
+                    }
+            
+            logger.info(f"Fetched {len(quotes)} of {len(requested)} quotes from Yahoo Finance")
+            return quotes
+        
+        except Exception as e:
+            logger.error(f"Error fetching quotes for {len(requested)} tickers: {str(e)}")
+            return quotes
+    
     async def fetch_technical_indicators(
         self,
         ticker: str,
@@ -532,6 +584,7 @@ class YahooFinancePlugin(DataSourcePlugin):
             "name": self.name,
             "status": "active" if self.session and not self.session.closed else "inactive",
             "rate_limit_delay": self.rate_limit_delay,
+            "rate_limiter": self.rate_limiter.get_status(),
             "last_call_time": self.last_call_time,
             "max_retries": self.max_retries,
             "timeout": self.timeout,
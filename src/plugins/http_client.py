@@ -0,0 +1,102 @@
+"""
+Shared HTTP connection pool for data source plugins.
+
+Every plugin used to open its own aiohttp.ClientSession with a default connector, so the nine
+sources kept separate socket pools, DNS lookups and TLS sessions. The factory owns a single
+tuned TCPConnector; plugins still get their own ClientSession (own timeout and headers) on top
+of it, so connections, keep-alive and the DNS cache are shared.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from src.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientFactory:
+    """Creates plugin sessions on one shared, tuned TCPConnector."""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300
+    ):
+        """
+        Initialize HttpClientFactory.
+
+        Args:
+            limit: Maximum number of open connections in total
+            limit_per_host: Maximum number of open connections per host
+            keepalive_timeout: Seconds an idle connection is kept for reuse
+            dns_cache_ttl: Seconds resolved host names are cached
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._loop = None
+        self.sessions_created = 0
+
+    @classmethod
+    def from_config(cls) -> "HttpClientFactory":
+        """Create the factory from the data_sources.http config section."""
+        config = Config.get("data_sources", {}).get("http", {})
+        return cls(
+            limit=config.get("max_connections", 100),
+            limit_per_host=config.get("max_connections_per_host", 10),
+            keepalive_timeout=config.get("keepalive_seconds", 30),
+            dns_cache_ttl=config.get("dns_cache_seconds", 300),
+        )
+
+    @property
+    def connector(self) -> aiohttp.TCPConnector:
+        """Shared connector of the running event loop (created lazily, recreated for a new loop)."""
+        loop = asyncio.get_running_loop()
+        if self._connector is None or self._connector.closed or self._loop is not loop:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            self._loop = loop
+        return self._connector
+
+    def create_session(
+        self,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> aiohttp.ClientSession:
+        """Create a session on the shared connector; closing it leaves the connector open."""
+        self.sessions_created += 1
+        return aiohttp.ClientSession(
+            connector=self.connector,
+            connector_owner=False,
+            timeout=timeout or aiohttp.ClientTimeout(total=30),
+            headers=headers,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "keepalive_timeout": self.keepalive_timeout,
+            "dns_cache_ttl": self.dns_cache_ttl,
+            "sessions_created": self.sessions_created,
+            "open": self._connector is not None and not self._connector.closed,
+        }
+
+    async def close(self) -> None:
+        """Close the shared connector and all pooled connections."""
+        if self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+        self._connector = None
+        self._loop = None
@@ -5,9 +5,17 @@ import sys
 from typing import Dict, Any, List, Type, Optional
 import logging
 import asyncio
+import json
+import time
 from datetime import datetime
 
+from src.config.config import Config
+from src.plugins.circuit_breaker import OPEN, CircuitBreaker
 from src.plugins.data_sources.data_source_plugin import DataSourcePlugin
+from src.plugins.http_client import HttpClientFactory
+from src.plugins.response_cache import ResponseCache, request_data_type
+from src.plugins.routing import LatencyStats, hedged_first_success, rank_plugins
+from src.plugins.sentiment_lexicon import close_process_pool
 
 # Import all available data source plugins
 from src.plugins.data_sources.alpha_vantage_plugin import AlphaVantagePlugin
@@ -52,6 +60,18 @@ class PluginManager:
                 "RedditSentimentPlugin": RedditSentimentPlugin,
                 "NewsSentimentPlugin": NewsSentimentPlugin
             }
+            # Gemeinsamer Antwort-Cache aller Plugins (None, wenn data_sources.cache_enabled false ist)
+            self.response_cache: Optional[ResponseCache] = ResponseCache.from_config()
+            # Gemeinsamer Verbindungspool aller Plugins (Keep-Alive, DNS-Cache, Limits je Host)
+            self.http_client = HttpClientFactory.from_config()
+            # Laufende Anfragen je Schlüssel (Single-Flight) und Anzahl der zusammengelegten Aufrufe
+            self._in_flight_requests: Dict[str, asyncio.Future] = {}
+            self._in_flight_waiters: Dict[str, int] = {}
+            self.coalesced_requests = 0
+            # Latenz- und Fehlerstatistik je Plugin und Datentyp (Grundlage des Routings)
+            self.latency_stats: Dict[str, Dict[str, LatencyStats]] = {}
+            # Circuit Breaker je Plugin: ausgefallene Anbieter schlagen sofort fehl, statt Anfragen zu blockieren
+            self.circuit_breakers: Dict[str, CircuitBreaker] = {}
             self._is_initialized = True
 
     async def load_plugins(self):
@@ -64,7 +84,12 @@ class PluginManager:
             try:
                 # Instanziiere das Plugin
                 plugin_instance = plugin_class()
+                plugin_instance.response_cache = self.response_cache
+                plugin_instance.http_client = self.http_client
                 plugin_name = plugin_instance.get_name()
+                plugin_instance.circuit_breaker = self.circuit_breakers.setdefault(
+                    plugin_name, CircuitBreaker.from_config(plugin_name)
+                )
                 
                 self.plugins[plugin_name] = plugin_instance
                 self.active_plugins[plugin_name] = False  # Standardmäßig inaktiv
@@ -122,6 +147,10 @@ class PluginManager:
                 logger.info(f"Plugin '{plugin_name}' geschlossen.")
             except Exception as e:
                 logger.error(f"Fehler beim Schließen von Plugin '{plugin_name}': {e}")
+        if self.response_cache:
+            await self.response_cache.close()
+        await self.http_client.close()
+        close_process_pool()
 
     def get_plugin(self, name: str) -> Optional[DataSourcePlugin]:
         """
@@ -185,6 +214,15 @@ class PluginManager:
                 "active_plugins": active_count,
                 "inactive_plugins": inactive_count,
                 "failed_plugins_count": 0,
+                "response_cache": self.response_cache.get_stats() if self.response_cache else None,
+                "http_client": self.http_client.get_stats(),
+                "in_flight_requests": len(self._in_flight_requests),
+                "coalesced_requests": self.coalesced_requests,
+                "open_circuits": [name for name, breaker in self.circuit_breakers.items() if breaker.state == OPEN],
+                "latency": {
+                    plugin_name: {data_type: stats.summary() for data_type, stats in by_type.items()}
+                    for plugin_name, by_type in self.latency_stats.items()
+                },
                 "plugins": {}
             }
         }
@@ -194,6 +232,8 @@ class PluginManager:
                 plugin_status = plugin_instance.get_status()
                 plugin_status["active"] = self.active_plugins.get(plugin_name, False)
                 plugin_status["configured"] = plugin_name in self.plugin_configs
+                breaker = self.circuit_breakers.get(plugin_name)
+                plugin_status["circuit_breaker"] = breaker.get_status() if breaker else None
                 status["details"]["plugins"][plugin_name] = plugin_status
                 
                 # Check for plugin errors
@@ -303,6 +343,8 @@ class PluginManager:
                                    start_date: str, end_date: str, **kwargs) -> List[Dict[str, Any]]:
         """
         Holt Daten von einem spezifischen Plugin.
+        Gleichzeitige identische Anfragen (Plugin, Datentyp, Ticker, Zeitraum, Parameter) warten
+        auf denselben Upstream-Aufruf, statt ihn mehrfach auszulösen.
         
         Args:
             plugin_name: Name des Plugins
@@ -315,28 +357,150 @@ class PluginManager:
         Returns:
             Liste von Datensätzen oder leere Liste bei Fehlern
         """
+        key = json.dumps(
+            [plugin_name, data_type.lower(), ticker, start_date, end_date, kwargs], sort_keys=True, default=str
+        )
+        # Jeder Aufrufer erhält eine eigene Liste (die Datensätze selbst werden geteilt)
+        return list(await self._single_flight(
+            key, lambda: self._fetch_data_from_plugin(plugin_name, data_type, ticker, start_date, end_date, **kwargs)
+        ))
+
+    async def fetch_ohlcv_batch(self, plugin_name: str, tickers: List[str], start_date: str, end_date: str,
+                                interval: str = 'daily') -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Holt OHLCV-Daten mehrerer Ticker über die Batch-API des Plugins
+        (nativer Mehrfach-Endpunkt oder parallele Einzelabfragen).
+        
+        Args:
+            plugin_name: Name des Plugins
+            tickers: Ticker-Symbole
+            start_date: Startdatum (YYYY-MM-DD)
+            end_date: Enddatum (YYYY-MM-DD)
+            interval: Datenintervall
+            
+        Returns:
+            Dictionary {Ticker: Datensätze}, leer bei Fehlern
+        """
+        key = json.dumps([plugin_name, 'ohlcv_batch', sorted(set(tickers)), start_date, end_date, interval])
+        return dict(await self._single_flight(
+            key, lambda: self._fetch_batch(plugin_name, 'ohlcv', 'fetch_ohlcv_batch', tickers, start_date, end_date, interval)
+        ))
+
+    async def fetch_quotes_batch(self, plugin_name: str, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Holt aktuelle Kurse mehrerer Ticker, bei Plugins mit Quote-Endpunkt in einem Aufruf.
+        
+        Args:
+            plugin_name: Name des Plugins
+            tickers: Ticker-Symbole
+            
+        Returns:
+            Dictionary {Ticker: Kurs}, Ticker ohne Kurs fehlen
+        """
+        key = json.dumps([plugin_name, 'quotes_batch', sorted(set(tickers))])
+        return dict(await self._single_flight(
+            key, lambda: self._fetch_batch(plugin_name, 'quotes', 'fetch_quotes_batch', tickers)
+        ))
+
+    async def _single_flight(self, key: str, start_request):
+        """
+        Gibt das Ergebnis der laufenden Anfrage mit gleichem Schlüssel zurück oder startet sie.
+        """
+        task = self._in_flight_requests.get(key)
+        # Abgebrochene Anfragen nicht weitergeben: der neue Aufrufer selbst wurde nicht abgebrochen
+        if task is None or task.cancelled():
+            task = asyncio.ensure_future(start_request())
+            self._in_flight_requests[key] = task
+
+            def forget(done_task):
+                if self._in_flight_requests.get(key) is done_task:
+                    del self._in_flight_requests[key]
+
+            task.add_done_callback(forget)
+        else:
+            self.coalesced_requests += 1
+
+        # shield: bricht ein Aufrufer ab, laufen die Anfrage und die übrigen Wartenden weiter.
+        # Erst wenn kein Wartender mehr übrig ist, wird auch die Anfrage abgebrochen.
+        self._in_flight_waiters[key] = self._in_flight_waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._in_flight_waiters[key] -= 1
+            if not self._in_flight_waiters[key]:
+                del self._in_flight_waiters[key]
+                if not task.done():
+                    # Sofort austragen, nicht erst im Done-Callback: sonst übernimmt ein neuer
+                    # Aufrufer die abgebrochene Anfrage und erhält CancelledError
+                    if self._in_flight_requests.get(key) is task:
+                        del self._in_flight_requests[key]
+                    task.cancel()
+
+    def _get_active_plugin(self, plugin_name: str) -> Optional[DataSourcePlugin]:
+        """
+        Gibt das Plugin zurück, wenn es geladen, aktiv und sein Circuit nicht offen ist (sonst None).
+        """
         plugin = self.get_plugin(plugin_name)
         if not plugin:
             logger.warning(f"Plugin '{plugin_name}' nicht gefunden.")
-            return []
+            return None
         
         if not self.active_plugins.get(plugin_name, False):
             logger.warning(f"Plugin '{plugin_name}' ist nicht aktiv.")
+            return None
+        
+        breaker = self.circuit_breakers.get(plugin_name)
+        if breaker and breaker.state == OPEN:
+            breaker.rejected += 1
+            logger.debug(f"Circuit von Plugin '{plugin_name}' ist offen, Anfrage übersprungen.")
+            return None
+        return plugin
+
+    async def _fetch_batch(self, plugin_name: str, data_type: str, method_name: str, tickers: List[str], *args) -> Dict[str, Any]:
+        """
+        Führt eine Batch-Anfrage an das Plugin aus (siehe fetch_ohlcv_batch / fetch_quotes_batch).
+        """
+        plugin = self._get_active_plugin(plugin_name)
+        if not plugin:
+            return {}
+        
+        data_type_token = request_data_type.set(data_type)
+        try:
+            return await self._timed(plugin_name, data_type,
+                                     getattr(plugin, method_name)(list(dict.fromkeys(tickers)), *args))
+        except Exception as e:
+            logger.error(f"Fehler beim Batch-Abruf von Plugin '{plugin_name}': {e}")
+            return {}
+        finally:
+            request_data_type.reset(data_type_token)
+
+    async def _fetch_data_from_plugin(self, plugin_name: str, data_type: str, ticker: str,
+                                      start_date: str, end_date: str, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Führt die eigentliche Anfrage an das Plugin aus (siehe fetch_data_from_plugin).
+        """
+        plugin = self._get_active_plugin(plugin_name)
+        if not plugin:
             return []
         
+        # Der Datentyp bestimmt die Cache-Lebensdauer der Antworten
+        data_type_token = request_data_type.set(data_type.lower())
         try:
             if data_type.lower() == 'ohlcv':
                 interval = kwargs.get('interval', 'daily')
-                return await plugin.fetch_ohlcv_data(ticker, start_date, end_date, interval)
+                return await self._timed(plugin_name, 'ohlcv',
+                                         plugin.fetch_ohlcv_data(ticker, start_date, end_date, interval))
             
             elif data_type.lower() == 'indicators':
                 indicator_type = kwargs.get('indicator_type', '')
                 params = kwargs.get('params', {})
-                return await plugin.fetch_technical_indicators(ticker, indicator_type, params)
+                return await self._timed(plugin_name, 'indicators',
+                                         plugin.fetch_technical_indicators(ticker, indicator_type, params))
             
             elif data_type.lower() == 'events':
                 event_type = kwargs.get('event_type', '')
-                return await plugin.fetch_event_data(ticker, event_type, start_date, end_date)
+                return await self._timed(plugin_name, 'events',
+                                         plugin.fetch_event_data(ticker, event_type, start_date, end_date))
             
             else:
                 logger.warning(f"Unbekannter Datentyp: {data_type}")
@@ -345,7 +509,122 @@ class PluginManager:
         except Exception as e:
             logger.error(f"Fehler beim Abrufen von Daten von Plugin '{plugin_name}': {e}")
             return []
+        finally:
+            request_data_type.reset(data_type_token)
     
+    async def _timed(self, plugin_name: str, data_type: str, request):
+        """
+        Führt eine Plugin-Anfrage aus und erfasst Latenz und Erfolg (leere Antworten zählen als Fehler,
+        da die Plugins Fehler intern abfangen und leere Ergebnisse liefern).
+        """
+        stats = self.latency_stats.setdefault(plugin_name, {}).setdefault(data_type, LatencyStats())
+        started = time.perf_counter()
+        try:
+            result = await request
+        except asyncio.CancelledError:
+            # Abgebrochene Hedge-Anfrage: die Laufzeit ist eine Untergrenze der Latenz, kein Fehler
+            stats.record(time.perf_counter() - started, ok=True)
+            raise
+        except Exception:
+            stats.record(time.perf_counter() - started, ok=False)
+            raise
+        stats.record(time.perf_counter() - started, ok=bool(result))
+        return result
+
+    def _routing_config(self) -> Dict[str, Any]:
+        return Config.get("data_sources", {}).get("routing", {})
+
+    def rank_plugins_for(self, data_type: str, plugins: Optional[List[str]] = None) -> List[str]:
+        """
+        Gibt die aktiven Plugins für einen Datentyp in Routing-Reihenfolge zurück.
+        
+        Args:
+            data_type: Datentyp ('ohlcv', 'quotes', ...)
+            plugins: Prioritätsliste (Standard: data_sources.routing.<data_type>, sonst alle aktiven Plugins)
+            
+        Returns:
+            Plugin-Namen, sortiert nach erwarteter Latenz und Fehlerrate; die Priorität entscheidet bei Gleichstand.
+            Plugins mit offenem Circuit stehen am Ende.
+        """
+        config = self._routing_config()
+        priority = plugins or config.get(data_type) or list(self.plugins.keys())
+        candidates = [name for name in priority if self.plugins.get(name) and self.active_plugins.get(name, False)]
+        stats = {name: self.latency_stats.get(name, {}).get(data_type) for name in candidates}
+        ranked = rank_plugins(
+            candidates,
+            {name: plugin_stats for name, plugin_stats in stats.items() if plugin_stats},
+            unmeasured_latency=config.get("hedge_delay_seconds", 0.5),
+            max_error_rate=config.get("max_error_rate", 0.5),
+        )
+        return sorted(ranked, key=lambda name: name in self.circuit_breakers and self.circuit_breakers[name].state == OPEN)
+
+    def _hedge_delay(self, data_type: str, plugin_name: str) -> float:
+        """
+        Wartezeit bis zur Hedge-Anfrage: Latenz-Perzentil des Plugins, begrenzt auf das konfigurierte Intervall.
+        """
+        config = self._routing_config()
+        stats = self.latency_stats.get(plugin_name, {}).get(data_type)
+        delay = stats.percentile(config.get("hedge_percentile", 95)) if stats else None
+        if delay is None:
+            return config.get("hedge_delay_seconds", 0.5)
+        return min(max(delay, config.get("hedge_min_delay_seconds", 0.05)), config.get("hedge_max_delay_seconds", 2.0))
+
+    async def _fetch_routed(self, data_type: str, plugins: Optional[List[str]], start_request):
+        ranked = self.rank_plugins_for(data_type, plugins)
+        if not ranked:
+            logger.warning(f"Keine aktiven Plugins für Datentyp '{data_type}' gefunden.")
+            return None
+        plugin_name, result = await hedged_first_success(
+            ranked,
+            start_request,
+            hedge_delay=lambda name: self._hedge_delay(data_type, name),
+            timeout=self._routing_config().get("timeout_seconds", 30),
+        )
+        if plugin_name is None:
+            logger.warning(f"Kein Plugin lieferte gültige Daten für '{data_type}' (versucht: {ranked}).")
+        return result
+
+    async def fetch_data_routed(self, data_type: str, ticker: str, start_date: str, end_date: str,
+                                plugins: Optional[List[str]] = None, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Holt Daten vom ersten Plugin, das gültige Daten liefert, statt auf alle Plugins zu warten.
+        Das bestplatzierte Plugin wird zuerst angefragt; ist es langsamer als sein übliches
+        Latenz-Perzentil oder liefert es nichts, wird das nächste Plugin angefragt (Hedging).
+        Das erste gültige Ergebnis gewinnt, die übrigen Anfragen werden abgebrochen.
+        
+        Args:
+            data_type: Typ der Daten ('ohlcv', 'indicators', 'events')
+            ticker: Ticker-Symbol
+            start_date: Startdatum (YYYY-MM-DD)
+            end_date: Enddatum (YYYY-MM-DD)
+            plugins: Prioritätsliste (Standard: data_sources.routing.<data_type>)
+            **kwargs: Zusätzliche Parameter
+            
+        Returns:
+            Liste von Datensätzen oder leere Liste, wenn kein Plugin Daten liefert
+        """
+        result = await self._fetch_routed(
+            data_type.lower(), plugins,
+            lambda name: self.fetch_data_from_plugin(name, data_type, ticker, start_date, end_date, **kwargs)
+        )
+        return result or []
+
+    async def fetch_quotes_routed(self, tickers: List[str], plugins: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Holt aktuelle Kurse mehrerer Ticker vom ersten Plugin mit gültiger Antwort (siehe fetch_data_routed).
+        
+        Args:
+            tickers: Ticker-Symbole
+            plugins: Prioritätsliste (Standard: data_sources.routing.quotes)
+            
+        Returns:
+            Dictionary {Ticker: Kurs}, leer wenn kein Plugin Kurse liefert
+        """
+        result = await self._fetch_routed(
+            'quotes', plugins, lambda name: self.fetch_quotes_batch(name, tickers)
+        )
+        return result or {}
+
     async def fetch_data_from_all_active_plugins(self, data_type: str, ticker: str, 
                                                start_date: str, end_date: str, **kwargs) -> Dict[str, List[Dict[str, Any]]]:
         """
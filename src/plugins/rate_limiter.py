@@ -0,0 +1,140 @@
+"""
+Async rate limiting for data source plugins.
+
+A token bucket spaces request starts to the provider quota, while a semaphore allows several
+requests to be in flight at once. Previously a plugin slept rate_limit_delay after its last call,
+so at most one request was running and throughput was 1 / (rate_limit_delay + latency).
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """Seconds to wait according to a Retry-After header (delta seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket with a limit on concurrent requests.
+
+    Usage:
+        async with limiter:
+            ... one request ...
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: Optional[int] = None,
+        max_in_flight: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize AsyncRateLimiter.
+
+        Args:
+            rate: Request starts per second (None or <= 0: no rate limit)
+            burst: Bucket capacity, i.e. requests that may start back to back (default: max_in_flight)
+            max_in_flight: Maximum number of requests running at the same time
+            clock: Monotonic time source
+        """
+        self.rate = rate if rate and rate > 0 else None
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.burst = max(1, int(burst if burst is not None else self.max_in_flight))
+        self.clock = clock
+        self.in_flight = 0
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._loop = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_delay(cls, rate_limit_delay: float, max_in_flight: int = 1) -> "AsyncRateLimiter":
+        """Limiter allowing one request start per rate_limit_delay seconds on average."""
+        return cls(1.0 / rate_limit_delay if rate_limit_delay and rate_limit_delay > 0 else None,
+                   max_in_flight=max_in_flight)
+
+    def _primitives(self):
+        # asyncio primitives belong to one event loop; recreate them for a new loop (e.g. a new asyncio.run)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self.in_flight = 0
+        return self._lock, self._semaphore
+
+    def _refill(self, now: float) -> None:
+        if self.rate is None:
+            self._tokens = float(self.burst)
+        else:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def _take_token(self) -> None:
+        while True:
+            now = self.clock()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def acquire(self) -> None:
+        """Wait for a free in-flight slot, then for a token (callers are served in order)."""
+        lock, semaphore = self._primitives()
+        await semaphore.acquire()
+        try:
+            async with lock:
+                await self._take_token()
+        except BaseException:
+            semaphore.release()
+            raise
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def defer(self, seconds: float) -> None:
+        """Block all new requests for the given time (e.g. after HTTP 429 with Retry-After)."""
+        self._blocked_until = max(self._blocked_until, self.clock() + max(0.0, seconds))
+        # No burst right after the pause
+        self._tokens = 0.0
+        self._updated = self._blocked_until
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "requests_per_second": self.rate,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "blocked_for": round(max(0.0, self._blocked_until - self.clock()), 2),
+        }
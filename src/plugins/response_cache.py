@@ -0,0 +1,321 @@
+"""
+Shared response cache for data source plugins.
+
+Responses of the plugins' request methods are kept in two tiers: an in-memory LRU and a
+SQLite file that survives restarts. Only the memory lookup runs on the event loop; disk reads
+and batched writes run on worker threads. Entries are keyed on (plugin, request arguments) and
+expire per data type. Within the stale window an expired entry is still returned
+immediately while a background task fetches a fresh copy (stale-while-revalidate).
+"""
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.config import Config
+from src.database.connection_pool import configure_connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data/http_cache.db')
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_TTL_HOURS = 6
+DEFAULT_STALE_HOURS = 24
+
+# Request parameters that carry credentials are never part of a cache key
+CREDENTIAL_PARAMS = {"apikey", "api_key", "token", "access_token", "key"}
+
+# Data type of the request currently being served; set by PluginManager.fetch_data_from_plugin
+request_data_type: contextvars.ContextVar = contextvars.ContextVar("request_data_type", default="default")
+
+CACHE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS http_responses (
+        key TEXT PRIMARY KEY,
+        plugin TEXT NOT NULL,
+        data_type TEXT NOT NULL,
+        stored_at REAL NOT NULL,
+        payload TEXT NOT NULL
+    )
+"""
+
+
+def _key_part(value: Any) -> Any:
+    """Strip credentials from request parameters."""
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if str(k).lower() not in CREDENTIAL_PARAMS}
+    return value
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) response cache with per-data-type TTLs."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = DEFAULT_CACHE_PATH,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        default_ttl: float = DEFAULT_TTL_HOURS * 3600,
+        ttls: Optional[Dict[str, float]] = None,
+        stale_seconds: float = DEFAULT_STALE_HOURS * 3600,
+        stale_by_type: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize ResponseCache.
+
+        Args:
+            db_path: SQLite file for the persistent tier (None: memory only)
+            memory_entries: Maximum number of responses kept in memory
+            default_ttl: Time to live in seconds for data types without an entry in ttls
+            ttls: Time to live in seconds per data type ('ohlcv', 'indicators', 'events', ...)
+            stale_seconds: How long after expiry a response may still be served while it is refreshed
+            stale_by_type: Stale window in seconds per data type (e.g. 0 for quotes)
+            clock: Time source (wall clock, since entries are persisted)
+        """
+        self.db_path = db_path
+        self.memory_entries = max(1, int(memory_entries))
+        self.default_ttl = float(default_ttl)
+        self.ttls = {data_type: float(ttl) for data_type, ttl in (ttls or {}).items()}
+        self.stale_seconds = float(stale_seconds)
+        self.stale_by_type = {data_type: float(stale) for data_type, stale in (stale_by_type or {}).items()}
+        self.clock = clock
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Responses waiting to be written to the disk tier, and the task writing them
+        self._pending_writes: Dict[str, Tuple[str, str, str, float, str]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "disk_hits": 0, "stale_hits": 0, "misses": 0, "revalidations": 0}
+
+    @classmethod
+    def from_config(cls) -> Optional["ResponseCache"]:
+        """Create the cache from the data_sources config section (None if caching is disabled)."""
+        config = Config.get("data_sources", {})
+        if not config.get("cache_enabled", True):
+            return None
+        ttls = {data_type: hours * 3600 for data_type, hours in config.get("cache_ttl_hours", {}).items()}
+        stale_by_type = {
+            data_type: hours * 3600 for data_type, hours in config.get("cache_stale_hours_by_type", {}).items()
+        }
+        return cls(
+            db_path=config.get("cache_path") or DEFAULT_CACHE_PATH,
+            memory_entries=config.get("cache_memory_entries", DEFAULT_MEMORY_ENTRIES),
+            default_ttl=config.get("cache_duration_hours", DEFAULT_TTL_HOURS) * 3600,
+            ttls=ttls,
+            stale_seconds=config.get("cache_stale_hours", DEFAULT_STALE_HOURS) * 3600,
+            stale_by_type=stale_by_type,
+        )
+
+    @staticmethod
+    def make_key(plugin: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+        """Stable key for a request; credentials and request headers are not part of it."""
+        parts = [
+            plugin,
+            [_key_part(arg) for arg in args],
+            {name: _key_part(value) for name, value in kwargs.items() if name != "headers"},
+        ]
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def ttl_for(self, data_type: str) -> float:
+        return self.ttls.get(data_type, self.default_ttl)
+
+    def stale_for(self, data_type: str) -> float:
+        return self.stale_by_type.get(data_type, self.stale_seconds)
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """
+        Lazily opened connection of the persistent tier; expired rows are purged on open.
+        Called on worker threads with the lock held.
+        """
+        if self._conn is None and self.db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            configure_connection(conn)
+            conn.execute(CACHE_TABLE_SQL)
+            max_age = (max([self.default_ttl, *self.ttls.values()])
+                       + max([self.stale_seconds, *self.stale_by_type.values()]))
+            conn.execute("DELETE FROM http_responses WHERE stored_at < ?", (self.clock() - max_age,))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _read_row(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            return conn.execute("SELECT stored_at, payload FROM http_responses WHERE key = ?", (key,)).fetchone()
+
+    def _write_rows(self, rows: List[Tuple[str, str, str, float, str]]) -> None:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            conn.executemany("INSERT OR REPLACE INTO http_responses VALUES (?, ?, ?, ?, ?)", rows)
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Get (stored_at, response) from memory or disk, regardless of age."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        if not self.db_path:
+            return None
+        pending = self._pending_writes.get(key)
+        if pending is not None:
+            row = (pending[3], pending[4])
+        else:
+            try:
+                row = await asyncio.to_thread(self._read_row, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read cached response: {str(e)}")
+                return None
+        if row is None:
+            return None
+        entry = (row[0], json.loads(row[1]))
+        self._remember(key, entry)
+        self.stats["disk_hits"] += 1
+        return entry
+
+    def set(self, key: str, plugin: str, data_type: str, response: Any) -> None:
+        """
+        Store a response in memory and queue it for the disk tier (memory only if it is not
+        JSON serializable). Queued responses are written in batches on a worker thread.
+        """
+        entry = (self.clock(), response)
+        self._remember(key, entry)
+        if not self.db_path:
+            return
+        try:
+            payload = json.dumps(response)
+        except (TypeError, ValueError):
+            return
+        self._pending_writes[key] = (key, plugin, data_type, entry[0], payload)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush())
+
+    async def _flush(self) -> None:
+        """Write queued responses until the queue is empty (one transaction per batch)."""
+        while self._pending_writes:
+            rows = list(self._pending_writes.values())
+            try:
+                await asyncio.to_thread(self._write_rows, rows)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist {len(rows)} cached responses: {str(e)}")
+            # Only drop what was written; newer responses for the same key stay queued
+            for row in rows:
+                if self._pending_writes.get(row[0]) is row:
+                    del self._pending_writes[row[0]]
+
+    def _remember(self, key: str, entry: Tuple[float, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        plugin: str,
+        data_type: str,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return the cached response, or fetch and store it.
+
+        Responses are shared between callers and must not be modified. Empty responses
+        and errors are not cached.
+        """
+        entry = await self.get(key)
+        if entry is not None:
+            stored_at, response = entry
+            age = self.clock() - stored_at
+            ttl = self.ttl_for(data_type)
+            if age < ttl:
+                self.stats["hits"] += 1
+                return response
+            if age < ttl + self.stale_for(data_type):
+                self.stats["stale_hits"] += 1
+                self._revalidate(key, plugin, data_type, fetch)
+                return response
+
+        self.stats["misses"] += 1
+        response = await fetch()
+        if response:
+            self.set(key, plugin, data_type, response)
+        return response
+
+    def _revalidate(self, key: str, plugin: str, data_type: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """Refresh an expired entry in the background (at most one refresh per key)."""
+        if key in self._revalidating:
+            return
+
+        async def refresh():
+            try:
+                response = await fetch()
+                if response:
+                    self.set(key, plugin, data_type, response)
+                    self.stats["revalidations"] += 1
+            except Exception as e:
+                logger.warning(f"Background refresh for {plugin} failed, keeping stale response: {str(e)}")
+
+        task = asyncio.ensure_future(refresh())
+        self._revalidating[key] = task
+        task.add_done_callback(lambda _: self._revalidating.pop(key, None))
+
+    async def clear(self) -> None:
+        """Remove all cached responses from both tiers."""
+        self._memory.clear()
+        self._pending_writes.clear()
+        if self.db_path:
+            await asyncio.to_thread(self._clear_disk)
+
+    def _clear_disk(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            if conn is not None:
+                conn.execute("DELETE FROM http_responses")
+                conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "memory_entries": len(self._memory), "revalidating": len(self._revalidating)}
+
+    async def close(self) -> None:
+        """Wait for running background refreshes and queued writes, then close the SQLite connection."""
+        if self._revalidating:
+            await asyncio.gather(*self._revalidating.values(), return_exceptions=True)
+        flush_task, self._flush_task = self._flush_task, None
+        if flush_task is not None and not flush_task.done():
+            await asyncio.gather(flush_task, return_exceptions=True)
+        # Writes left over, e.g. when the flush was cancelled together with its event loop
+        await self._flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def cached_response(request: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorator for a plugin's request method: serve responses through the plugin's
+    response_cache (set by PluginManager), or call through when the plugin has none.
+    """
+    @functools.wraps(request)
+    async def wrapper(self, *args, **kwargs):
+        cache: Optional[ResponseCache] = getattr(self, "response_cache", None)
+        if cache is None:
+            return await request(self, *args, **kwargs)
+        plugin = self.get_name()
+        # The key is built before the request, since some plugins add their API key to params
+        key = cache.make_key(plugin, args, kwargs)
+        return await cache.get_or_fetch(key, plugin, request_data_type.get(), lambda: request(self, *args, **kwargs))
+
+    return wrapper
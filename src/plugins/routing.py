@@ -0,0 +1,142 @@
+"""
+Latency statistics and hedged requests for routing data requests across plugins.
+
+Instead of waiting for every provider, a routed request starts at the best-ranked plugin and
+only sends a backup ("hedged") request when the primary is slower than its usual latency
+percentile or returns nothing. The first valid result wins and the other requests are cancelled.
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 200
+MIN_SAMPLES = 5
+
+
+class LatencyStats:
+    """Rolling latency samples and error rate of one plugin."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)  # True = valid result
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.latencies.append(seconds)
+        self.outcomes.append(ok)
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+
+    @property
+    def samples(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def error_rate(self) -> float:
+        return 1.0 - sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if self.samples < MIN_SAMPLES:
+            return None
+        return float(np.percentile(np.fromiter(self.latencies, dtype=np.float64), q))
+
+    def summary(self) -> Dict[str, Any]:
+        p50, p95, p99 = (self.percentile(q) for q in (50, 95, 99))
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 3),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+        }
+
+
+def rank_plugins(
+    plugins: Sequence[str],
+    stats: Dict[str, LatencyStats],
+    unmeasured_latency: float,
+    max_error_rate: float = 0.5
+) -> List[str]:
+    """
+    Order plugins by expected latency, penalised by their error rate. Plugins failing more often
+    than max_error_rate go last; plugins without enough samples count with unmeasured_latency.
+    The given priority order breaks ties.
+    """
+    def key(item):
+        index, name = item
+        plugin_stats = stats.get(name)
+        p50 = plugin_stats.percentile(50) if plugin_stats else None
+        error_rate = plugin_stats.error_rate if plugin_stats and plugin_stats.samples >= MIN_SAMPLES else 0.0
+        expected = (unmeasured_latency if p50 is None else p50) * (1.0 + error_rate)
+        return error_rate > max_error_rate, expected, index
+
+    return [name for _, name in sorted(enumerate(plugins), key=key)]
+
+
+async def hedged_first_success(
+    plugins: Sequence[str],
+    start_request: Callable[[str], Awaitable[Any]],
+    hedge_delay: Callable[[str], float],
+    is_valid: Callable[[Any], bool] = bool,
+    timeout: Optional[float] = None
+) -> tuple:
+    """
+    Run requests against plugins in order and return the first valid result.
+
+    The next plugin is started when the newest request has run longer than its hedge_delay,
+    or immediately when a request fails or returns an invalid result.
+
+    Returns:
+        (plugin name, result), or (None, None) if no plugin returned a valid result in time
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout else None
+    pending: Dict[asyncio.Task, str] = {}
+    remaining = list(plugins)
+
+    def launch_next() -> Optional[str]:
+        if not remaining:
+            return None
+        name = remaining.pop(0)
+        pending[asyncio.ensure_future(start_request(name))] = name
+        return name
+
+    newest = launch_next()
+    try:
+        while pending:
+            wait = hedge_delay(newest) if remaining else None
+            if deadline is not None:
+                left = deadline - loop.time()
+                if left <= 0:
+                    logger.warning(f"Routed request timed out after {timeout}s ({list(pending.values())} pending)")
+                    return None, None
+                wait = left if wait is None else min(wait, left)
+
+            done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Newest request is slower than usual: hedge with the next plugin
+                newest = launch_next() or newest
+                continue
+
+            for task in done:
+                name = pending.pop(task)
+                if task.cancelled():
+                    continue
+                if task.exception() is not None:
+                    logger.warning(f"Routed request to '{name}' failed: {task.exception()}")
+                elif is_valid(task.result()):
+                    return name, task.result()
+            # Failed or empty: try the next plugin right away instead of waiting for the hedge delay
+            newest = launch_next() or newest
+        return None, None
+    finally:
+        for task in pending:
+            task.cancel()
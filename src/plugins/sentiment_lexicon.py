@@ -0,0 +1,237 @@
+"""
+Keyword-based sentiment and relevance scoring shared by the sentiment plugins.
+
+The plugins used to test every keyword against every text (`keyword in text`) and to build the
+ticker regexes again for every article and ticker. Here all keyword lists are compiled once into
+a single trie-shaped regex, so a text is scanned once regardless of the lexicon size, and ticker
+patterns are compiled once per ticker (or once per ticker universe).
+
+SentimentScorer turns keyword counts into (score, label code, confidence) arrays and scores
+large batches on a process pool, so long threads and news backfills do not block the event loop.
+
+A keyword counts once per text, as before. Keywords contained in a longer matched keyword
+("loss" in "losses") are counted as well; only keyword occurrences overlapping another keyword
+without a separating character ("earningsell") are no longer found twice.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.config.config import Config
+
+# Sentiment labels by label code + 1 (codes: -1 negative, 0 neutral, 1 positive)
+LABELS = ("negative", "neutral", "positive")
+
+SentimentArrays = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Words after a ticker that mark a company mention ("aapl stock", "msft corp")
+COMPANY_SUFFIXES = ("corp", "corporation", "inc", "company", "ltd", "stock", "shares")
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Regex alternation of the words, factored as a trie (longest match first at each position)."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Finds which keywords of a fixed list occur in a (lowercase) text with one regex scan."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+        self.pattern = re.compile(_trie_regex(self.keywords)) if self.keywords else None
+        # A matched keyword implies all keywords it contains
+        self._implied = {
+            keyword: frozenset(other for other in self.keywords if other in keyword) for keyword in self.keywords
+        }
+
+    def find(self, text_lower: str) -> Set[str]:
+        if self.pattern is None or not text_lower:
+            return set()
+        found: Set[str] = set()
+        for keyword in set(self.pattern.findall(text_lower)):
+            found |= self._implied[keyword]
+        return found
+
+
+class SentimentLexicon:
+    """Named keyword groups (e.g. positive / negative / high_impact) counted with one scan per text."""
+
+    def __init__(self, **groups: Sequence[str]):
+        self.group_names: Tuple[str, ...] = tuple(groups)
+        self._groups = [frozenset(keyword.lower() for keyword in groups[name]) for name in self.group_names]
+        self.matcher = KeywordMatcher(keyword for name in self.group_names for keyword in groups[name])
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords of each group occurring in the text."""
+        found = self.matcher.find(text.lower()) if text else set()
+        return {name: len(found & words) for name, words in zip(self.group_names, self._groups)}
+
+    def count_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Keyword counts for many texts as an array of shape (len(texts), len(group_names))."""
+        rows = []
+        for text in texts:
+            found = self.matcher.find(text.lower()) if text else None
+            rows.append([len(found & words) for words in self._groups] if found else [0] * len(self._groups))
+        return np.array(rows, dtype=np.int32).reshape(len(texts), len(self.group_names))
+
+
+@functools.lru_cache(maxsize=4096)
+def ticker_pattern(ticker: str) -> "re.Pattern":
+    """Compiled pattern for mentions of one ticker; group 1 is set for company mentions ("aapl stock")."""
+    return re.compile(rf"\b{re.escape(ticker.lower())}\b(?:\s+({'|'.join(COMPANY_SUFFIXES)})\b)?")
+
+
+@functools.lru_cache(maxsize=32)
+def ticker_universe_pattern(tickers: Tuple[str, ...]) -> "re.Pattern":
+    """Compiled pattern for mentions of any of the tickers; group 1 is the ticker, group 2 the company suffix."""
+    alternation = _trie_regex(sorted({ticker.lower() for ticker in tickers}))
+    return re.compile(rf"\b({alternation})\b(?:\s+({'|'.join(COMPANY_SUFFIXES)})\b)?")
+
+
+def count_ticker_mentions(text_lower: str, ticker: str) -> Tuple[int, int]:
+    """(ticker mentions, company mentions) of one ticker in a lowercase text."""
+    mentions = company_mentions = 0
+    for match in ticker_pattern(ticker).finditer(text_lower):
+        mentions += 1
+        if match.group(1):
+            company_mentions += 1
+    return mentions, company_mentions
+
+
+def count_universe_mentions(text_lower: str, tickers: Tuple[str, ...]) -> Dict[str, List[int]]:
+    """[ticker mentions, company mentions] of every mentioned ticker (lowercase keys), in one scan."""
+    counts: Dict[str, List[int]] = {}
+    for match in ticker_universe_pattern(tickers).finditer(text_lower):
+        entry = counts.setdefault(match.group(1), [0, 0])
+        entry[0] += 1
+        if match.group(2):
+            entry[1] += 1
+    return counts
+
+
+def score_counts(counts: np.ndarray, label_threshold: float, impact_multiplier: float = 1.0) -> SentimentArrays:
+    """
+    Sentiment from keyword counts (columns positive, negative and optionally high_impact).
+
+    score = (positive - negative) / (positive + negative), multiplied by impact_multiplier if a
+    high impact keyword occurs; label by +/- label_threshold; score clamped to [-1, 1];
+    confidence = min((positive + negative + high_impact) / 10, 1).
+
+    Returns:
+        (scores float64, label codes int8, confidences float64)
+    """
+    counts = counts.astype(np.float64)
+    positive, negative = counts[:, 0], counts[:, 1]
+    impact = counts[:, 2] if counts.shape[1] > 2 else np.zeros(len(counts))
+    total = positive + negative
+    scores = np.divide(positive - negative, total, out=np.zeros(len(counts)), where=total > 0)
+    scores = np.where(impact > 0, scores * impact_multiplier, scores)
+    labels = np.where(scores > label_threshold, 1, np.where(scores < -label_threshold, -1, 0)).astype(np.int8)
+    confidences = np.minimum((total + impact) / 10, 1.0)
+    return np.clip(scores, -1.0, 1.0), labels, confidences
+
+
+# Process pool shared by all scorers; workers keep their compiled scorers between tasks
+_process_pool: Optional[ProcessPoolExecutor] = None
+_worker_scorers: Dict[tuple, "SentimentScorer"] = {}
+
+
+def _score_chunk_in_worker(spec: tuple, texts: List[str]) -> SentimentArrays:
+    """Score a chunk of texts in a worker process."""
+    scorer = _worker_scorers.get(spec)
+    if scorer is None:
+        scorer = _worker_scorers[spec] = SentimentScorer(*spec, workers=0)
+    return scorer.score_arrays(texts)
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # 'spawn' avoids forking a process that already runs the event loop and server threads
+        _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+
+def close_process_pool() -> None:
+    """Shut down the shared scoring process pool."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+class SentimentScorer:
+    """Keyword sentiment rules of a plugin, scored in batches in-process or on the shared process pool."""
+
+    def __init__(
+        self,
+        positive: Sequence[str],
+        negative: Sequence[str],
+        high_impact: Sequence[str] = (),
+        label_threshold: float = 0.3,
+        impact_multiplier: float = 1.0,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        inline_max: Optional[int] = None
+    ):
+        """
+        Initialize SentimentScorer.
+
+        Args:
+            positive, negative, high_impact: Keyword lists
+            label_threshold: Score above which a text is positive (below the negative value: negative)
+            impact_multiplier: Score factor for texts with a high impact keyword
+            workers: Scoring processes (default: config data_sources.sentiment_scoring.workers
+                     or min(2, CPUs); 0 scores in the calling process)
+            chunk_size: Texts per process pool task (default: config or 500)
+            inline_max: Batches up to this size are scored without the pool (default: config or 200)
+        """
+        config = Config.get("data_sources", {}).get("sentiment_scoring", {})
+        self.spec = (tuple(positive), tuple(negative), tuple(high_impact), float(label_threshold), float(impact_multiplier))
+        self.label_threshold = float(label_threshold)
+        self.impact_multiplier = float(impact_multiplier)
+        self.lexicon = SentimentLexicon(positive=positive, negative=negative, high_impact=high_impact)
+        self.workers = max(0, int(workers if workers is not None else config.get("workers", min(2, os.cpu_count() or 1))))
+        self.chunk_size = max(1, int(chunk_size or config.get("chunk_size", 500)))
+        self.inline_max = int(inline_max if inline_max is not None else config.get("inline_max", 200))
+
+    def score_arrays(self, texts: Sequence[str]) -> SentimentArrays:
+        """Score texts in the calling process."""
+        return score_counts(self.lexicon.count_batch(texts), self.label_threshold, self.impact_multiplier)
+
+    async def score_batch(self, texts: Sequence[str]) -> SentimentArrays:
+        """
+        Score texts without blocking the event loop: large batches are split into chunks and
+        scored on the process pool; small batches are scored directly, since sending them to a
+        worker costs more than scoring them.
+        """
+        texts = list(texts)
+        if self.workers == 0 or len(texts) <= self.inline_max:
+            return self.score_arrays(texts)
+        loop = asyncio.get_running_loop()
+        pool = _get_process_pool(self.workers)
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(pool, _score_chunk_in_worker, self.spec, chunk) for chunk in chunks
+        ))
+        return tuple(np.concatenate(parts) for parts in zip(*results))
@@ -0,0 +1,148 @@
+"""
+Ticker mention extraction for social media text.
+
+Candidates are cashtags ($AAPL) and words written in capitals in the original text. They are
+validated against a symbol universe (the candidates table and/or a symbol file) held in a hash
+set; without a universe only the common-word filter applies. Cashtags are reported first, since
+they are the most reliable signal.
+"""
+import logging
+import os
+import re
+import sqlite3
+from typing import Iterable, List, Optional, Sequence
+
+from src.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data/daki.db')
+
+# Capitalised words that are common in posts but (almost) never meant as tickers
+COMMON_WORDS = frozenset({
+    "THE", "AND", "OR", "BUT", "FOR", "NOT", "TO", "OF", "IN", "ON", "AT", "BY",
+    "UP", "DOWN", "OUT", "ALL", "ANY", "SO", "IF", "IT", "IS", "AM", "ARE", "WAS",
+    "WERE", "BE", "BEEN", "HAVE", "HAS", "HAD", "DO", "DOES", "DID", "WILL", "WOULD",
+    "COULD", "SHOULD", "MAY", "MIGHT", "CAN", "MUST", "GET", "GOT", "GO", "GOES",
+    "WENT", "COME", "CAME", "SEE", "SAW", "TAKE", "TOOK", "GIVE", "GAVE", "MAKE",
+    "MADE", "THINK", "THOUGHT", "KNOW", "KNEW", "WANT", "LIKE", "LOVE", "HATE",
+    "GOOD", "BAD", "BIG", "SMALL", "NEW", "OLD", "LONG", "SHORT", "HIGH", "LOW",
+    "BEST", "WORST", "MORE", "MOST", "LESS", "LEAST", "VERY", "TOO", "NOW", "THEN",
+    "HERE", "THERE", "THIS", "THAT", "THESE", "THOSE", "WHO", "WHAT", "WHEN",
+    "WHERE", "WHY", "HOW", "YES", "NO", "OK", "LOL", "OMG", "WTF", "FUD", "HODL",
+    "BUY", "SELL", "PUMP", "DUMP", "MOON", "YOLO", "DD",
+    "CEO", "CFO", "IPO", "ETF", "EPS", "ATH", "IMO", "USA", "USD", "EU", "UK", "AI",
+})
+
+# $AAPL, $brk.b
+CASHTAG_PATTERN = re.compile(r"(?<![\w$])\$([A-Za-z]{1,5}(?:\.[A-Za-z]{1,2})?)(?![\w])")
+# AAPL (capitals in the original text only)
+WORD_PATTERN = re.compile(r"(?<![\w$.])([A-Z]{1,5})(?![\w.])")
+
+
+class TickerExtractor:
+    """Extracts ticker mentions validated against a symbol universe."""
+
+    def __init__(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        common_words: Iterable[str] = COMMON_WORDS,
+        min_word_length: int = 2
+    ):
+        """
+        Initialize TickerExtractor.
+
+        Args:
+            symbols: Valid ticker symbols (None: accept any candidate that passes the word filter)
+            common_words: Capitalised words never reported as bare-word mentions
+            min_word_length: Minimum length of bare-word mentions (cashtags may be shorter)
+        """
+        self.symbols = {symbol.upper() for symbol in symbols} if symbols is not None else None
+        self.common_words = frozenset(word.upper() for word in common_words)
+        self.min_word_length = min_word_length
+
+    @classmethod
+    def from_config(cls) -> "TickerExtractor":
+        """
+        Create an extractor with the universe from data_sources.ticker_universe
+        (symbol_file and/or the candidates table; no universe if neither can be loaded).
+        """
+        config = Config.get("data_sources", {}).get("ticker_universe", {})
+        symbols = set()
+        loaded = False
+        symbol_file = config.get("symbol_file")
+        if symbol_file:
+            file_symbols = load_symbol_file(symbol_file)
+            if file_symbols is not None:
+                symbols.update(file_symbols)
+                loaded = True
+        if config.get("use_candidates", True):
+            candidate_symbols = load_candidate_symbols(config.get("database_path") or DEFAULT_DATABASE_PATH)
+            if candidate_symbols:
+                symbols.update(candidate_symbols)
+                loaded = True
+        return cls(symbols if loaded else None)
+
+    def add_symbols(self, symbols: Iterable[str]) -> None:
+        """Add symbols to the universe (no-op without a universe)."""
+        if self.symbols is not None:
+            self.symbols.update(symbol.upper() for symbol in symbols)
+
+    def extract(self, text: str) -> List[str]:
+        """Unique ticker mentions in order of appearance, cashtags first."""
+        if not text:
+            return []
+        symbols = self.symbols
+        found = {}
+        for match in CASHTAG_PATTERN.finditer(text):
+            ticker = match.group(1).upper()
+            if symbols is None or ticker in symbols:
+                found.setdefault(ticker, None)
+        for match in WORD_PATTERN.finditer(text):
+            ticker = match.group(1)
+            if ticker in found or len(ticker) < self.min_word_length or ticker in self.common_words:
+                continue
+            if symbols is None or ticker in symbols:
+                found[ticker] = None
+        return list(found)
+
+    def extract_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        """Ticker mentions of many texts (e.g. a page of posts or a subreddit dump)."""
+        return [self.extract(text) for text in texts]
+
+    def get_status(self):
+        return {"universe_size": len(self.symbols) if self.symbols is not None else None}
+
+
+def load_symbol_file(path: str) -> Optional[List[str]]:
+    """
+    Read symbols from a text or CSV file: first field of each line; empty lines, '#' comments
+    and a 'symbol' / 'ticker' header are skipped. Returns None if the file cannot be read.
+    """
+    try:
+        with open(path, encoding="utf-8") as symbol_file:
+            lines = symbol_file.read().splitlines()
+    except OSError as e:
+        logger.warning(f"Could not read symbol file {path}: {str(e)}")
+        return None
+    symbols = []
+    for line in lines:
+        field = re.split(r"[,;\s]", line.strip(), maxsplit=1)[0].strip('"').upper()
+        if field and not field.startswith("#") and field not in ("SYMBOL", "TICKER"):
+            symbols.append(field)
+    return symbols
+
+
+def load_candidate_symbols(db_path: str) -> Optional[List[str]]:
+    """Read the tickers of the candidates table (read-only). Returns None if the database is unavailable."""
+    if not os.path.exists(db_path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+        try:
+            return [row[0] for row in conn.execute("SELECT ticker FROM candidates")]
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not load candidate symbols from {db_path}: {str(e)}")
+        return None
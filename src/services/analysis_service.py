@@ -2,26 +2,86 @@
 Analysis service for handling stock analysis operations.
 """
 from typing import List, Dict, Any, Optional
+import asyncio
 import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime
 
+from src.config.config import Config
 from src.database.db_access import DBAccess
 from src.models.api_models import AnalysisRequest, AnalysisResult, TechnicalScore, EventScore
 
 logger = logging.getLogger(__name__)
 
 
+# Worker functions for the process pool. They run in separate processes, so each
+# worker creates its own engines once and reuses them for all subsequent tasks.
+_worker_components: Dict[str, Any] = {}
+
+
+def _get_worker_component(name: str) -> Any:
+    """Get (or lazily create) an analysis component inside a worker process."""
+    if name not in _worker_components:
+        if name == "scoring_engine":
+            from src.backend_components.scoring_engine import ScoringEngine
+            _worker_components[name] = ScoringEngine()
+        elif name == "data_preparation":
+            from src.backend_components.data_preparation import DataPreparation
+            _worker_components[name] = DataPreparation.from_config()
+        else:
+            raise ValueError(f"Unknown analysis component: {name}")
+    return _worker_components[name]
+
+
+def _calculate_score_in_worker(ticker: str, historical_data: List[Dict]) -> Dict[str, Any]:
+    """Calculate the technical score in a worker process."""
+    scoring_engine = _get_worker_component("scoring_engine")
+    return asyncio.run(scoring_engine.calculate_total_score(ticker, historical_data))
+
+
+def _prepare_ml_features_in_worker(ticker: str, historical_data: List[Dict]) -> Optional[Dict[str, float]]:
+    """Prepare the latest ML feature row in a worker process. Returns None without enough data."""
+    from src.backend_components.ml_predictor import MLPredictor
+
+    data_preparation = _get_worker_component("data_preparation")
+    prepared_data = asyncio.run(data_preparation.prepare_data_for_ml(ticker, historical_data, forecast_period=0))
+    return MLPredictor.latest_feature_row(prepared_data)
+
+
 class AnalysisService:
     """Service class for stock analysis operations."""
     
-    def __init__(self, db_access: DBAccess):
+    def __init__(
+        self,
+        db_access: DBAccess,
+        max_concurrency: Optional[int] = None,
+        process_pool_workers: Optional[int] = None
+    ):
         """
         Initialize AnalysisService with database access.
         
         Args:
             db_access: Database access layer instance
+            max_concurrency: Maximum number of tickers analyzed at the same time
+                             (default: config analysis.max_concurrency or 8)
+            process_pool_workers: Worker processes for CPU-heavy scoring and prediction;
+                                  0 runs them inline on the event loop
+                                  (default: config analysis.process_pool_workers or min(4, CPUs))
         """
         self.db_access = db_access
+        analysis_config = Config.get("analysis", {})
+        self.max_concurrency = max(1, int(
+            max_concurrency if max_concurrency is not None
+            else analysis_config.get("max_concurrency", 8)
+        ))
+        self.process_pool_workers = max(0, int(
+            process_pool_workers if process_pool_workers is not None
+            else analysis_config.get("process_pool_workers", min(4, os.cpu_count() or 1))
+        ))
+        # Process pool is created lazily on first use
+        self._process_pool: Optional[ProcessPoolExecutor] = None
         # Initialize analysis engines (lazy loading)
         self._scoring_engine = None
         self._event_scoring_engine = None
@@ -57,13 +117,48 @@ class AnalysisService:
         """Lazy load data preparation."""
         if self._data_preparation is None:
             from src.backend_components.data_preparation import DataPreparation
-            self._data_preparation = DataPreparation()
+            self._data_preparation = DataPreparation.from_config()
         return self._data_preparation
     
+    @property
+    def process_pool(self) -> Optional[Executor]:
+        """Lazy create process pool for CPU-heavy work (None if disabled)."""
+        if self.process_pool_workers == 0:
+            return None
+        if self._process_pool is None:
+            # 'spawn' avoids forking a process that already runs the event loop and server threads
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_pool_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._process_pool
+    
+    async def warm_up(self) -> None:
+        """
+        Load the ML model and run a warm-up prediction, so the first analysis request
+        does not pay for model loading (config analysis.warm_up_model).
+        """
+        if not Config.get("analysis", {}).get("warm_up_model", True):
+            return
+        try:
+            await asyncio.to_thread(self.ml_predictor.warm_up)
+        except Exception as e:
+            logger.error(f"ML model warm-up failed: {str(e)}")
+    
+    def close(self) -> None:
+        """Shut down the process pool."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+    
     async def analyze_stocks(self, analysis_request: AnalysisRequest, user_id: int) -> List[AnalysisResult]:
         """
         Perform comprehensive analysis on list of tickers.
         
+        Tickers are analyzed concurrently, at most max_concurrency at a time; the ML
+        predictions of all tickers are then made with a single model call.
+        Results are returned in the order of analysis_request.tickers.
+        
         Args:
             analysis_request: Analysis request with tickers
             user_id: User ID for logging and auditing
@@ -71,37 +166,52 @@ class AnalysisService:
         Returns:
             List of AnalysisResult objects
         """
-        results = []
+        logger.info(
+            f"Starting analysis for {len(analysis_request.tickers)} tickers for user {user_id} "
+            f"(max_concurrency={self.max_concurrency}, process_pool_workers={self.process_pool_workers})"
+        )
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def analyze_with_limit(ticker: str) -> tuple:
+            async with semaphore:
+                try:
+                    return await self._analyze_single_stock(ticker, user_id)
+                    
+                except Exception as e:
+                    logger.error(f"Error analyzing ticker {ticker} for user {user_id}: {str(e)}")
+                    return AnalysisResult(
+                        ticker=ticker,
+                        status="failed",
+                        message=f"Analysis failed: {str(e)}",
+                        timestamp=datetime.utcnow()
+                    ), None
         
-        logger.info(f"Starting analysis for {len(analysis_request.tickers)} tickers for user {user_id}")
+        # gather keeps the order of the input tickers
+        analyses = await asyncio.gather(*(analyze_with_limit(ticker) for ticker in analysis_request.tickers))
+        results = [result for result, _ in analyses]
         
-        for ticker in analysis_request.tickers:
-            try:
-                result = await self._analyze_single_stock(ticker, user_id)
-                results.append(result)
-                
-            except Exception as e:
-                logger.error(f"Error analyzing ticker {ticker} for user {user_id}: {str(e)}")
-                results.append(AnalysisResult(
-                    ticker=ticker,
-                    status="failed",
-                    message=f"Analysis failed: {str(e)}",
-                    timestamp=datetime.utcnow()
-                ))
+        # One model call for the ML predictions of all tickers
+        predictions = await self._perform_ml_predictions({
+            result.ticker: ml_features for result, ml_features in analyses if ml_features is not None
+        })
+        for result in results:
+            if result.ticker in predictions:
+                result.ml_prediction, result.ml_confidence = predictions[result.ticker]
         
         logger.info(f"Completed analysis for user {user_id}: {len(results)} results generated")
         return results
     
-    async def _analyze_single_stock(self, ticker: str, user_id: int) -> AnalysisResult:
+    async def _analyze_single_stock(self, ticker: str, user_id: int) -> tuple:
         """
-        Perform analysis on a single stock.
+        Perform analysis on a single stock, except for the ML prediction itself.
         
         Args:
             ticker: Stock ticker symbol
             user_id: User ID for logging
             
         Returns:
-            AnalysisResult object
+            Tuple of (AnalysisResult without ML prediction, latest ML feature row or None)
         """
         logger.debug(f"Analyzing ticker {ticker} for user {user_id}")
         
@@ -113,7 +223,7 @@ class AnalysisService:
                 status="failed",
                 message="No historical data available",
                 timestamp=datetime.utcnow()
-            )
+            ), None
         
         # Perform technical analysis
         technical_score = await self._perform_technical_analysis(ticker, historical_data)
@@ -121,8 +231,8 @@ class AnalysisService:
         # Perform event-driven analysis
         event_score = await self._perform_event_analysis(ticker)
         
-        # Perform ML prediction
-        ml_prediction, ml_confidence = await self._perform_ml_prediction(ticker, historical_data)
+        # Prepare ML features (predicted in one batch by analyze_stocks)
+        ml_features = await self._prepare_ml_features(ticker, historical_data)
         
         return AnalysisResult(
             ticker=ticker,
@@ -130,10 +240,8 @@ class AnalysisService:
             message="Analysis completed successfully",
             technical_score=technical_score,
             event_score=event_score,
-            ml_prediction=ml_prediction,
-            ml_confidence=ml_confidence,
             timestamp=datetime.utcnow()
-        )
+        ), ml_features
     
     async def _perform_technical_analysis(self, ticker: str, historical_data: List[Dict]) -> Optional[TechnicalScore]:
         """
@@ -147,7 +255,13 @@ class AnalysisService:
             TechnicalScore object or None if analysis fails
         """
         try:
-            score_output = await self.scoring_engine.calculate_total_score(ticker, historical_data)
+            if self.process_pool is not None:
+                loop = asyncio.get_running_loop()
+                score_output = await loop.run_in_executor(
+                    self.process_pool, _calculate_score_in_worker, ticker, historical_data
+                )
+            else:
+                score_output = await self.scoring_engine.calculate_total_score(ticker, historical_data)
             
             return TechnicalScore(
                 total_score=score_output.get("total_score", 0.0),
@@ -197,36 +311,59 @@ class AnalysisService:
             logger.error(f"Event analysis failed for {ticker}: {str(e)}")
             return None
     
-    async def _perform_ml_prediction(self, ticker: str, historical_data: List[Dict]) -> tuple[Optional[float], Optional[float]]:
+    async def _prepare_ml_features(self, ticker: str, historical_data: List[Dict]) -> Optional[Dict[str, float]]:
         """
-        Perform ML-based prediction.
+        Prepare the ML features of the latest trading day.
         
         Args:
             ticker: Stock ticker symbol
             historical_data: Historical price and indicator data
             
         Returns:
-            Tuple of (prediction, confidence) or (None, None) if prediction fails
+            Feature row for MLPredictor.predict_many or None if there is not enough data
         """
         try:
-            # Prepare data for ML
-            prepared_data = await self.data_preparation.prepare_data_for_ml(ticker, historical_data)
+            if self.process_pool is not None:
+                loop = asyncio.get_running_loop()
+                ml_features = await loop.run_in_executor(
+                    self.process_pool, _prepare_ml_features_in_worker, ticker, historical_data
+                )
+            else:
+                # No target is needed for prediction, so the latest rows are kept
+                prepared_data = await self.data_preparation.prepare_data_for_ml(ticker, historical_data, forecast_period=0)
+                ml_features = self.ml_predictor.latest_feature_row(prepared_data)
             
-            if prepared_data.empty:
+            if ml_features is None:
                 logger.warning(f"Not enough data for ML prediction for {ticker}")
-                return None, None
+            return ml_features
             
-            # Get ML prediction
-            prediction = await self.ml_predictor.predict(ticker, prepared_data.to_dict(orient='records'))
+        except Exception as e:
+            logger.error(f"ML feature preparation failed for {ticker}: {str(e)}")
+            return None
+    
+    async def _perform_ml_predictions(self, ml_features: Dict[str, Dict[str, float]]) -> Dict[str, tuple]:
+        """
+        Perform ML-based predictions for many tickers with one model call.
+        
+        Args:
+            ml_features: Ticker -> latest feature row
+            
+        Returns:
+            Ticker -> (prediction, confidence); tickers without a prediction are omitted
+        """
+        if not ml_features:
+            return {}
+        try:
+            predictions = await self.ml_predictor.predict_many(ml_features)
             
             # Calculate confidence (placeholder implementation)
             confidence = 0.75  # TODO: Implement actual confidence calculation
             
-            return prediction, confidence
+            return {ticker: (prediction, confidence) for ticker, prediction in predictions.items()}
             
         except Exception as e:
-            logger.error(f"ML prediction failed for {ticker}: {str(e)}")
-            return None, None
+            logger.error(f"ML prediction failed for {len(ml_features)} tickers: {str(e)}")
+            return {}
     
     async def get_analysis_history(self, user_id: int, limit: int = 100) -> List[AnalysisResult]:
         """
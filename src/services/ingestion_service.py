@@ -0,0 +1,461 @@
+"""
+Ingestion service for loading OHLCV data from data source plugins into historical_data.
+"""
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.config.config import Config
+from src.database.db_migration import create_performance_indexes, has_performance_index
+from src.technical_indicators import indicators
+from src.technical_indicators.streaming import IndicatorState
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+UPSERT_COLUMNS = ["candidate_id", "date", *PRICE_COLUMNS, *indicators.INDICATOR_COLUMNS]
+
+# Upsert on the unique (candidate_id, date) index; event_data_json is left untouched
+UPSERT_SQL = (
+    f"INSERT INTO historical_data ({', '.join(UPSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(UPSERT_COLUMNS))}) "
+    "ON CONFLICT(candidate_id, date) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in UPSERT_COLUMNS[2:])
+)
+
+PROGRESS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS ingestion_progress (
+        run_id TEXT NOT NULL,
+        ticker TEXT NOT NULL,
+        status TEXT NOT NULL,
+        rows INTEGER NOT NULL DEFAULT 0,
+        message TEXT,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (run_id, ticker)
+    )
+"""
+
+# Last stored bar per ticker and source; indicator_state holds IndicatorState.to_dict() as JSON
+WATERMARK_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS ingestion_watermarks (
+        ticker TEXT NOT NULL,
+        source TEXT NOT NULL,
+        last_date TEXT NOT NULL,
+        last_fetch_ts TEXT NOT NULL,
+        indicator_state TEXT,
+        PRIMARY KEY (ticker, source)
+    )
+"""
+
+# (last_date, indicator_state JSON or None)
+Watermark = Tuple[str, Optional[str]]
+
+
+def records_to_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Convert plugin OHLCV records into a sorted frame with one row per date."""
+    if not records:
+        return pd.DataFrame(columns=["date", *PRICE_COLUMNS])
+    frame = pd.DataFrame.from_records(records, columns=["date", *PRICE_COLUMNS])
+    frame["date"] = pd.to_datetime(frame["date"]).dt.strftime("%Y-%m-%d")
+    frame[PRICE_COLUMNS] = frame[PRICE_COLUMNS].apply(pd.to_numeric, errors="coerce").astype(np.float64)
+    frame = frame.dropna(subset=["close"])
+    return frame.drop_duplicates(subset="date", keep="last").sort_values("date").reset_index(drop=True)
+
+
+def calculate_indicator_frames(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Calculate all indicator columns for many tickers in one vectorized pass.
+
+    Each ticker's bars are placed left-aligned in a (position x ticker) panel, so tickers with
+    different trading calendars or history lengths do not get gaps inside their series.
+    """
+    tickers = [ticker for ticker, frame in frames.items() if len(frame) > 0]
+    if not tickers:
+        return {}
+    lengths = [len(frames[ticker]) for ticker in tickers]
+
+    def panel(column: str) -> np.ndarray:
+        values = np.full((max(lengths), len(tickers)), np.nan)
+        for i, ticker in enumerate(tickers):
+            values[:lengths[i], i] = frames[ticker][column].to_numpy(dtype=np.float64)
+        return values
+
+    panels = indicators.calculate_all_indicators_panel(panel("close"), panel("high"), panel("low"))
+    panels = {column: values.to_numpy() for column, values in panels.items()}
+
+    result = {}
+    for i, ticker in enumerate(tickers):
+        frame = frames[ticker].copy()
+        for column in indicators.INDICATOR_COLUMNS:
+            frame[column] = panels[column][:lengths[i], i]
+        result[ticker] = frame
+    return result
+
+
+def _frame_to_rows(candidate_id: int, frame: pd.DataFrame) -> List[tuple]:
+    """Rows for UPSERT_SQL; NaN becomes NULL and volume is stored as integer."""
+    values = frame[UPSERT_COLUMNS[2:]].to_numpy(dtype=np.float64)
+    missing = np.isnan(values)
+    objects = values.astype(object)
+    objects[missing] = None
+    volume = UPSERT_COLUMNS[2:].index("volume")
+    has_volume = ~missing[:, volume]
+    objects[has_volume, volume] = values[has_volume, volume].astype(np.int64).astype(object)
+    return [(candidate_id, date, *row) for date, row in zip(frame["date"], objects.tolist())]
+
+
+def extend_indicators(state: IndicatorState, frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate the indicator columns of new bars by advancing a streaming state.
+
+    The state must end at the bar before frame's first row; it is updated in place.
+    """
+    frame = frame.copy()
+    bars = frame[["date", "high", "low", "close"]].to_dict(orient="records")
+    values = pd.DataFrame([state.update(bar) for bar in bars], columns=indicators.INDICATOR_COLUMNS, index=frame.index)
+    frame[indicators.INDICATOR_COLUMNS] = values
+    return frame
+
+
+def _prepare_schema(conn: sqlite3.Connection) -> None:
+    """Create the progress and watermark tables and the unique index needed for upserts."""
+    conn.execute(PROGRESS_TABLE_SQL)
+    conn.execute(WATERMARK_TABLE_SQL)
+    create_performance_indexes(conn.cursor())
+    conn.commit()
+    if not has_performance_index(conn.cursor(), "idx_historical_data_candidate_date"):
+        # Skipped because of duplicate rows; they are only removed explicitly by the migration tool
+        raise RuntimeError(
+            "historical_data has duplicate (candidate_id, date) rows; "
+            "run 'python -m src.database.db_migration --remove-duplicates' before ingesting"
+        )
+
+
+def _load_candidates(conn: sqlite3.Connection, tickers: Optional[Sequence[str]]) -> Dict[str, int]:
+    """Get {ticker: candidate_id}; explicitly requested tickers are added as candidates."""
+    if tickers is None:
+        rows = conn.execute("SELECT ticker, id FROM candidates ORDER BY ticker").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    tickers = [ticker.upper() for ticker in dict.fromkeys(tickers)]
+    conn.executemany(
+        "INSERT OR IGNORE INTO candidates (ticker, selection_reason, timestamp) VALUES (?, 'ingestion', ?)",
+        [(ticker, datetime.utcnow().isoformat()) for ticker in tickers]
+    )
+    conn.commit()
+    ids = dict(conn.execute(
+        f"SELECT ticker, id FROM candidates WHERE ticker IN ({', '.join('?' * len(tickers))})", tickers
+    ).fetchall())
+    return {ticker: ids[ticker] for ticker in tickers}
+
+
+def _completed_tickers(conn: sqlite3.Connection, run_id: str) -> set:
+    rows = conn.execute("SELECT ticker FROM ingestion_progress WHERE run_id = ? AND status = 'done'", (run_id,))
+    return {row[0] for row in rows.fetchall()}
+
+
+def _load_watermarks(conn: sqlite3.Connection, source: str, candidate_ids: Dict[str, int]) -> Dict[str, Watermark]:
+    """
+    Get {ticker: (last_date, indicator_state)} for tickers that already have stored bars.
+    Tickers without a watermark row (data written before incremental ingestion) start from
+    their newest row in historical_data; their indicator state is rebuilt on first use.
+    """
+    rows = conn.execute(
+        "SELECT ticker, last_date, indicator_state FROM ingestion_watermarks WHERE source = ?", (source,)
+    ).fetchall()
+    watermarks = {row[0]: (row[1], row[2]) for row in rows if row[0] in candidate_ids}
+    for ticker, candidate_id in candidate_ids.items():
+        if ticker not in watermarks:
+            # Answered from the (candidate_id, date) index
+            last_date = conn.execute(
+                "SELECT MAX(date) FROM historical_data WHERE candidate_id = ?", (candidate_id,)
+            ).fetchone()[0]
+            if last_date is not None:
+                watermarks[ticker] = (last_date, None)
+    return watermarks
+
+
+def _load_indicator_state(conn: sqlite3.Connection, ticker: str, candidate_id: int, watermark: Watermark) -> IndicatorState:
+    """Restore the persisted indicator state, or rebuild it once from the stored history."""
+    last_date, state_json = watermark
+    if state_json:
+        try:
+            state = IndicatorState.from_dict(json.loads(state_json))
+            if state.last_date == last_date:
+                return state
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Discarding stored indicator state for {ticker}: {str(e)}")
+
+    rows = conn.execute(
+        "SELECT date, high, low, close FROM historical_data WHERE candidate_id = ? AND date <= ? "
+        "AND close IS NOT NULL ORDER BY date",
+        (candidate_id, last_date)
+    ).fetchall()
+    return IndicatorState.from_bars(ticker, [
+        {"date": date, "high": close if high is None else high, "low": close if low is None else low, "close": close}
+        for date, high, low, close in rows
+    ])
+
+
+def _write_batch(
+    conn: sqlite3.Connection,
+    run_id: str,
+    source: str,
+    candidate_ids: Dict[str, int],
+    frames: Dict[str, pd.DataFrame],
+    increments: Dict[str, Tuple[pd.DataFrame, Watermark]],
+    failures: Dict[str, str]
+) -> int:
+    """
+    Calculate indicators and upsert a batch of tickers in one transaction.
+
+    frames hold full histories (indicators calculated in one vectorized pass), increments hold
+    only the bars after a ticker's watermark (indicators continued from the stored state).
+    Progress and watermark rows are written in the same transaction, so a crashed run resumes cleanly.
+    """
+    rows = []
+    progress = []
+    watermarks = []
+    now = datetime.utcnow().isoformat()
+    for ticker, frame in calculate_indicator_frames(frames).items():
+        rows.extend(_frame_to_rows(candidate_ids[ticker], frame))
+        progress.append((run_id, ticker, "done", len(frame), None, now))
+        # The indicator state is rebuilt from the stored rows on the next incremental run
+        watermarks.append((ticker, source, frame["date"].iloc[-1], now, None))
+    for ticker, (frame, watermark) in increments.items():
+        if frame.empty:
+            watermarks.append((ticker, source, watermark[0], now, watermark[1]))
+            progress.append((run_id, ticker, "done", 0, None, now))
+            continue
+        state = _load_indicator_state(conn, ticker, candidate_ids[ticker], watermark)
+        frame = extend_indicators(state, frame)
+        rows.extend(_frame_to_rows(candidate_ids[ticker], frame))
+        progress.append((run_id, ticker, "done", len(frame), None, now))
+        watermarks.append((ticker, source, state.last_date, now, json.dumps(state.to_dict())))
+    for ticker, message in failures.items():
+        progress.append((run_id, ticker, "failed", 0, message, now))
+
+    try:
+        conn.executemany(UPSERT_SQL, rows)
+        conn.executemany("INSERT OR REPLACE INTO ingestion_progress VALUES (?, ?, ?, ?, ?, ?)", progress)
+        conn.executemany("INSERT OR REPLACE INTO ingestion_watermarks VALUES (?, ?, ?, ?, ?)", watermarks)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return len(rows)
+
+
+class IngestionService:
+    """Service class for bulk loading OHLCV data from a data source plugin into historical_data."""
+
+    def __init__(
+        self,
+        db_access,
+        plugin_manager,
+        source_plugin: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        history_days: Optional[int] = None,
+        incremental: Optional[bool] = None
+    ):
+        """
+        Initialize IngestionService.
+
+        Args:
+            db_access: Database access layer instance (DBAccess or DBAccessExtended)
+            plugin_manager: PluginManager with the source plugin configured and active
+            source_plugin: Plugin used for OHLCV data (default: config ingestion.source_plugin or YahooFinancePlugin)
+            max_concurrency: Maximum number of concurrent plugin requests (default: config or 8)
+            batch_size: Tickers written per transaction (default: config or 50)
+            history_days: Length of the fetched history in days (default: config or 3650)
+            incremental: Only fetch bars after each ticker's last stored date (default: config or True)
+        """
+        ingestion_config = Config.get("ingestion", {})
+        self.db_access = db_access
+        self.plugin_manager = plugin_manager
+        self.source_plugin = source_plugin or ingestion_config.get("source_plugin", "YahooFinancePlugin")
+        self.max_concurrency = max(1, int(
+            max_concurrency if max_concurrency is not None else ingestion_config.get("max_concurrency", 8)
+        ))
+        self.batch_size = max(1, int(
+            batch_size if batch_size is not None else ingestion_config.get("batch_size", 50)
+        ))
+        self.history_days = int(
+            history_days if history_days is not None else ingestion_config.get("history_days", 3650)
+        )
+        self.incremental = bool(
+            incremental if incremental is not None else ingestion_config.get("incremental", True)
+        )
+
+    async def run(
+        self,
+        tickers: Optional[Sequence[str]] = None,
+        run_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        incremental: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch, calculate and store OHLCV data plus indicators for all candidates.
+
+        Tickers already finished under the same run_id are skipped, so an interrupted
+        run can simply be started again. In incremental mode, tickers with stored data only
+        request the bars after their watermark; tickers without business days since their
+        last stored bar make no request at all.
+
+        Args:
+            tickers: Tickers to ingest (default: all rows of the candidates table)
+            run_id: Identifier for resuming (default: today's date, UTC)
+            start_date: First date to fetch (YYYY-MM-DD, default: today - history_days)
+            end_date: Last date to fetch (YYYY-MM-DD, default: today)
+            incremental: Overrides the service's incremental setting for this run
+
+        Returns:
+            Summary of the run
+        """
+        started = time.perf_counter()
+        today = datetime.utcnow()
+        run_id = run_id or today.strftime("%Y-%m-%d")
+        end_date = end_date or today.strftime("%Y-%m-%d")
+        start_date = start_date or (today - timedelta(days=self.history_days)).strftime("%Y-%m-%d")
+        incremental = self.incremental if incremental is None else incremental
+
+        pool = self.db_access.pool
+        await pool.run(_prepare_schema)
+        candidate_ids = await pool.run(_load_candidates, tickers)
+        completed = await pool.run(_completed_tickers, run_id)
+        pending = [ticker for ticker in candidate_ids if ticker not in completed]
+        watermarks = await pool.run(_load_watermarks, self.source_plugin, candidate_ids) if incremental else {}
+
+        # Requested range per ticker: full history, or the bars after the watermark
+        ranges = {}
+        up_to_date = []
+        for ticker in pending:
+            if ticker not in watermarks:
+                ranges[ticker] = start_date
+                continue
+            fetch_start = (pd.Timestamp(watermarks[ticker][0]) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+            if len(pd.bdate_range(fetch_start, end_date)) == 0:
+                up_to_date.append(ticker)
+            else:
+                ranges[ticker] = fetch_start
+
+        logger.info(
+            f"Starting ingestion run {run_id} from {self.source_plugin}: {len(pending)} of "
+            f"{len(candidate_ids)} tickers pending ({start_date} to {end_date})"
+        )
+        summary = {
+            "run_id": run_id,
+            "source": self.source_plugin,
+            "tickers": len(candidate_ids),
+            "skipped": len(candidate_ids) - len(pending),
+            "succeeded": 0,
+            "up_to_date": len(up_to_date),
+            "failed": 0,
+            "rows_written": 0,
+        }
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_with_limit(ticker: str):
+            async with semaphore:
+                return ticker, await self._fetch_frame(ticker, ranges[ticker], end_date)
+
+        tasks = [asyncio.create_task(fetch_with_limit(ticker)) for ticker in ranges]
+        frames: Dict[str, pd.DataFrame] = {}
+        increments: Dict[str, Tuple[pd.DataFrame, Watermark]] = {}
+        failures: Dict[str, str] = {}
+        try:
+            # Batches are written while the remaining requests keep running
+            for next_result in asyncio.as_completed(tasks):
+                ticker, frame = await next_result
+                if frame is None:
+                    # Fetch errors are failures in both modes; the watermark stays untouched,
+                    # so the ticker is retried by the next run (also under the same run_id)
+                    failures[ticker] = "fetch failed"
+                elif ticker in watermarks:
+                    # No new bars is not an error for incremental fetches
+                    last_date = watermarks[ticker][0]
+                    increments[ticker] = (frame[frame["date"] > last_date], watermarks[ticker])
+                elif frame.empty:
+                    failures[ticker] = "no data returned"
+                else:
+                    frames[ticker] = frame
+                if len(frames) + len(increments) + len(failures) >= self.batch_size:
+                    await self._flush(run_id, candidate_ids, frames, increments, failures, summary)
+            await self._flush(run_id, candidate_ids, frames, increments, failures, summary)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        summary["seconds"] = round(time.perf_counter() - started, 2)
+        logger.info(f"Finished ingestion run {run_id}: {summary}")
+        return summary
+
+    async def _fetch_frame(self, ticker: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """Fetch OHLCV records from the source plugin as a frame (None on errors)."""
+        try:
+            records = await self.plugin_manager.fetch_data_from_plugin(
+                self.source_plugin, "ohlcv", ticker, start_date, end_date, interval="daily"
+            )
+            return records_to_frame(records)
+        except Exception as e:
+            logger.error(f"Error fetching OHLCV data for {ticker}: {str(e)}")
+            return None
+
+    async def _flush(
+        self,
+        run_id: str,
+        candidate_ids: Dict[str, int],
+        frames: Dict[str, pd.DataFrame],
+        increments: Dict[str, Tuple[pd.DataFrame, Watermark]],
+        failures: Dict[str, str],
+        summary: Dict[str, Any]
+    ) -> None:
+        """Write the buffered batch and clear the buffers."""
+        if not frames and not increments and not failures:
+            return
+        rows = await self.db_access.pool.run(
+            _write_batch, run_id, self.source_plugin, candidate_ids, dict(frames), dict(increments), dict(failures)
+        )
+        succeeded = len(frames) + len(increments)
+        summary["succeeded"] += succeeded
+        summary["failed"] += len(failures)
+        summary["rows_written"] += rows
+        logger.info(f"Ingestion run {run_id}: wrote {rows} rows for {succeeded} tickers ({len(failures)} failed)")
+        frames.clear()
+        increments.clear()
+        failures.clear()
+
+
+async def run_ingestion(tickers: Optional[Sequence[str]] = None, run_id: Optional[str] = None) -> Dict[str, Any]:
+    """Set up plugin manager and database access, run the ingestion and clean up (used by the daily cron job)."""
+    from src.database.db_access_extended import DBAccessExtended
+    from src.plugins.plugin_manager import PluginManager
+
+    plugin_manager = PluginManager()
+    await plugin_manager.load_plugins()
+    db_access = DBAccessExtended()
+    service = IngestionService(db_access, plugin_manager)
+
+    plugin_config = Config.get("plugins", {}).get(service.source_plugin)
+    if not plugin_config:
+        # Fall back to the plugin's schema defaults (enough for keyless sources like Yahoo Finance)
+        schema = plugin_manager.get_plugin_config_schema(service.source_plugin) or {}
+        plugin_config = {key: spec["default"] for key, spec in schema.items() if "default" in spec}
+    if not await plugin_manager.configure_plugin(service.source_plugin, plugin_config):
+        raise RuntimeError(f"Source plugin '{service.source_plugin}' could not be configured")
+
+    try:
+        return await service.run(tickers=tickers, run_id=run_id)
+    finally:
+        await plugin_manager.close_plugins()
+        db_access.close()
@@ -4,6 +4,7 @@ Portfolio service for handling stock portfolio operations.
 from typing import Optional, List, Dict, Any
 import logging
 
+from src.config.config import Config
 from src.database.db_access import DBAccess
 from src.models.api_models import StockCreate, StockUpdate, StockResponse
 
@@ -13,14 +14,19 @@ logger = logging.getLogger(__name__)
 class PortfolioService:
     """Service class for portfolio management operations."""
     
-    def __init__(self, db_access: DBAccess):
+    def __init__(self, db_access: DBAccess, plugin_manager=None, quote_plugin: Optional[str] = None):
         """
         Initialize PortfolioService with database access.
         
         Args:
             db_access: Database access layer instance
+            plugin_manager: Optional PluginManager for current prices of the positions
+            quote_plugin: Only plugin used for quotes (default: config portfolio.quote_plugin; if unset,
+                quotes are routed across data_sources.routing.quotes)
         """
         self.db_access = db_access
+        self.plugin_manager = plugin_manager
+        self.quote_plugin = quote_plugin or Config.get("portfolio", {}).get("quote_plugin")
     
     async def add_stock(self, user_id: int, stock_data: StockCreate) -> Optional[StockResponse]:
         """
@@ -74,6 +80,7 @@ class PortfolioService:
         """
         try:
             stocks = await self.db_access.get_stocks_by_user_id(user_id)
+            await self._attach_current_prices(stocks)
             return [self._convert_to_stock_response(stock) for stock in stocks]
             
         except Exception as e:
@@ -217,6 +224,29 @@ class PortfolioService:
             logger.error(f"Error adding stock {ticker} from analysis for user {user_id}: {str(e)}")
             raise
     
+    async def _attach_current_prices(self, stocks: List[Dict[str, Any]]) -> None:
+        """
+        Set current_price of all positions from a single routed batch quote request, so the
+        latency is bounded by the hedge delay of the fastest provider rather than the slowest one.
+        
+        Args:
+            stocks: Stock data from database (updated in place)
+        """
+        if self.plugin_manager is None or not stocks:
+            return
+        try:
+            quotes = await self.plugin_manager.fetch_quotes_routed(
+                [stock["ticker"] for stock in stocks],
+                plugins=[self.quote_plugin] if self.quote_plugin else None
+            )
+        except Exception as e:
+            logger.warning(f"Could not fetch current prices: {str(e)}")
+            return
+        for stock in stocks:
+            quote = quotes.get(stock["ticker"])
+            if quote and quote.get("price") is not None:
+                stock["current_price"] = quote["price"]
+    
     def _convert_to_stock_response(self, stock_dict: Dict[str, Any]) -> StockResponse:
         """
         Convert database stock dictionary to StockResponse model.
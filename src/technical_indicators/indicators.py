@@ -1,15 +1,25 @@
 import pandas as pd
 import numpy as np
+from typing import Dict, Optional, Union
 
-def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
-    """
-    Berechnet den Relative Strength Index (RSI).
-    Args:
-        prices: Eine Pandas Series von Schlusskursen.
-        period: Die Periode für die RSI-Berechnung (Standard: 14).
-    Returns:
-        Eine Pandas Series mit den berechneten RSI-Werten.
-    """
+# Ein Panel ist eine 2-D Matrix (Datum × Ticker); eine Spalte pro Ticker.
+PanelLike = Union[pd.DataFrame, np.ndarray]
+Frame = Union[pd.Series, pd.DataFrame]
+
+# Spaltennamen der Indikatoren, identisch mit der Tabelle historical_data
+INDICATOR_COLUMNS = [
+    "rsi", "macd", "macd_signal", "macd_hist", "ema10", "ema20", "ema50",
+    "bollinger_upper", "bollinger_middle", "bollinger_lower",
+    "atr", "stoch_k", "stoch_d", "roc5", "roc10"
+]
+
+
+# --- Interne Berechnungskerne ---
+# Die Kerne verwenden ausschließlich Pandas-Operationen, die für Series und DataFrame
+# identisch arbeiten. Ein DataFrame wird dabei spaltenweise (pro Ticker) in einem
+# einzigen vektorisierten Durchlauf berechnet.
+
+def _rsi(prices: Frame, period: int) -> Frame:
     # Berechnung der Preisänderungen
     deltas = prices.diff()
 
@@ -17,6 +27,11 @@ def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     gains = deltas.where(deltas > 0, 0)
     losses = -deltas.where(deltas < 0, 0)
 
+    # Führende NaN (kürzere Historie in einem Panel) zählen nicht als Gewinn/Verlust 0
+    started = prices.notna().cummax()
+    gains = gains.where(started)
+    losses = losses.where(started)
+
     # Durchschnittliche Gewinne und Verluste über die Periode
     # Verwendung von ewm (Exponentially Weighted Moving Average) für RSI-Berechnung
     avg_gain = gains.ewm(span=period, adjust=False).mean()
@@ -27,8 +42,66 @@ def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     rs = rs.replace([np.inf, -np.inf], np.nan) # Unendlich durch NaN ersetzen
 
     # RSI-Berechnung
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return 100 - (100 / (1 + rs))
+
+
+def _macd(prices: Frame, fast_period: int, slow_period: int, signal_period: int):
+    ema_fast = prices.ewm(span=fast_period, adjust=False).mean()
+    ema_slow = prices.ewm(span=slow_period, adjust=False).mean()
+
+    macd = ema_fast - ema_slow
+    signal = macd.ewm(span=signal_period, adjust=False).mean()
+    histogram = macd - signal
+    return macd, signal, histogram
+
+
+def _ema(prices: Frame, period: int) -> Frame:
+    return prices.ewm(span=period, adjust=False).mean()
+
+
+def _bollinger_bands(prices: Frame, window: int, num_std_dev: int):
+    middle_band = prices.rolling(window=window).mean()
+    std_dev = prices.rolling(window=window).std()
+    upper_band = middle_band + (std_dev * num_std_dev)
+    lower_band = middle_band - (std_dev * num_std_dev)
+    return middle_band, upper_band, lower_band
+
+
+def _atr(high: Frame, low: Frame, close: Frame, period: int) -> Frame:
+    previous_close = close.shift(1)
+    tr1 = high - low
+    tr2 = np.abs(high - previous_close)
+    tr3 = np.abs(low - previous_close)
+    # np.fmax ignoriert NaN (wie DataFrame.max(axis=1)), z.B. in der ersten Zeile ohne Vortag
+    true_range = np.fmax(np.fmax(tr1, tr2), tr3)
+    return true_range.ewm(span=period, adjust=False).mean()
+
+
+def _stochastic_oscillator(high: Frame, low: Frame, close: Frame, k_period: int, d_period: int):
+    lowest_low = low.rolling(window=k_period).min()
+    highest_high = high.rolling(window=k_period).max()
+
+    percent_k = ((close - lowest_low) / (highest_high - lowest_low)) * 100
+    percent_d = percent_k.rolling(window=d_period).mean()
+    return percent_k, percent_d
+
+
+def _roc(prices: Frame, period: int) -> Frame:
+    return (prices / prices.shift(period) - 1) * 100
+
+
+# --- Indikatoren für einen einzelnen Ticker ---
+
+def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
+    """
+    Berechnet den Relative Strength Index (RSI).
+    Args:
+        prices: Eine Pandas Series von Schlusskursen.
+        period: Die Periode für die RSI-Berechnung (Standard: 14).
+    Returns:
+        Eine Pandas Series mit den berechneten RSI-Werten.
+    """
+    return _rsi(prices, period)
 
 
 def calculate_macd(prices: pd.Series, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> pd.DataFrame:
@@ -42,13 +115,7 @@ def calculate_macd(prices: pd.Series, fast_period: int = 12, slow_period: int =
     Returns:
         Ein Pandas DataFrame mit 'MACD', 'Signal' und 'Histogram'.
     """
-    ema_fast = prices.ewm(span=fast_period, adjust=False).mean()
-    ema_slow = prices.ewm(span=slow_period, adjust=False).mean()
-
-    macd = ema_fast - ema_slow
-    signal = macd.ewm(span=signal_period, adjust=False).mean()
-    histogram = macd - signal
-
+    macd, signal, histogram = _macd(prices, fast_period, slow_period, signal_period)
     return pd.DataFrame({'MACD': macd, 'Signal': signal, 'Histogram': histogram})
 
 
@@ -61,7 +128,7 @@ def calculate_ema(prices: pd.Series, period: int) -> pd.Series:
     Returns:
         Eine Pandas Series mit den berechneten EMA-Werten.
     """
-    return prices.ewm(span=period, adjust=False).mean()
+    return _ema(prices, period)
 
 
 def calculate_bollinger_bands(prices: pd.Series, window: int = 20, num_std_dev: int = 2) -> pd.DataFrame:
@@ -74,11 +141,7 @@ def calculate_bollinger_bands(prices: pd.Series, window: int = 20, num_std_dev:
     Returns:
         Ein Pandas DataFrame mit 'Middle', 'Upper' und 'Lower' Bändern.
     """
-    middle_band = prices.rolling(window=window).mean()
-    std_dev = prices.rolling(window=window).std()
-    upper_band = middle_band + (std_dev * num_std_dev)
-    lower_band = middle_band - (std_dev * num_std_dev)
-
+    middle_band, upper_band, lower_band = _bollinger_bands(prices, window, num_std_dev)
     return pd.DataFrame({'Middle': middle_band, 'Upper': upper_band, 'Lower': lower_band})
 
 
@@ -93,12 +156,7 @@ def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int
     Returns:
         Eine Pandas Series mit den berechneten ATR-Werten.
     """
-    tr1 = high - low
-    tr2 = np.abs(high - close.shift(1))
-    tr3 = np.abs(low - close.shift(1))
-    true_range = pd.DataFrame({'tr1': tr1, 'tr2': tr2, 'tr3': tr3}).max(axis=1)
-    atr = true_range.ewm(span=period, adjust=False).mean()
-    return atr
+    return _atr(high, low, close, period)
 
 
 def calculate_stochastic_oscillator(high: pd.Series, low: pd.Series, close: pd.Series, k_period: int = 14, d_period: int = 3) -> pd.DataFrame:
@@ -113,12 +171,7 @@ def calculate_stochastic_oscillator(high: pd.Series, low: pd.Series, close: pd.S
     Returns:
         Ein Pandas DataFrame mit '%K' und '%D'.
     """
-    lowest_low = low.rolling(window=k_period).min()
-    highest_high = high.rolling(window=k_period).max()
-
-    percent_k = ((close - lowest_low) / (highest_high - lowest_low)) * 100
-    percent_d = percent_k.rolling(window=d_period).mean()
-
+    percent_k, percent_d = _stochastic_oscillator(high, low, close, k_period, d_period)
     return pd.DataFrame({'K': percent_k, 'D': percent_d})
 
 
@@ -131,12 +184,177 @@ def calculate_roc(prices: pd.Series, period: int) -> pd.Series:
     Returns:
         Eine Pandas Series mit den berechneten ROC-Werten.
     """
-    return (prices / prices.shift(period) - 1) * 100
+    return _roc(prices, period)
+
 
-# Hier werden später weitere Funktionen für EMA, Bollinger Bands etc. folgen
+# --- Indikatoren für ein Panel (viele Ticker in einem Durchlauf) ---
+
+def to_panel(data: PanelLike, index: Optional[pd.Index] = None, columns: Optional[list] = None) -> pd.DataFrame:
+    """
+    Wandelt eine 2-D Matrix (Datum × Ticker) in ein float64-DataFrame um.
+    Args:
+        data: DataFrame oder 2-D NumPy Array, eine Spalte pro Ticker.
+        index: Optionaler Datumsindex für NumPy-Eingaben.
+        columns: Optionale Ticker-Namen für NumPy-Eingaben.
+    Returns:
+        Ein Pandas DataFrame mit float64-Werten.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data.astype(np.float64, copy=False)
+    array = np.asarray(data, dtype=np.float64)
+    if array.ndim != 2:
+        raise ValueError(f"Panel must be 2-dimensional (dates x tickers), got {array.ndim} dimensions.")
+    return pd.DataFrame(array, index=index, columns=columns)
 
 
+def pivot_to_panels(long_df: pd.DataFrame, value_columns: list, ticker_column: str = "ticker", date_column: str = "date") -> Dict[str, pd.DataFrame]:
+    """
+    Wandelt ein Long-Format (eine Zeile pro Ticker und Datum) in Panels um.
+    Args:
+        long_df: DataFrame mit Ticker-, Datums- und Wertspalten.
+        value_columns: Die Wertspalten, für die ein Panel erzeugt werden soll (z.B. 'close').
+        ticker_column: Name der Ticker-Spalte.
+        date_column: Name der Datumsspalte.
+    Returns:
+        Ein Dictionary {Wertspalte: Panel (Datum × Ticker)}.
+    """
+    wide = long_df.pivot_table(index=date_column, columns=ticker_column, values=value_columns, aggfunc="last", dropna=False)
+    wide = wide.sort_index()
+    return {col: wide[col].astype(np.float64) for col in value_columns if col in wide.columns.get_level_values(0)}
+
+
+def calculate_rsi_panel(prices: PanelLike, period: int = 14) -> pd.DataFrame:
+    """
+    Berechnet den RSI für alle Ticker eines Panels.
+    Args:
+        prices: Panel der Schlusskurse (Datum × Ticker).
+        period: Die Periode für die RSI-Berechnung (Standard: 14).
+    Returns:
+        Ein Panel mit den RSI-Werten.
+    """
+    return _rsi(to_panel(prices), period)
+
+
+def calculate_macd_panel(prices: PanelLike, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict[str, pd.DataFrame]:
+    """
+    Berechnet MACD, Signal Line und Histogram für alle Ticker eines Panels.
+    Args:
+        prices: Panel der Schlusskurse (Datum × Ticker).
+        fast_period: Periode für den schnellen EMA.
+        slow_period: Periode für den langsamen EMA.
+        signal_period: Periode für den Signal-EMA des MACD.
+    Returns:
+        Ein Dictionary mit den Panels 'MACD', 'Signal' und 'Histogram'.
+    """
+    macd, signal, histogram = _macd(to_panel(prices), fast_period, slow_period, signal_period)
+    return {'MACD': macd, 'Signal': signal, 'Histogram': histogram}
+
+
+def calculate_ema_panel(prices: PanelLike, period: int) -> pd.DataFrame:
+    """
+    Berechnet den EMA für alle Ticker eines Panels.
+    Args:
+        prices: Panel der Schlusskurse (Datum × Ticker).
+        period: Die Periode für die EMA-Berechnung.
+    Returns:
+        Ein Panel mit den EMA-Werten.
+    """
+    return _ema(to_panel(prices), period)
+
+
+def calculate_bollinger_bands_panel(prices: PanelLike, window: int = 20, num_std_dev: int = 2) -> Dict[str, pd.DataFrame]:
+    """
+    Berechnet die Bollinger Bänder für alle Ticker eines Panels.
+    Args:
+        prices: Panel der Schlusskurse (Datum × Ticker).
+        window: Die Periode für den gleitenden Durchschnitt.
+        num_std_dev: Anzahl der Standardabweichungen für die Bänder.
+    Returns:
+        Ein Dictionary mit den Panels 'Middle', 'Upper' und 'Lower'.
+    """
+    middle_band, upper_band, lower_band = _bollinger_bands(to_panel(prices), window, num_std_dev)
+    return {'Middle': middle_band, 'Upper': upper_band, 'Lower': lower_band}
+
+
+def calculate_atr_panel(high: PanelLike, low: PanelLike, close: PanelLike, period: int = 14) -> pd.DataFrame:
+    """
+    Berechnet den ATR für alle Ticker eines Panels.
+    Args:
+        high: Panel der Hochkurse (Datum × Ticker).
+        low: Panel der Tiefkurse (Datum × Ticker).
+        close: Panel der Schlusskurse (Datum × Ticker).
+        period: Die Periode für die ATR-Berechnung.
+    Returns:
+        Ein Panel mit den ATR-Werten.
+    """
+    return _atr(to_panel(high), to_panel(low), to_panel(close), period)
+
+
+def calculate_stochastic_oscillator_panel(high: PanelLike, low: PanelLike, close: PanelLike, k_period: int = 14, d_period: int = 3) -> Dict[str, pd.DataFrame]:
+    """
+    Berechnet den Stochastischen Oszillator für alle Ticker eines Panels.
+    Args:
+        high: Panel der Hochkurse (Datum × Ticker).
+        low: Panel der Tiefkurse (Datum × Ticker).
+        close: Panel der Schlusskurse (Datum × Ticker).
+        k_period: Die Periode für %K.
+        d_period: Die Periode für %D (gleitender Durchschnitt von %K).
+    Returns:
+        Ein Dictionary mit den Panels 'K' und 'D'.
+    """
+    percent_k, percent_d = _stochastic_oscillator(to_panel(high), to_panel(low), to_panel(close), k_period, d_period)
+    return {'K': percent_k, 'D': percent_d}
+
+
+def calculate_roc_panel(prices: PanelLike, period: int) -> pd.DataFrame:
+    """
+    Berechnet die ROC für alle Ticker eines Panels.
+    Args:
+        prices: Panel der Schlusskurse (Datum × Ticker).
+        period: Die Periode für die ROC-Berechnung.
+    Returns:
+        Ein Panel mit den ROC-Werten.
+    """
+    return _roc(to_panel(prices), period)
+
+
+def calculate_all_indicators_panel(close: PanelLike, high: Optional[PanelLike] = None, low: Optional[PanelLike] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Berechnet alle Standard-Indikatoren für alle Ticker eines Panels in einem Durchlauf.
+    Die Parameter entsprechen den Standardwerten der Einzel-Ticker-Funktionen.
+    Args:
+        close: Panel der Schlusskurse (Datum × Ticker).
+        high: Optionales Panel der Hochkurse. Ohne High/Low entfallen 'atr', 'stoch_k' und 'stoch_d'.
+        low: Optionales Panel der Tiefkurse.
+    Returns:
+        Ein Dictionary {Indikatorspalte: Panel}, Schlüssel wie in INDICATOR_COLUMNS.
+    """
+    close = to_panel(close)
 
+    macd, signal, histogram = _macd(close, 12, 26, 9)
+    middle_band, upper_band, lower_band = _bollinger_bands(close, 20, 2)
 
+    result = {
+        "rsi": _rsi(close, 14),
+        "macd": macd,
+        "macd_signal": signal,
+        "macd_hist": histogram,
+        "ema10": _ema(close, 10),
+        "ema20": _ema(close, 20),
+        "ema50": _ema(close, 50),
+        "bollinger_upper": upper_band,
+        "bollinger_middle": middle_band,
+        "bollinger_lower": lower_band,
+        "roc5": _roc(close, 5),
+        "roc10": _roc(close, 10),
+    }
 
+    if high is not None and low is not None:
+        high = to_panel(high)
+        low = to_panel(low)
+        percent_k, percent_d = _stochastic_oscillator(high, low, close, 14, 3)
+        result["atr"] = _atr(high, low, close, 14)
+        result["stoch_k"] = percent_k
+        result["stoch_d"] = percent_d
 
+    return result
@@ -0,0 +1,227 @@
+import math
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from src.technical_indicators.indicators import INDICATOR_COLUMNS
+
+NAN = float("nan")
+
+
+def _ema_alpha(period: int) -> float:
+    # Entspricht ewm(span=period, adjust=False)
+    return 2.0 / (period + 1.0)
+
+
+def _ema_step(previous: Optional[float], value: float, period: int) -> float:
+    if previous is None:
+        return value
+    alpha = _ema_alpha(period)
+    return (1.0 - alpha) * previous + alpha * value
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    # Division mit derselben Semantik wie Pandas/NumPy (x/0 -> ±inf, 0/0 -> NaN)
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return NAN
+        return math.copysign(math.inf, numerator)
+    return numerator / denominator
+
+
+class IndicatorState:
+    """
+    Inkrementeller Indikator-Zustand für einen einzelnen Ticker.
+
+    Hält die letzten EMA-Werte, die durchschnittlichen Gewinne/Verluste des RSI und die
+    gleitenden Fenster für Bollinger Bänder, Stochastik und ROC. Ein neuer Kursbalken
+    aktualisiert alle Indikatoren in O(1), ohne die gesamte Historie neu zu berechnen.
+    Die Ergebnisse entsprechen calculate_all_indicators_panel mit Standardparametern.
+    """
+
+    STATE_VERSION = 1
+
+    RSI_PERIOD = 14
+    MACD_FAST = 12
+    MACD_SLOW = 26
+    MACD_SIGNAL = 9
+    EMA_PERIODS = (10, 20, 50)
+    BOLLINGER_WINDOW = 20
+    BOLLINGER_STD_DEV = 2
+    ATR_PERIOD = 14
+    STOCH_K_PERIOD = 14
+    STOCH_D_PERIOD = 3
+    ROC_PERIODS = (5, 10)
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.last_date: Optional[str] = None
+        self.bar_count = 0
+
+        self.prev_close: Optional[float] = None
+        self.avg_gain: Optional[float] = None
+        self.avg_loss: Optional[float] = None
+        self.ema_fast: Optional[float] = None
+        self.ema_slow: Optional[float] = None
+        self.macd_signal: Optional[float] = None
+        self.emas: Dict[int, Optional[float]] = {period: None for period in self.EMA_PERIODS}
+        self.atr: Optional[float] = None
+
+        self.closes: deque = deque(maxlen=max(self.BOLLINGER_WINDOW, max(self.ROC_PERIODS) + 1))
+        self.highs: deque = deque(maxlen=self.STOCH_K_PERIOD)
+        self.lows: deque = deque(maxlen=self.STOCH_K_PERIOD)
+        self.stoch_ks: deque = deque(maxlen=self.STOCH_D_PERIOD)
+
+        self.last_values: Dict[str, float] = {}
+
+    @classmethod
+    def from_bars(cls, ticker: str, bars: List[Dict[str, Any]]) -> "IndicatorState":
+        """
+        Baut den Zustand einmalig aus einer (nach Datum sortierten) Historie auf.
+        Args:
+            ticker: Das Tickersymbol der Aktie.
+            bars: Liste von Dictionaries mit 'date', 'high', 'low' und 'close'.
+        Returns:
+            Der Zustand nach dem letzten Balken.
+        """
+        state = cls(ticker)
+        for bar in bars:
+            state.update(bar)
+        return state
+
+    def update(self, bar: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Verarbeitet einen neuen Kursbalken und gibt die aktuellen Indikatorwerte zurück.
+        Args:
+            bar: Dictionary mit 'high', 'low', 'close' und optional 'date'.
+        Returns:
+            Ein Dictionary {Indikatorspalte: Wert}, Schlüssel wie in INDICATOR_COLUMNS.
+        """
+        close = float(bar["close"])
+        high = float(bar.get("high", close))
+        low = float(bar.get("low", close))
+
+        values: Dict[str, float] = {}
+
+        # RSI (Gewinne/Verluste des ersten Balkens sind 0, wie bei Pandas)
+        delta = close - self.prev_close if self.prev_close is not None else NAN
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self.avg_gain = _ema_step(self.avg_gain, gain, self.RSI_PERIOD)
+        self.avg_loss = _ema_step(self.avg_loss, loss, self.RSI_PERIOD)
+        rs = _divide(self.avg_gain, self.avg_loss)
+        values["rsi"] = NAN if math.isnan(rs) or math.isinf(rs) else 100 - (100 / (1 + rs))
+
+        # MACD
+        self.ema_fast = _ema_step(self.ema_fast, close, self.MACD_FAST)
+        self.ema_slow = _ema_step(self.ema_slow, close, self.MACD_SLOW)
+        macd = self.ema_fast - self.ema_slow
+        self.macd_signal = _ema_step(self.macd_signal, macd, self.MACD_SIGNAL)
+        values["macd"] = macd
+        values["macd_signal"] = self.macd_signal
+        values["macd_hist"] = macd - self.macd_signal
+
+        # EMAs
+        for period in self.EMA_PERIODS:
+            self.emas[period] = _ema_step(self.emas[period], close, period)
+            values[f"ema{period}"] = self.emas[period]
+
+        # ATR (True Range des ersten Balkens ist High - Low)
+        if self.prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.atr = _ema_step(self.atr, true_range, self.ATR_PERIOD)
+        values["atr"] = self.atr
+
+        self.closes.append(close)
+        self.highs.append(high)
+        self.lows.append(low)
+
+        # Bollinger Bänder
+        window = list(self.closes)[-self.BOLLINGER_WINDOW:]
+        if len(window) == self.BOLLINGER_WINDOW:
+            middle = sum(window) / len(window)
+            variance = sum((value - middle) ** 2 for value in window) / (len(window) - 1)
+            std_dev = math.sqrt(variance)
+            values["bollinger_middle"] = middle
+            values["bollinger_upper"] = middle + std_dev * self.BOLLINGER_STD_DEV
+            values["bollinger_lower"] = middle - std_dev * self.BOLLINGER_STD_DEV
+        else:
+            values["bollinger_middle"] = values["bollinger_upper"] = values["bollinger_lower"] = NAN
+
+        # Stochastischer Oszillator
+        if len(self.highs) == self.STOCH_K_PERIOD:
+            lowest_low = min(self.lows)
+            highest_high = max(self.highs)
+            stoch_k = _divide(close - lowest_low, highest_high - lowest_low) * 100
+        else:
+            stoch_k = NAN
+        self.stoch_ks.append(stoch_k)
+        if len(self.stoch_ks) == self.STOCH_D_PERIOD and not any(math.isnan(k) for k in self.stoch_ks):
+            stoch_d = sum(self.stoch_ks) / self.STOCH_D_PERIOD
+        else:
+            stoch_d = NAN
+        values["stoch_k"] = stoch_k
+        values["stoch_d"] = stoch_d
+
+        # ROC
+        for period in self.ROC_PERIODS:
+            if len(self.closes) > period:
+                values[f"roc{period}"] = (close / self.closes[-1 - period] - 1) * 100
+            else:
+                values[f"roc{period}"] = NAN
+
+        self.prev_close = close
+        self.last_date = str(bar["date"]) if bar.get("date") is not None else self.last_date
+        self.bar_count += 1
+        self.last_values = {column: values[column] for column in INDICATOR_COLUMNS}
+        return dict(self.last_values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialisiert den Zustand in ein JSON-kompatibles Dictionary (z.B. für die Datenbank).
+        """
+        return {
+            "version": self.STATE_VERSION,
+            "ticker": self.ticker,
+            "last_date": self.last_date,
+            "bar_count": self.bar_count,
+            "prev_close": self.prev_close,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+            "ema_fast": self.ema_fast,
+            "ema_slow": self.ema_slow,
+            "macd_signal": self.macd_signal,
+            "emas": {str(period): value for period, value in self.emas.items()},
+            "atr": self.atr,
+            "closes": list(self.closes),
+            "highs": list(self.highs),
+            "lows": list(self.lows),
+            # NaN ist kein gültiges JSON und wird als None gespeichert
+            "stoch_ks": [None if math.isnan(k) else k for k in self.stoch_ks],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndicatorState":
+        """
+        Stellt einen mit to_dict() gespeicherten Zustand wieder her.
+        """
+        if data.get("version") != cls.STATE_VERSION:
+            raise ValueError(f"Unsupported indicator state version: {data.get('version')}")
+
+        state = cls(data["ticker"])
+        state.last_date = data.get("last_date")
+        state.bar_count = data.get("bar_count", 0)
+        state.prev_close = data.get("prev_close")
+        state.avg_gain = data.get("avg_gain")
+        state.avg_loss = data.get("avg_loss")
+        state.ema_fast = data.get("ema_fast")
+        state.ema_slow = data.get("ema_slow")
+        state.macd_signal = data.get("macd_signal")
+        state.emas = {period: data.get("emas", {}).get(str(period)) for period in cls.EMA_PERIODS}
+        state.atr = data.get("atr")
+        state.closes.extend(data.get("closes", []))
+        state.highs.extend(data.get("highs", []))
+        state.lows.extend(data.get("lows", []))
+        state.stoch_ks.extend(NAN if k is None else k for k in data.get("stoch_ks", []))
+        return state
@@ -11,6 +11,7 @@ from sqlalchemy.orm import sessionmaker
 # Set test environment
 os.environ["DAKI_ENV"] = "test"
 
+from src import main_improved
 from src.main_improved import app
 from src.database.db_access_extended import DBAccessExtended
 from src.config.config_improved import SecureConfig
@@ -32,6 +33,15 @@ def test_database():
     os.unlink(temp_db.name)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def api_database(tmp_path_factory):
+    """Keep the API's database out of the repository's data/ directory."""
+    main_improved.db_access.close()
+    main_improved.db_access.db_path = str(tmp_path_factory.mktemp("api") / "daki.db")
+    yield main_improved.db_access.db_path
+    main_improved.db_access.close()
+
+
 @pytest.fixture
 def db_access(test_database):
     """Get database access instance for testing."""
@@ -0,0 +1,91 @@
+"""
+Tests for the AnalysisService.
+"""
+import asyncio
+
+from src.backend_components.data_preparation import DataPreparation
+from src.backend_components.ml_predictor import MLPredictor
+from src.models.api_models import AnalysisRequest
+from src.services.analysis_service import AnalysisService
+
+
+class SlowFakeDB:
+    """Fake database access whose reads take a while, like queries on the connection pool."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def get_historical_data_for_ticker(self, ticker):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        if ticker == "EMPTY":
+            return []
+        return [
+            {"date": f"2024-01-{day:02d}", "open": 10.0 + day, "high": 11.0 + day,
+             "low": 9.0 + day, "close": 10.0 + day, "volume": 1000}
+            for day in range(1, 29)
+        ]
+
+    async def get_event_data_for_ticker(self, ticker):
+        return []
+
+
+def test_analyze_stocks_keeps_request_order_and_limit():
+    """Results come back in request order and DB reads respect the concurrency limit."""
+    db = SlowFakeDB()
+    service = AnalysisService(db, max_concurrency=3, process_pool_workers=0)
+    tickers = ["MSFT", "EMPTY", "AAPL", "SAP", "NVDA", "TSLA"]
+
+    try:
+        results = asyncio.run(service.analyze_stocks(AnalysisRequest(tickers=tickers), user_id=1))
+    finally:
+        service.close()
+
+    assert [result.ticker for result in results] == tickers
+    assert results[1].status == "failed"
+    assert all(result.status == "success" for i, result in enumerate(results) if i != 1)
+    assert 1 < db.max_active <= 3
+
+
+class IndicatorFakeDB(SlowFakeDB):
+    """Fake database access whose history also contains the indicators used as ML features."""
+
+    async def get_historical_data_for_ticker(self, ticker):
+        rows = await super().get_historical_data_for_ticker(ticker)
+        return [{**row, "rsi": 40.0 + i} for i, row in enumerate(rows)]
+
+
+class RecordingPredictor:
+    """ML predictor stub that records its model calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    latest_feature_row = staticmethod(MLPredictor.latest_feature_row)
+
+    async def predict_many(self, feature_rows):
+        self.calls.append(dict(feature_rows))
+        return {ticker: row["close"] / 100 for ticker, row in feature_rows.items()}
+
+
+def test_ml_predictions_use_one_model_call():
+    """All tickers are predicted in one batch from their latest feature rows."""
+    service = AnalysisService(IndicatorFakeDB(), max_concurrency=4, process_pool_workers=0)
+    service._ml_predictor = predictor = RecordingPredictor()
+    service._data_preparation = DataPreparation()  # without the on-disk feature store
+    tickers = ["MSFT", "EMPTY", "AAPL"]
+
+    try:
+        results = asyncio.run(service.analyze_stocks(AnalysisRequest(tickers=tickers), user_id=1))
+    finally:
+        service.close()
+
+    assert len(predictor.calls) == 1
+    assert set(predictor.calls[0]) == {"MSFT", "AAPL"}
+    # Latest trading day, not the last day with a known 30-day target
+    assert predictor.calls[0]["MSFT"]["close"] == 38.0
+    assert [result.ml_prediction for result in results] == [0.38, None, 0.38]
+    assert results[0].ml_confidence == 0.75
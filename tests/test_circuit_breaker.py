@@ -0,0 +1,122 @@
+"""
+Tests for the circuit breaker guarding data source plugin requests.
+"""
+import asyncio
+
+import aiohttp
+import pytest
+
+from src.plugins.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from src.plugins.data_sources.yahoo_finance_plugin import YahooFinancePlugin
+from src.plugins.plugin_manager import PluginManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+    async def json(self):
+        return {"chart": {"result": []}}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class FlakySession:
+    """aiohttp session stub that fails while `down` is set."""
+
+    def __init__(self):
+        self.down = True
+        self.calls = 0
+        self.closed = False
+
+    def get(self, url, params=None):
+        self.calls += 1
+        if self.down:
+            raise aiohttp.ClientConnectionError("connection refused")
+        return FakeResponse()
+
+
+def test_state_transitions():
+    clock = FakeClock()
+    breaker = CircuitBreaker("Test", failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    clock.now += 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()  # one probe
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 2
+
+    clock.now += 10
+    breaker.check()
+    breaker.record_cancelled()  # cancelled probe frees its slot
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.consecutive_failures == 0
+    assert breaker.get_status()["rejected"] == 2
+
+
+def test_open_circuit_stops_retries_and_fails_fast():
+    clock = FakeClock()
+    plugin = YahooFinancePlugin()
+    plugin.session = session = FlakySession()
+    plugin.circuit_breaker = CircuitBreaker("YahooFinancePlugin", failure_threshold=1, reset_timeout=30, clock=clock)
+
+    async def request():
+        return await plugin._rate_limited_request("https://example.invalid/chart", {"range": "1d"})
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(request())  # first failed attempt opens the circuit, no retry sleeps
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(request())
+    assert session.calls == 1
+
+    # After the reset timeout one probe goes through and closes the circuit again
+    clock.now += 30
+    session.down = False
+    assert asyncio.run(request()) == {"chart": {"result": []}}
+    assert plugin.circuit_breaker.state == CLOSED
+
+
+def test_plugin_manager_skips_open_plugins_and_reports_state():
+    PluginManager._instance = None
+    manager = PluginManager()
+    asyncio.run(manager.load_plugins())
+    try:
+        breaker = manager.circuit_breakers["YahooFinancePlugin"]
+        assert manager.plugins["YahooFinancePlugin"].circuit_breaker is breaker
+        manager.active_plugins["YahooFinancePlugin"] = True
+        manager.active_plugins["FinancialModelingPrepPlugin"] = True
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        result = asyncio.run(manager.fetch_data_from_plugin("YahooFinancePlugin", "ohlcv", "AAPL", "2024-01-01", "2024-02-01"))
+        status = manager.get_status()
+
+        assert result == []
+        assert status["details"]["open_circuits"] == ["YahooFinancePlugin"]
+        assert status["details"]["plugins"]["YahooFinancePlugin"]["circuit_breaker"]["state"] == OPEN
+        assert manager.rank_plugins_for("ohlcv", ["YahooFinancePlugin", "FinancialModelingPrepPlugin"]) == [
+            "FinancialModelingPrepPlugin", "YahooFinancePlugin"
+        ]
+    finally:
+        PluginManager._instance = None
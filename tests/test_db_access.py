@@ -0,0 +1,253 @@
+"""
+Tests for the pooled database access layers.
+"""
+import asyncio
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.database.db_access import DBAccess
+from src.database.db_access_extended import DBAccessExtended
+from src.database.db_migration import DatabaseMigration
+
+SCHEMA = """
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL UNIQUE,
+        hashed_password TEXT NOT NULL,
+        created_at TEXT,
+        last_login TEXT
+    );
+    CREATE TABLE portfolios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        ticker TEXT NOT NULL,
+        quantity REAL NOT NULL,
+        average_buy_price REAL NOT NULL,
+        created_at TEXT,
+        updated_at TEXT,
+        UNIQUE(user_id, ticker)
+    );
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def db_access(db_path):
+    db = DBAccess()
+    db.db_path = db_path
+    db.pool_size = 3
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def db_access_extended(db_path):
+    db = DBAccessExtended()
+    db.db_path = db_path
+    db.pool_size = 3
+    yield db
+    db.close()
+
+
+def test_concurrent_queries_share_bounded_pool(db_access):
+    """Concurrent calls succeed and never open more connections than the pool size."""
+    async def scenario():
+        created = await asyncio.gather(*(db_access.create_user(f"user{i}", "hash") for i in range(20)))
+        users = await asyncio.gather(*(db_access.get_user_by_username(f"user{i}") for i in range(20)))
+        return created, users
+
+    created, users = asyncio.run(scenario())
+
+    assert [user["username"] for user in created] == [f"user{i}" for i in range(20)]
+    assert [user["id"] for user in users] == [user["id"] for user in created]
+    assert 1 <= len(db_access.pool._connections) <= 3
+
+
+def test_failed_trade_rolls_back_and_keeps_connection_usable(db_access):
+    """An error inside a pooled transaction leaves no open transaction behind."""
+    async def scenario():
+        user = await db_access.create_user("trader", "hash")
+        with pytest.raises(ValueError):
+            await db_access.update_portfolio_after_trade(user["id"], "AAPL", -5, -500.0)
+        await db_access.update_portfolio_after_trade(user["id"], "AAPL", 10, 1500.0)
+        await db_access.update_portfolio_after_trade(user["id"], "AAPL", 10, 1700.0)
+        return await db_access.get_stocks_by_user_id(user["id"])
+
+    stocks = asyncio.run(scenario())
+
+    assert len(stocks) == 1
+    assert stocks[0]["quantity"] == 20
+    assert stocks[0]["average_buy_price"] == pytest.approx(160.0)
+    assert not any(conn.in_transaction for conn in db_access.pool._connections)
+
+
+def test_trade_reads_position_inside_its_write_transaction(db_access, db_path):
+    """A trade waiting for another writer reads the position after that writer committed."""
+    async def scenario():
+        user = await db_access.create_user("trader", "hash")
+        await db_access.update_portfolio_after_trade(user["id"], "AAPL", 10, 1000.0)
+        other = sqlite3.connect(db_path)
+        other.execute("BEGIN IMMEDIATE")
+        trade = asyncio.ensure_future(db_access.update_portfolio_after_trade(user["id"], "AAPL", 5, 500.0))
+        await asyncio.sleep(0.2)  # the trade is now blocked on the write lock
+        other.execute("UPDATE portfolios SET quantity = quantity + 10 WHERE user_id = ?", (user["id"],))
+        other.commit()
+        other.close()
+        await trade
+        return await db_access.get_stocks_by_user_id(user["id"])
+
+    stocks = asyncio.run(scenario())
+
+    assert stocks[0]["quantity"] == 25
+    assert not any(conn.in_transaction for conn in db_access.pool._connections)
+
+
+def test_extended_access_uses_row_factory_and_handles_duplicates(db_access_extended):
+    async def scenario():
+        created = await db_access_extended.create_user("alice", "hash")
+        duplicate = await db_access_extended.create_user("alice", "hash")
+        user = await db_access_extended.get_user_by_username("alice")
+        updated = await db_access_extended.update_last_login(user["id"])
+        healthy = await db_access_extended.check_connection()
+        return created, duplicate, user, updated, healthy
+
+    created, duplicate, user, updated, healthy = asyncio.run(scenario())
+
+    assert duplicate is None
+    assert user["id"] == created["id"]
+    assert updated and healthy
+
+
+def test_pooled_connections_use_wal_and_pragmas(db_access):
+    with db_access.pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+
+
+def test_tune_schema_indexes_historical_data_query(db_path):
+    """The migration indexes historical_data but reuses the UNIQUE index of stock_historical_data."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE candidates (id INTEGER PRIMARY KEY, ticker TEXT NOT NULL UNIQUE);
+        CREATE TABLE historical_data (id INTEGER PRIMARY KEY, candidate_id INTEGER NOT NULL, date TEXT NOT NULL, close REAL);
+        CREATE TABLE stock_historical_data (id INTEGER PRIMARY KEY, ticker TEXT NOT NULL, date TEXT NOT NULL, UNIQUE(ticker, date));
+    """)
+    conn.close()
+
+    migration = DatabaseMigration(db_path)
+    assert migration.tune_schema() == ["idx_historical_data_candidate_date"]
+    assert migration.tune_schema() == []
+
+    conn = sqlite3.connect(db_path)
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT hd.date, hd.close FROM historical_data hd "
+        "JOIN candidates c ON hd.candidate_id = c.id WHERE c.ticker = ? ORDER BY hd.date ASC", ("AAPL",)
+    ))
+    conn.close()
+    assert "idx_historical_data_candidate_date" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_tune_schema_keeps_duplicates_unless_removal_is_requested(db_path, tmp_path):
+    """Duplicates block the unique index; only an explicit request deletes them (after a backup)."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE historical_data (id INTEGER PRIMARY KEY, candidate_id INTEGER NOT NULL, date TEXT NOT NULL, close REAL);
+        CREATE INDEX idx_historical_data_candidate_date ON historical_data (candidate_id, date);
+        INSERT INTO historical_data (candidate_id, date, close) VALUES (1, '2024-01-02', 1.0), (1, '2024-01-02', 2.0), (1, '2024-01-03', 3.0);
+    """)
+    conn.commit()
+    conn.close()
+
+    def table_state():
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT date, close FROM historical_data ORDER BY id").fetchall()
+        unique = [row[2] for row in conn.execute("PRAGMA index_list(historical_data)") if row[1] == "idx_historical_data_candidate_date"]
+        conn.close()
+        return rows, unique
+
+    migration = DatabaseMigration(db_path)
+    assert migration.tune_schema() == []
+    assert table_state() == ([("2024-01-02", 1.0), ("2024-01-02", 2.0), ("2024-01-03", 3.0)], [0])
+    assert list(tmp_path.glob("*.backup_*")) == []
+
+    # An older non-unique index is replaced by the unique one, keeping the newest duplicate row
+    assert migration.tune_schema(remove_duplicates=True) == ["idx_historical_data_candidate_date"]
+    assert table_state() == ([("2024-01-02", 2.0), ("2024-01-03", 3.0)], [1])
+    assert len(list(tmp_path.glob("*.backup_*"))) == 1
+
+
+def _add_history(db_path: str, ticker: str, candidate_id: int, closes: list) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE IF NOT EXISTS candidates (id INTEGER PRIMARY KEY, ticker TEXT NOT NULL UNIQUE)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS historical_data (
+            id INTEGER PRIMARY KEY, candidate_id INTEGER NOT NULL, date TEXT NOT NULL,
+            open REAL, high REAL, low REAL, close REAL, volume INTEGER,
+            rsi REAL, macd REAL, macd_signal REAL, macd_hist REAL, ema10 REAL, ema20 REAL, ema50 REAL,
+            bollinger_upper REAL, bollinger_middle REAL, bollinger_lower REAL,
+            atr REAL, stoch_k REAL, stoch_d REAL, roc5 REAL, roc10 REAL, event_data_json TEXT
+        )
+    """)
+    conn.execute("INSERT INTO candidates (id, ticker) VALUES (?, ?)", (candidate_id, ticker))
+    # Inserted in reverse date order to check the ordering
+    for day, close in reversed(list(enumerate(closes, start=1))):
+        conn.execute(
+            "INSERT INTO historical_data (candidate_id, date, open, high, low, close, volume, rsi) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (candidate_id, f"2024-01-{day:02d}", close, close + 1, close - 1, close, 1000 * day,
+             None if day == 1 else 50.0 + day)
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_historical_panel_matches_row_reads(db_access_extended, db_path):
+    """The columnar read returns the same values as get_historical_data_for_ticker."""
+    _add_history(db_path, "AAPL", 1, [10.0, 11.0, 12.0, 13.0])
+    _add_history(db_path, "MSFT", 2, [20.0, 21.0])
+
+    async def scenario():
+        frame = await db_access_extended.get_historical_panel(["MSFT", "NONE", "AAPL"])
+        rows = await db_access_extended.get_historical_data_for_ticker("AAPL")
+        return frame, rows
+
+    frame, rows = asyncio.run(scenario())
+
+    assert frame["ticker"].tolist() == ["MSFT"] * 2 + ["AAPL"] * 4
+    aapl = frame[frame["ticker"] == "AAPL"].reset_index(drop=True)
+    expected = pd.DataFrame(rows).drop(columns="event_data_json")
+    expected["date"] = pd.to_datetime(expected["date"])
+    expected = expected.astype({column: np.float64 for column in expected.columns if column != "date"})
+    pd.testing.assert_frame_equal(aapl.drop(columns="ticker"), expected, check_like=True)
+
+
+def test_historical_panel_arrays_with_date_range_and_columns(db_access, db_path):
+    _add_history(db_path, "AAPL", 1, [10.0, 11.0, 12.0, 13.0])
+
+    panel = asyncio.run(db_access.get_historical_panel(
+        "AAPL", start_date=pd.Timestamp("2024-01-02"), end_date="2024-01-03", columns=["close", "rsi"], as_frame=False
+    ))
+
+    assert list(panel) == ["ticker", "date", "close", "rsi"]
+    assert panel["close"].dtype == np.float64 and panel["close"].flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(panel["close"], [11.0, 12.0])
+    np.testing.assert_array_equal(panel["date"], np.array(["2024-01-02", "2024-01-03"], dtype="datetime64[ns]"))
+
+    empty = asyncio.run(db_access.get_historical_panel(["NONE"]))
+    assert empty.empty and "close" in empty.columns
+
+    with pytest.raises(ValueError):
+        asyncio.run(db_access.get_historical_panel("AAPL", columns=["close; DROP TABLE users"]))
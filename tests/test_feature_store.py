@@ -0,0 +1,109 @@
+"""
+Tests for the on-disk feature store used by DataPreparation.
+"""
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from src.backend_components import data_preparation as data_preparation_module
+from src.backend_components.data_preparation import DataPreparation
+from src.backend_components.feature_store import FeatureStore
+
+
+def _raw_data(days, start="2024-01-01"):
+    dates = pd.date_range(start, periods=days, freq="D")
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, days))
+    return [
+        {"date": date.strftime("%Y-%m-%d"), "open": c - 0.5, "high": c + 1, "low": c - 1, "close": c,
+         "volume": 1000 + i, "rsi": 50 + (i % 10)}
+        for i, (date, c) in enumerate(zip(dates, close))
+    ]
+
+
+def _prepare(preparation, ticker, raw, **kwargs):
+    return asyncio.run(preparation.prepare_data_for_ml(ticker, raw, **kwargs))
+
+
+def test_store_matches_in_memory_preparation(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    raw = _raw_data(80)
+
+    expected = _prepare(DataPreparation(), "AAPL", raw)
+    first = _prepare(DataPreparation(feature_store=store), "AAPL", raw)
+    second = _prepare(DataPreparation(feature_store=store), "AAPL", raw, forecast_period=5)
+
+    pd.testing.assert_frame_equal(first, expected, check_freq=False, check_dtype=False)
+    pd.testing.assert_frame_equal(second, _prepare(DataPreparation(), "AAPL", raw, forecast_period=5), check_freq=False, check_dtype=False)
+    assert store.stats == {"hits": 1, "appends": 0, "rebuilds": 1}
+
+
+def test_new_dates_are_appended(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    raw = _raw_data(60)
+    preparation = DataPreparation(feature_store=store)
+
+    _prepare(preparation, "MSFT", raw[:40])
+    extended = _prepare(preparation, "MSFT", raw)
+
+    pd.testing.assert_frame_equal(extended, _prepare(DataPreparation(), "MSFT", raw), check_freq=False, check_dtype=False)
+    assert store.stats["appends"] == 1 and store.stats["rebuilds"] == 1
+    assert len(store.load("MSFT")) == 60
+    assert store.load("MSFT").index[-1] == pd.Timestamp(raw[-1]["date"])
+
+
+def test_changed_columns_or_earlier_history_rebuild(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    raw = _raw_data(50)
+    preparation = DataPreparation(feature_store=store)
+
+    _prepare(preparation, "SAP", raw[10:])
+    _prepare(preparation, "SAP", raw)
+    _prepare(preparation, "SAP", [{**row, "macd": 0.1} for row in raw])
+
+    assert store.stats["rebuilds"] == 3
+    assert "macd" in store.load("SAP").columns
+
+
+def test_feature_definition_change_uses_new_version(tmp_path, monkeypatch):
+    raw = _raw_data(30)
+    old_store = FeatureStore(str(tmp_path))
+    _prepare(DataPreparation(feature_store=old_store), "NVDA", raw)
+
+    monkeypatch.setattr(data_preparation_module, "FEATURE_VERSION", data_preparation_module.FEATURE_VERSION + 1)
+    new_store = FeatureStore(str(tmp_path))
+
+    assert new_store.definition_hash != old_store.definition_hash
+    assert new_store.load("NVDA") is None
+    assert old_store.load("NVDA") is not None
+
+
+def test_append_after_history_shorter_than_warmup(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    raw = pd.DataFrame(
+        {"close": np.arange(1.0, 9.0), "rsi": np.arange(50.0, 58.0)},
+        index=pd.DatetimeIndex(pd.date_range("2024-01-01", periods=8, freq="D"), name="date")
+    )
+
+    store.update("AAPL", raw.iloc[:3])
+    appended = store.update("AAPL", raw)
+
+    assert store.stats["appends"] == 1
+    assert appended.loc["2024-01-05", "close_rolling_mean5"] == 3.0
+    expected = data_preparation_module.compute_features(raw.copy())
+    pd.testing.assert_frame_equal(appended, expected, check_freq=False)
+
+
+def test_result_is_limited_to_the_requested_window(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    raw = _raw_data(60)
+    preparation = DataPreparation(feature_store=store)
+    _prepare(preparation, "AMZN", raw)
+
+    window = _prepare(preparation, "AMZN", raw[20:40], forecast_period=5)
+
+    assert store.stats["hits"] == 1
+    assert window.index.min() >= pd.Timestamp(raw[20]["date"])
+    assert window.index.max() <= pd.Timestamp(raw[39]["date"])
+    assert len(store.load("AMZN")) == 60
@@ -0,0 +1,51 @@
+"""
+Tests for the shared HTTP connection pool of the data source plugins.
+"""
+import asyncio
+
+from src.plugins.data_sources.sec_filings_plugin import SECFilingsPlugin
+from src.plugins.data_sources.yahoo_finance_plugin import YahooFinancePlugin
+from src.plugins.http_client import HttpClientFactory
+
+
+def test_plugins_share_one_connector():
+    factory = HttpClientFactory(limit=20, limit_per_host=5)
+
+    async def scenario():
+        plugins = [YahooFinancePlugin(), SECFilingsPlugin()]
+        for plugin in plugins:
+            plugin.http_client = factory
+            plugin.initialize({"user_agent": "DA-KI test contact@example.com"})
+        connectors = {id(plugin.session.connector) for plugin in plugins}
+        timeouts = [plugin.session.timeout.total for plugin in plugins]
+
+        # Closing a plugin keeps the pooled connections of the others
+        await plugins[0].close()
+        still_open = not factory.connector.closed and not plugins[1].session.closed
+        await plugins[1].close()
+        await factory.close()
+        return connectors, timeouts, still_open
+
+    connectors, timeouts, still_open = asyncio.run(scenario())
+
+    assert len(connectors) == 1
+    assert timeouts == [30, 30]
+    assert still_open
+    assert factory.get_stats()["sessions_created"] == 2
+    assert factory.get_stats()["open"] is False
+
+
+def test_connector_is_recreated_for_a_new_event_loop():
+    factory = HttpClientFactory()
+
+    async def open_connector():
+        connector = factory.connector
+        assert factory.connector is connector  # reused within the loop
+        await connector.close()
+        return connector
+
+    first = asyncio.run(open_connector())
+    second = asyncio.run(open_connector())
+
+    assert first is not second
+    assert (second.limit, second.limit_per_host) == (100, 10)
@@ -0,0 +1,100 @@
+"""
+Tests for the technical indicator library.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.technical_indicators import indicators
+from src.technical_indicators.streaming import IndicatorState
+
+
+@pytest.fixture
+def price_panel():
+    """Synthetic OHLC panel (dates x tickers)."""
+    rng = np.random.default_rng(42)
+    dates = pd.date_range("2023-01-01", periods=120, freq="D")
+    tickers = ["AAPL", "MSFT", "SAP"]
+    close = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(dates), len(tickers))), axis=0)),
+        index=dates,
+        columns=tickers,
+    )
+    return {"close": close, "high": close * 1.01, "low": close * 0.99}
+
+
+def test_panel_matches_single_ticker_functions(price_panel):
+    """Panel results must be identical to the per-ticker functions."""
+    close, high, low = price_panel["close"], price_panel["high"], price_panel["low"]
+    panel = indicators.calculate_all_indicators_panel(close, high, low)
+
+    assert set(panel) == set(indicators.INDICATOR_COLUMNS)
+
+    for ticker in close.columns:
+        c, h, l = close[ticker], high[ticker], low[ticker]
+        macd = indicators.calculate_macd(c)
+        bb = indicators.calculate_bollinger_bands(c)
+        stoch = indicators.calculate_stochastic_oscillator(h, l, c)
+        expected = {
+            "rsi": indicators.calculate_rsi(c),
+            "macd": macd["MACD"],
+            "macd_signal": macd["Signal"],
+            "macd_hist": macd["Histogram"],
+            "ema10": indicators.calculate_ema(c, 10),
+            "ema20": indicators.calculate_ema(c, 20),
+            "ema50": indicators.calculate_ema(c, 50),
+            "bollinger_upper": bb["Upper"],
+            "bollinger_middle": bb["Middle"],
+            "bollinger_lower": bb["Lower"],
+            "atr": indicators.calculate_atr(h, l, c),
+            "stoch_k": stoch["K"],
+            "stoch_d": stoch["D"],
+            "roc5": indicators.calculate_roc(c, 5),
+            "roc10": indicators.calculate_roc(c, 10),
+        }
+        for column, series in expected.items():
+            pd.testing.assert_series_equal(panel[column][ticker], series, check_names=False)
+
+
+def test_panel_accepts_numpy_arrays(price_panel):
+    """A plain 2-D NumPy array is accepted as panel input."""
+    close = price_panel["close"]
+    rsi = indicators.calculate_rsi_panel(close.to_numpy())
+    np.testing.assert_allclose(rsi.to_numpy(), indicators.calculate_rsi_panel(close).to_numpy())
+
+    with pytest.raises(ValueError):
+        indicators.to_panel(close["AAPL"].to_numpy())
+
+
+def test_pivot_to_panels():
+    """Long-format rows are pivoted into one column per ticker."""
+    long_df = pd.DataFrame({
+        "ticker": ["AAPL", "AAPL", "MSFT", "MSFT"],
+        "date": pd.to_datetime(["2024-01-02", "2024-01-01", "2024-01-01", "2024-01-02"]),
+        "close": [2.0, 1.0, 10.0, 11.0],
+    })
+    panels = indicators.pivot_to_panels(long_df, ["close"])
+    assert list(panels["close"].columns) == ["AAPL", "MSFT"]
+    assert panels["close"]["AAPL"].tolist() == [1.0, 2.0]
+
+
+def test_streaming_state_matches_batch(price_panel):
+    """Incremental updates reproduce the batch indicators, also after persisting the state."""
+    close, high, low = price_panel["close"], price_panel["high"], price_panel["low"]
+    panel = indicators.calculate_all_indicators_panel(close, high, low)
+
+    bars = [
+        {"date": str(date.date()), "close": c, "high": h, "low": l}
+        for date, c, h, l in zip(close.index, close["SAP"], high["SAP"], low["SAP"])
+    ]
+    state = IndicatorState.from_bars("SAP", bars[:80])
+    state = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+    streamed = pd.DataFrame([state.update(bar) for bar in bars[80:]], index=close.index[80:])
+
+    assert state.last_date == bars[-1]["date"]
+    for column in indicators.INDICATOR_COLUMNS:
+        np.testing.assert_allclose(
+            streamed[column].to_numpy(), panel[column]["SAP"].to_numpy()[80:], rtol=1e-9
+        )
@@ -0,0 +1,228 @@
+"""
+Tests for the IngestionService.
+"""
+import asyncio
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.database.db_access import DBAccess
+from src.services.ingestion_service import IngestionService, calculate_indicator_frames, records_to_frame
+from src.technical_indicators import indicators
+
+SCHEMA = """
+    CREATE TABLE candidates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker TEXT NOT NULL UNIQUE,
+        selection_reason TEXT,
+        timestamp TEXT NOT NULL,
+        is_complete INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE historical_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        candidate_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        open REAL, high REAL, low REAL, close REAL, volume INTEGER,
+        rsi REAL, macd REAL, macd_signal REAL, macd_hist REAL,
+        ema10 REAL, ema20 REAL, ema50 REAL,
+        bollinger_upper REAL, bollinger_middle REAL, bollinger_lower REAL,
+        atr REAL, stoch_k REAL, stoch_d REAL, roc5 REAL, roc10 REAL,
+        event_data_json TEXT
+    );
+"""
+
+
+def _records(ticker: str, days: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    dates = pd.bdate_range("2024-01-01", periods=days).strftime("%Y-%m-%d")
+    return [
+        {"date": date, "open": c, "high": c * 1.01, "low": c * 0.99, "close": c,
+         "volume": 1000 + i, "source": "fake", "ticker": ticker}
+        for i, (date, c) in enumerate(zip(dates, close))
+    ]
+
+
+class FakePluginManager:
+    """Plugin manager returning synthetic OHLCV records within the requested range; 'BAD' has no data."""
+
+    def __init__(self, lengths):
+        self.lengths = lengths
+        self.calls = []
+
+    async def fetch_data_from_plugin(self, plugin_name, data_type, ticker, start_date, end_date, **kwargs):
+        self.calls.append((ticker, start_date))
+        await asyncio.sleep(0)
+        if ticker not in self.lengths:
+            return []
+        records = _records(ticker, self.lengths[ticker], seed=len(ticker))
+        return [record for record in records if start_date <= record["date"] <= end_date]
+
+
+@pytest.fixture
+def db_access(tmp_path):
+    path = str(tmp_path / "ingest.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+    db = DBAccess()
+    db.db_path = path
+    yield db
+    db.close()
+
+
+def test_indicator_frames_match_single_ticker_calculation():
+    frames = {ticker: records_to_frame(_records(ticker, days, seed)) for ticker, days, seed in
+              [("A", 80, 1), ("BB", 35, 2), ("CCC", 5, 3)]}
+
+    result = calculate_indicator_frames(frames)
+
+    for ticker, frame in frames.items():
+        single = indicators.calculate_all_indicators_panel(
+            frame["close"].to_numpy()[:, None], frame["high"].to_numpy()[:, None], frame["low"].to_numpy()[:, None]
+        )
+        for column in indicators.INDICATOR_COLUMNS:
+            np.testing.assert_allclose(result[ticker][column].to_numpy(), single[column].iloc[:, 0].to_numpy())
+
+
+def test_run_writes_history_and_resumes(db_access):
+    manager = FakePluginManager({"AAPL": 60, "MSFT": 40})
+    service = IngestionService(db_access, manager, max_concurrency=2, batch_size=1)
+
+    summary = asyncio.run(service.run(tickers=["AAPL", "MSFT", "BAD"], run_id="run-1"))
+
+    assert (summary["succeeded"], summary["failed"], summary["rows_written"]) == (2, 1, 100)
+    stored = asyncio.run(db_access.get_historical_panel(["AAPL", "MSFT"]))
+    assert stored.groupby("ticker").size().to_dict() == {"AAPL": 60, "MSFT": 40}
+    assert stored["rsi"].notna().sum() > 0
+
+    # Same run again: finished tickers are skipped, only the failed one is retried
+    manager.calls.clear()
+    summary = asyncio.run(service.run(tickers=["AAPL", "MSFT", "BAD"], run_id="run-1"))
+    assert [ticker for ticker, _ in manager.calls] == ["BAD"]
+    assert summary["skipped"] == 2
+
+    # A new run upserts instead of duplicating rows
+    asyncio.run(service.run(tickers=["AAPL"], run_id="run-2"))
+    conn = sqlite3.connect(db_access.db_path)
+    count = conn.execute("SELECT COUNT(*) FROM historical_data").fetchone()[0]
+    conn.close()
+    assert count == 100
+
+
+def test_run_refuses_to_delete_duplicate_history(db_access):
+    conn = sqlite3.connect(db_access.db_path)
+    conn.execute("INSERT INTO candidates (id, ticker, timestamp) VALUES (1, 'AAPL', '2024-01-01')")
+    conn.executemany("INSERT INTO historical_data (candidate_id, date, close) VALUES (1, '2024-01-02', ?)", [(1.0,), (2.0,)])
+    conn.commit()
+    conn.close()
+    service = IngestionService(db_access, FakePluginManager({"AAPL": 10}))
+
+    with pytest.raises(RuntimeError, match="--remove-duplicates"):
+        asyncio.run(service.run(tickers=["AAPL"]))
+
+    conn = sqlite3.connect(db_access.db_path)
+    count = conn.execute("SELECT COUNT(*) FROM historical_data").fetchone()[0]
+    conn.close()
+    assert count == 2
+
+
+def _stored_frame(db_access, ticker):
+    return asyncio.run(db_access.get_historical_panel([ticker])).drop(columns="ticker")
+
+
+def test_incremental_run_fetches_only_new_bars(db_access):
+    manager = FakePluginManager({"AAPL": 60, "MSFT": 40})
+    service = IngestionService(db_access, manager, batch_size=1)
+    asyncio.run(service.run(tickers=["AAPL", "MSFT"], run_id="day-1"))
+    last_date = _records("AAPL", 60, seed=4)[-1]["date"]
+
+    # Nothing new until the next business day: no requests at all
+    manager.calls.clear()
+    summary = asyncio.run(service.run(tickers=["AAPL"], run_id="day-1b", end_date=last_date))
+    assert manager.calls == []
+    assert summary["up_to_date"] == 1
+
+    # Five new AAPL bars, none for MSFT
+    manager.lengths["AAPL"] = 65
+    manager.calls.clear()
+    summary = asyncio.run(service.run(tickers=["AAPL", "MSFT"], run_id="day-2", end_date="2024-12-31"))
+    assert dict(manager.calls)["AAPL"] == (pd.Timestamp(last_date) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    assert (summary["succeeded"], summary["failed"], summary["rows_written"]) == (2, 0, 5)
+
+    # Streamed indicators of the appended bars match a full recalculation
+    full = calculate_indicator_frames({"AAPL": records_to_frame(_records("AAPL", 65, seed=4))})["AAPL"]
+    stored = _stored_frame(db_access, "AAPL")
+    assert len(stored) == 65
+    for column in indicators.INDICATOR_COLUMNS:
+        np.testing.assert_allclose(stored[column].to_numpy(), full[column].to_numpy(), rtol=1e-9)
+
+
+def test_incremental_run_rebuilds_missing_indicator_state(db_access):
+    """Rows written without a persisted state (or by older code) still extend correctly."""
+    manager = FakePluginManager({"AAPL": 60})
+    service = IngestionService(db_access, manager)
+    asyncio.run(service.run(tickers=["AAPL"], run_id="day-1"))
+    conn = sqlite3.connect(db_access.db_path)
+    conn.execute("DELETE FROM ingestion_watermarks")
+    conn.commit()
+    conn.close()
+
+    manager.lengths["AAPL"] = 62
+    manager.calls.clear()
+    summary = asyncio.run(service.run(tickers=["AAPL"], run_id="day-2", end_date="2024-12-31"))
+
+    assert len(manager.calls) == 1 and summary["rows_written"] == 2
+    full = calculate_indicator_frames({"AAPL": records_to_frame(_records("AAPL", 62, seed=4))})["AAPL"]
+    stored = _stored_frame(db_access, "AAPL")
+    np.testing.assert_allclose(stored["rsi"].to_numpy()[-2:], full["rsi"].to_numpy()[-2:], rtol=1e-9)
+    np.testing.assert_allclose(stored["macd_signal"].to_numpy()[-2:], full["macd_signal"].to_numpy()[-2:], rtol=1e-9)
+
+
+class FailingPluginManager(FakePluginManager):
+    """Plugin manager whose requests for the tickers in 'failing' raise."""
+
+    def __init__(self, lengths):
+        super().__init__(lengths)
+        self.failing = set()
+
+    async def fetch_data_from_plugin(self, plugin_name, data_type, ticker, start_date, end_date, **kwargs):
+        if ticker in self.failing:
+            self.calls.append((ticker, start_date))
+            raise RuntimeError("provider unavailable")
+        return await super().fetch_data_from_plugin(plugin_name, data_type, ticker, start_date, end_date, **kwargs)
+
+
+def _watermark(db_access, ticker):
+    conn = sqlite3.connect(db_access.db_path)
+    row = conn.execute("SELECT last_date, last_fetch_ts FROM ingestion_watermarks WHERE ticker = ?", (ticker,)).fetchone()
+    conn.close()
+    return row
+
+
+def test_incremental_fetch_errors_are_failures_and_retried(db_access):
+    manager = FailingPluginManager({"AAPL": 60, "MSFT": 40})
+    service = IngestionService(db_access, manager, batch_size=1)
+    asyncio.run(service.run(tickers=["AAPL", "MSFT"], run_id="day-1"))
+    watermark = _watermark(db_access, "AAPL")
+
+    manager.lengths["AAPL"] = 65
+    manager.failing = {"AAPL"}
+    summary = asyncio.run(service.run(tickers=["AAPL", "MSFT"], run_id="day-2", end_date="2024-12-31"))
+
+    assert (summary["succeeded"], summary["failed"]) == (1, 1)
+    assert _watermark(db_access, "AAPL") == watermark
+    conn = sqlite3.connect(db_access.db_path)
+    status = conn.execute("SELECT status FROM ingestion_progress WHERE run_id = 'day-2' AND ticker = 'AAPL'").fetchone()
+    conn.close()
+    assert status == ("failed",)
+
+    # Same run again once the provider is back: the failed ticker is fetched and extended
+    manager.failing.clear()
+    manager.calls.clear()
+    summary = asyncio.run(service.run(tickers=["AAPL", "MSFT"], run_id="day-2", end_date="2024-12-31"))
+    assert [ticker for ticker, _ in manager.calls] == ["AAPL"]
+    assert (summary["succeeded"], summary["rows_written"]) == (1, 5)
+    assert len(_stored_frame(db_access, "AAPL")) == 65
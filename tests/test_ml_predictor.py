@@ -0,0 +1,83 @@
+"""
+Tests for MLPredictor inference.
+"""
+import asyncio
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from src.backend_components.data_preparation import feature_definition_hash
+from src.backend_components.ml_predictor import MLPredictor
+
+FEATURES = ["close", "rsi", "close_lag1"]
+
+
+def _predictor(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, len(FEATURES))), columns=FEATURES)
+    y = X["close"] * 0.5 - X["rsi"] * 0.1
+    predictor = MLPredictor(model_path=str(tmp_path / "model.ubj"))
+    predictor.model = xgb.XGBRegressor(n_estimators=20, max_depth=3).fit(X, y)
+    return predictor, X
+
+
+def test_predict_many_matches_row_by_row_predictions(tmp_path):
+    predictor, X = _predictor(tmp_path)
+    rows = {f"T{i}": X.iloc[i].to_dict() for i in range(5)}
+
+    predictions = asyncio.run(predictor.predict_many(rows))
+
+    expected = predictor.model.predict(X.iloc[:5])
+    assert list(predictions) == list(rows)
+    np.testing.assert_allclose(list(predictions.values()), expected, rtol=1e-6)
+
+
+def test_predict_many_aligns_columns_by_name(tmp_path):
+    predictor, X = _predictor(tmp_path)
+    row = X.iloc[0].to_dict()
+    shuffled = {"extra": 1.0, **{name: row[name] for name in reversed(FEATURES)}}
+
+    predictions = asyncio.run(predictor.predict_many({"A": row, "B": shuffled}))
+
+    assert predictions["A"] == predictions["B"]
+    assert asyncio.run(predictor.predict_many({})) == {}
+
+
+def test_artifact_round_trip_with_schema(tmp_path):
+    trained, X = _predictor(tmp_path)
+    trained._fit(X, X["close"] * 0.5)
+
+    loaded = MLPredictor(model_path=str(tmp_path / "model.ubj"))
+    assert loaded.model is None  # loaded lazily
+    assert loaded.warm_up()
+
+    assert loaded.schema["feature_names"] == FEATURES
+    assert loaded.schema["feature_version"] == feature_definition_hash()
+    row = X.iloc[3].to_dict()
+    assert asyncio.run(loaded.predict_many({"A": row})) == asyncio.run(trained.predict_many({"A": row}))
+
+
+def test_artifact_with_other_feature_version_is_not_loaded(tmp_path):
+    trained, X = _predictor(tmp_path)
+    trained._fit(X, X["close"])
+    schema_path = tmp_path / "model.schema.json"
+    schema = json.loads(schema_path.read_text())
+    schema_path.write_text(json.dumps({**schema, "feature_version": "outdated"}))
+
+    loaded = MLPredictor(model_path=str(tmp_path / "model.ubj"))
+
+    assert not loaded.warm_up()
+    assert asyncio.run(loaded.predict_many({"A": X.iloc[0].to_dict()})) == {}
+
+
+def test_legacy_joblib_model_is_still_loaded(tmp_path):
+    trained, X = _predictor(tmp_path)
+    joblib.dump(trained.model, tmp_path / "model.joblib")
+
+    loaded = MLPredictor(model_path=str(tmp_path / "model.joblib"))
+
+    assert loaded.warm_up()
+    assert loaded.schema == {"feature_names": FEATURES}
@@ -0,0 +1,289 @@
+"""
+Tests for request handling in the PluginManager.
+"""
+import asyncio
+
+import pytest
+
+from src.plugins.data_sources.data_source_plugin import DataSourcePlugin
+from src.plugins.data_sources.financial_modeling_prep_plugin import FinancialModelingPrepPlugin
+from src.plugins.data_sources.yahoo_finance_plugin import YahooFinancePlugin
+from src.plugins.plugin_manager import PluginManager
+
+
+class SlowPlugin:
+    """Plugin stub whose OHLCV requests take a while and are counted."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_name(self):
+        return "SlowPlugin"
+
+    async def fetch_ohlcv_data(self, ticker, start_date, end_date, interval):
+        self.calls.append((ticker, start_date, end_date, interval))
+        await asyncio.sleep(0.05)
+        return [{"date": start_date, "close": 1.0, "ticker": ticker}]
+
+
+@pytest.fixture
+def manager():
+    PluginManager._instance = None
+    manager = PluginManager()
+    manager.plugins["SlowPlugin"] = SlowPlugin()
+    manager.active_plugins["SlowPlugin"] = True
+    yield manager
+    PluginManager._instance = None
+
+
+def test_identical_concurrent_requests_share_one_call(manager):
+    plugin = manager.plugins["SlowPlugin"]
+
+    async def scenario():
+        same = [manager.fetch_data_from_plugin("SlowPlugin", "ohlcv", "AAPL", "2024-01-01", "2024-02-01")
+                for _ in range(5)]
+        other = manager.fetch_data_from_plugin("SlowPlugin", "ohlcv", "AAPL", "2024-01-01", "2024-03-01")
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(scenario())
+
+    assert len(plugin.calls) == 2
+    assert all(result == results[0] for result in results[:5])
+    assert results[0] is not results[1]  # every caller gets its own list
+    assert manager.coalesced_requests == 4
+    assert manager._in_flight_requests == {}
+
+    # Completed requests are not reused
+    asyncio.run(manager.fetch_data_from_plugin("SlowPlugin", "ohlcv", "AAPL", "2024-01-01", "2024-02-01"))
+    assert len(plugin.calls) == 3
+
+
+def test_cancelled_caller_does_not_cancel_shared_request(manager):
+    plugin = manager.plugins["SlowPlugin"]
+
+    async def scenario():
+        first = asyncio.ensure_future(
+            manager.fetch_data_from_plugin("SlowPlugin", "ohlcv", "MSFT", "2024-01-01", "2024-02-01", interval="1d")
+        )
+        second = asyncio.ensure_future(
+            manager.fetch_data_from_plugin("SlowPlugin", "ohlcv", "MSFT", "2024-01-01", "2024-02-01", interval="1d")
+        )
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    result = asyncio.run(scenario())
+
+    assert result == [{"date": "2024-01-01", "close": 1.0, "ticker": "MSFT"}]
+    assert len(plugin.calls) == 1
+
+
+def test_request_after_last_waiter_cancelled_starts_fresh(manager):
+    started = []
+
+    async def request():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return len(started)
+
+    async def scenario():
+        first = asyncio.ensure_future(manager._single_flight("k", request))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0)  # the only waiter leaves and cancels the request
+        # The cancelled request's done-callback has not run yet
+        return await manager._single_flight("k", request)
+
+    assert asyncio.run(scenario()) == 2
+    assert manager._in_flight_requests == {}
+
+
+class FanOutPlugin(DataSourcePlugin):
+    """Plugin using the default batch implementations of DataSourcePlugin."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_name(self):
+        return "FanOutPlugin"
+
+    def get_description(self):
+        return ""
+
+    def get_config_schema(self):
+        return {}
+
+    def initialize(self, config):
+        pass
+
+    async def fetch_technical_indicators(self, ticker, indicator_type, params):
+        return []
+
+    async def fetch_event_data(self, ticker, event_type, start_date, end_date):
+        return []
+
+    async def close(self):
+        pass
+
+    def get_status(self):
+        return {}
+
+    async def fetch_ohlcv_data(self, ticker, start_date, end_date, interval):
+        self.calls.append(ticker)
+        if ticker == "BAD":
+            raise RuntimeError("upstream error")
+        return [{"date": "2024-01-02", "close": 100.0, "volume": 10, "source": "fake"},
+                {"date": "2024-01-03", "close": 102.0, "volume": 20, "source": "fake"}]
+
+
+def test_default_batch_methods_fan_out(manager):
+    plugin = FanOutPlugin()
+    manager.plugins["FanOutPlugin"] = plugin
+    manager.active_plugins["FanOutPlugin"] = True
+
+    history = asyncio.run(manager.fetch_ohlcv_batch("FanOutPlugin", ["AAPL", "BAD", "AAPL"], "2024-01-01", "2024-01-05"))
+    quotes = asyncio.run(manager.fetch_quotes_batch("FanOutPlugin", ["MSFT", "BAD"]))
+
+    assert plugin.calls == ["AAPL", "BAD", "MSFT", "BAD"]
+    assert history["BAD"] == [] and len(history["AAPL"]) == 2
+    assert list(quotes) == ["MSFT"]
+    assert quotes["MSFT"]["price"] == 102.0
+    assert quotes["MSFT"]["change"] == pytest.approx(2.0)
+    assert quotes["MSFT"]["change_percent"] == pytest.approx(2.0)
+
+
+def _fake_request(responses):
+    calls = []
+
+    async def request(endpoint, params=None):
+        calls.append((endpoint, dict(params or {})))
+        return responses(endpoint, params or {})
+
+    return request, calls
+
+
+def test_yahoo_quotes_for_portfolio_in_one_call():
+    plugin = YahooFinancePlugin()
+    tickers = [f"T{i}" for i in range(10)]
+
+    def responses(url, params):
+        symbols = params["symbols"].split(",")
+        return {"quoteResponse": {"result": [
+            {"symbol": symbol, "regularMarketPrice": 10.0 + i, "regularMarketChange": 0.5,
+             "regularMarketChangePercent": 1.2, "regularMarketVolume": 1000, "regularMarketTime": 1700000000}
+            for i, symbol in enumerate(symbols) if symbol != "T3"
+        ]}}
+
+    plugin._rate_limited_request, calls = _fake_request(responses)
+    quotes = asyncio.run(plugin.fetch_quotes_batch(tickers))
+
+    assert len(calls) == 1
+    assert set(quotes) == set(tickers) - {"T3"}
+    assert quotes["T0"]["price"] == 10.0 and quotes["T0"]["source"] == "yahoo_finance"
+
+
+def test_fmp_batches_historical_and_quote_requests():
+    plugin = FinancialModelingPrepPlugin()
+    tickers = ["AAPL", "MSFT", "GOOG", "AMZN", "META", "NVDA", "TSLA"]
+
+    def responses(endpoint, params):
+        symbols = endpoint.rsplit("/", 1)[1].split(",")
+        if "quote" in endpoint:
+            return [{"symbol": symbol, "price": 1.0, "change": 0.1, "changesPercentage": 10.0,
+                     "volume": 5, "timestamp": 1700000000} for symbol in symbols]
+        historical = [{"date": "2024-01-03", "open": 1, "high": 2, "low": 0.5, "close": 1.5, "volume": 7},
+                      {"date": "2024-01-02", "open": 1, "high": 2, "low": 0.5, "close": 1.2, "volume": 7}]
+        stocks = [{"symbol": symbol, "historical": historical} for symbol in symbols]
+        return stocks[0] if len(stocks) == 1 else {"historicalStockList": stocks}
+
+    plugin._rate_limited_request, calls = _fake_request(responses)
+    history = asyncio.run(plugin.fetch_ohlcv_batch(tickers, "2024-01-01", "2024-01-05"))
+    quotes = asyncio.run(plugin.fetch_quotes_batch(tickers))
+
+    assert len(calls) == 3  # two historical chunks of at most five symbols, one quote call
+    assert all([bar["date"] for bar in bars] == ["2024-01-02", "2024-01-03"] for bars in history.values())
+    assert set(history) == set(quotes) == set(tickers)
+
+
+class DelayedPlugin:
+    """Plugin stub answering OHLCV and quote requests after a fixed delay."""
+
+    def __init__(self, name, delay, empty=False):
+        self.name = name
+        self.delay = delay
+        self.empty = empty
+        self.started = 0
+        self.cancelled = 0
+
+    def get_name(self):
+        return self.name
+
+    async def _answer(self, value):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return type(value)() if self.empty else value
+
+    async def fetch_ohlcv_data(self, ticker, start_date, end_date, interval):
+        return await self._answer([{"date": start_date, "close": 1.0, "source": self.name}])
+
+    async def fetch_quotes_batch(self, tickers):
+        return await self._answer({ticker: {"ticker": ticker, "price": 1.0, "source": self.name} for ticker in tickers})
+
+
+def _add_plugins(manager, *plugins):
+    for plugin in plugins:
+        manager.plugins[plugin.name] = plugin
+        manager.active_plugins[plugin.name] = True
+
+
+def test_routed_request_hedges_slow_primary_and_cancels_it(manager):
+    slow, fast = DelayedPlugin("Slow", 1.0), DelayedPlugin("Fast", 0.01)
+    _add_plugins(manager, slow, fast)
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        result = await manager.fetch_data_routed("ohlcv", "AAPL", "2024-01-01", "2024-02-01", plugins=["Slow", "Fast"])
+        elapsed = asyncio.get_running_loop().time() - started
+        await asyncio.sleep(0)  # let the cancellation reach the slow request
+        return result, elapsed
+
+    result, elapsed = asyncio.run(scenario())
+
+    assert result[0]["source"] == "Fast"
+    assert elapsed < 0.9  # hedged after the default delay instead of waiting for the primary
+    assert slow.cancelled == 1
+    assert manager._in_flight_requests == {}
+
+
+def test_empty_result_falls_through_without_waiting(manager):
+    empty, backup = DelayedPlugin("Empty", 0.0, empty=True), DelayedPlugin("Backup", 0.0)
+    _add_plugins(manager, empty, backup)
+
+    quotes = asyncio.run(manager.fetch_quotes_routed(["AAPL", "MSFT"], plugins=["Empty", "Backup"]))
+
+    assert set(quotes) == {"AAPL", "MSFT"} and quotes["AAPL"]["source"] == "Backup"
+    assert manager.latency_stats["Empty"]["quotes"].errors == 1
+
+
+def test_latency_stats_drive_plugin_order(manager):
+    _add_plugins(manager, DelayedPlugin("Primary", 0.03), DelayedPlugin("Secondary", 0.0),
+                 DelayedPlugin("Failing", 0.0, empty=True))
+
+    assert manager.rank_plugins_for("ohlcv", ["Primary", "Secondary", "Failing"]) == ["Primary", "Secondary", "Failing"]
+
+    async def warm_up():
+        for name in ("Primary", "Secondary", "Failing"):
+            for day in range(5):
+                await manager.fetch_data_from_plugin(name, "ohlcv", "AAPL", f"2024-01-0{day + 1}", "2024-02-01")
+
+    asyncio.run(warm_up())
+
+    assert manager.rank_plugins_for("ohlcv", ["Primary", "Secondary", "Failing"]) == ["Secondary", "Primary", "Failing"]
+    assert 0.03 <= manager._hedge_delay("ohlcv", "Primary") <= 2.0
+    latency = manager.get_status()["details"]["latency"]
+    assert latency["Failing"]["ohlcv"]["error_rate"] == 1.0
+    assert latency["Primary"]["ohlcv"]["p99_ms"] >= 30
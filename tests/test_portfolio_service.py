@@ -0,0 +1,119 @@
+"""
+Tests for current prices in the PortfolioService.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from src.plugins.plugin_manager import PluginManager
+from src.services.portfolio_service import PortfolioService
+
+
+class FakeDBAccess:
+    """Database stub returning fixed positions."""
+
+    def __init__(self, positions):
+        self.positions = positions
+
+    async def get_stocks_by_user_id(self, user_id):
+        return [dict(position, user_id=user_id) for position in self.positions]
+
+
+class QuotePlugin:
+    """Plugin stub answering batch quote requests and recording them."""
+
+    def __init__(self, name, prices):
+        self.name = name
+        self.prices = prices
+        self.calls = []
+
+    def get_name(self):
+        return self.name
+
+    async def fetch_quotes_batch(self, tickers):
+        self.calls.append(list(tickers))
+        return {ticker: {"ticker": ticker, "price": self.prices[ticker], "source": self.name}
+                for ticker in tickers if ticker in self.prices}
+
+
+def _positions(*tickers):
+    return [
+        {"id": i, "ticker": ticker, "quantity": 2.0, "average_buy_price": 10.0, "created_at": datetime(2024, 1, 1)}
+        for i, ticker in enumerate(tickers, start=1)
+    ]
+
+
+@pytest.fixture
+def manager():
+    PluginManager._instance = None
+    manager = PluginManager()
+    yield manager
+    PluginManager._instance = None
+
+
+def test_one_batch_call_prices_every_position(manager):
+    plugin = QuotePlugin("Quotes", {"AAPL": 12.0, "MSFT": 8.0, "SAP": 10.0})
+    manager.plugins["Quotes"] = plugin
+    manager.active_plugins["Quotes"] = True
+    service = PortfolioService(FakeDBAccess(_positions("AAPL", "MSFT", "SAP")), plugin_manager=manager,
+                               quote_plugin="Quotes")
+
+    stocks = asyncio.run(service.get_user_stocks(user_id=7))
+
+    assert plugin.calls == [["AAPL", "MSFT", "SAP"]]
+    assert [stock.current_price for stock in stocks] == [12.0, 8.0, 10.0]
+    assert stocks[0].total_value == 24.0 and stocks[0].profit_loss == 4.0
+    assert stocks[1].profit_loss_percentage == pytest.approx(-20.0)
+
+
+def test_positions_without_quote_keep_no_price(manager):
+    manager.plugins["Quotes"] = QuotePlugin("Quotes", {"AAPL": 12.0})
+    manager.active_plugins["Quotes"] = True
+    service = PortfolioService(FakeDBAccess(_positions("AAPL", "XYZ")), plugin_manager=manager,
+                               quote_plugin="Quotes")
+
+    stocks = asyncio.run(service.get_user_stocks(user_id=7))
+
+    assert stocks[0].current_price == 12.0
+    assert stocks[1].current_price is None and stocks[1].total_value is None
+
+
+class SlowQuotePlugin(QuotePlugin):
+    """Quote plugin stub that answers only after a delay."""
+
+    def __init__(self, name, prices, delay):
+        super().__init__(name, prices)
+        self.delay = delay
+
+    async def fetch_quotes_batch(self, tickers):
+        await asyncio.sleep(self.delay)
+        return await super().fetch_quotes_batch(tickers)
+
+
+def test_live_view_is_hedged_across_quote_routing(manager):
+    # Without portfolio.quote_plugin the quotes follow data_sources.routing.quotes
+    prices = {"AAPL": 12.0, "MSFT": 8.0}
+    slow = SlowQuotePlugin("YahooFinancePlugin", prices, delay=1.0)
+    fast = QuotePlugin("FinancialModelingPrepPlugin", prices)
+    for plugin in (slow, fast):
+        manager.plugins[plugin.name] = plugin
+        manager.active_plugins[plugin.name] = True
+    service = PortfolioService(FakeDBAccess(_positions("AAPL", "MSFT")), plugin_manager=manager)
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        stocks = await service.get_user_stocks(user_id=7)
+        return stocks, asyncio.get_running_loop().time() - started
+
+    stocks, elapsed = asyncio.run(scenario())
+
+    assert [stock.current_price for stock in stocks] == [12.0, 8.0]
+    assert fast.calls == [["AAPL", "MSFT"]] and slow.calls == []
+    assert elapsed < 0.9
+
+
+def test_api_portfolio_service_uses_shared_plugin_manager():
+    from src import main_improved
+
+    assert main_improved.portfolio_service.plugin_manager is main_improved.plugin_manager
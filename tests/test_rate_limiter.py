@@ -0,0 +1,73 @@
+"""
+Tests for the async token-bucket rate limiter used by the data source plugins.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from src.plugins.rate_limiter import AsyncRateLimiter, parse_retry_after
+
+
+def _run_requests(limiter, count, latency):
+    """Start `count` concurrent requests; returns (elapsed seconds, peak in-flight count)."""
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(latency)
+
+    async def scenario():
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(count)))
+        return time.perf_counter() - start
+
+    return asyncio.run(scenario()), peak
+
+
+def test_limits_requests_in_flight():
+    elapsed, peak = _run_requests(AsyncRateLimiter(None, max_in_flight=3), count=9, latency=0.05)
+    assert peak == 3
+    assert 0.14 <= elapsed < 0.4
+
+
+def test_spaces_request_starts_to_the_rate():
+    elapsed, _ = _run_requests(AsyncRateLimiter(50, burst=1, max_in_flight=20), count=11, latency=0)
+    # First request uses the initial token, the other ten wait 20 ms each
+    assert 0.18 <= elapsed < 0.5
+
+
+def test_overlapping_requests_reach_the_quota():
+    """With latency 0.1 s, one request at a time every 0.05 s would take about 10 * 0.15 s."""
+    elapsed, peak = _run_requests(AsyncRateLimiter.from_delay(0.05, max_in_flight=4), count=10, latency=0.1)
+    assert peak > 1
+    assert elapsed < 0.9
+
+
+def test_defer_blocks_new_requests():
+    limiter = AsyncRateLimiter(None, max_in_flight=2)
+
+    async def scenario():
+        limiter.defer(0.1)
+        start = time.perf_counter()
+        async with limiter:
+            pass
+        return time.perf_counter() - start
+
+    assert asyncio.run(scenario()) >= 0.09
+    # The limiter can be reused from another event loop
+    assert asyncio.run(scenario()) >= 0.09
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3", default=10) == 3
+    assert parse_retry_after(None, default=10) == 10
+    assert parse_retry_after("soon", default=10) == 10
+    retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(retry_at, default=0) <= 30
+    past = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=30), usegmt=True)
+    assert parse_retry_after(past, default=5) == pytest.approx(0)
@@ -0,0 +1,188 @@
+"""
+Tests for the shared plugin response cache.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from src.plugins.response_cache import ResponseCache, cached_response, request_data_type
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakePlugin:
+    """Minimal plugin with a decorated request method that counts network calls."""
+
+    def __init__(self, cache):
+        self.response_cache = cache
+        self.calls = []
+        self.version = 1
+
+    def get_name(self):
+        return "FakePlugin"
+
+    @cached_response
+    async def _rate_limited_request(self, url, params=None):
+        self.calls.append((url, dict(params or {})))
+        if params is not None:
+            params["apikey"] = "secret"  # plugins add their key inside the request method
+        await asyncio.sleep(0)
+        if url.endswith("/empty"):
+            return {}
+        return {"url": url, "version": self.version}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResponseCache(
+        db_path=str(tmp_path / "cache.db"), memory_entries=2, default_ttl=60,
+        ttls={"events": 10}, stale_seconds=120, clock=clock
+    )
+    yield cache
+    asyncio.run(cache.close())
+
+
+def test_identical_requests_are_served_from_cache(cache):
+    plugin = FakePlugin(cache)
+
+    async def scenario():
+        first = await plugin._rate_limited_request("https://api/chart/AAPL", {"interval": "1d"})
+        second = await plugin._rate_limited_request("https://api/chart/AAPL", {"interval": "1d"})
+        other = await plugin._rate_limited_request("https://api/chart/AAPL", {"interval": "1h"})
+        await plugin._rate_limited_request("https://api/empty")
+        await plugin._rate_limited_request("https://api/empty")
+        return first, second, other
+
+    first, second, other = asyncio.run(scenario())
+
+    assert first == second == {"url": "https://api/chart/AAPL", "version": 1}
+    assert other == first
+    # Only the distinct parameter sets reach the network; empty responses are not cached
+    assert [params for _, params in plugin.calls] == [{"interval": "1d"}, {"interval": "1h"}, {}, {}]
+    assert cache.stats["hits"] == 1
+
+
+def test_expired_response_is_served_stale_and_refreshed(cache, clock):
+    plugin = FakePlugin(cache)
+
+    async def scenario():
+        await plugin._rate_limited_request("https://api/quote", {"symbols": "AAPL"})
+        plugin.version = 2
+        clock.now += 90  # expired, but inside the stale window
+        stale = await plugin._rate_limited_request("https://api/quote", {"symbols": "AAPL"})
+        await asyncio.sleep(0.01)
+        fresh = await plugin._rate_limited_request("https://api/quote", {"symbols": "AAPL"})
+        clock.now += 1000  # beyond the stale window: fetched in the foreground
+        plugin.version = 3
+        expired = await plugin._rate_limited_request("https://api/quote", {"symbols": "AAPL"})
+        return stale, fresh, expired
+
+    stale, fresh, expired = asyncio.run(scenario())
+
+    assert (stale["version"], fresh["version"], expired["version"]) == (1, 2, 3)
+    assert len(plugin.calls) == 3
+    assert cache.stats["stale_hits"] == 1 and cache.stats["revalidations"] == 1
+
+
+def test_ttl_depends_on_data_type(cache, clock):
+    plugin = FakePlugin(cache)
+
+    async def fetch(data_type):
+        token = request_data_type.set(data_type)
+        try:
+            return await plugin._rate_limited_request(f"https://api/{data_type}")
+        finally:
+            request_data_type.reset(token)
+
+    async def scenario():
+        await fetch("events")
+        await fetch("ohlcv")
+        clock.now += 30
+        await fetch("events")  # events expired after 10 s -> stale hit
+        await fetch("ohlcv")  # default TTL of 60 s -> fresh hit
+
+    asyncio.run(scenario())
+
+    assert cache.stats["stale_hits"] == 1 and cache.stats["hits"] == 1
+
+
+def test_responses_survive_restart_via_disk_tier(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    first = ResponseCache(db_path=path, clock=clock)
+    asyncio.run(FakePlugin(first)._rate_limited_request("https://api/chart/MSFT", {"range": "1y"}))
+    asyncio.run(first.close())
+
+    second = ResponseCache(db_path=path, clock=clock)
+    plugin = FakePlugin(second)
+    response = asyncio.run(plugin._rate_limited_request("https://api/chart/MSFT", {"range": "1y"}))
+    asyncio.run(second.close())
+
+    assert response == {"url": "https://api/chart/MSFT", "version": 1}
+    assert plugin.calls == []
+    assert second.stats["disk_hits"] == 1
+
+
+def test_memory_tier_is_bounded(cache):
+    plugin = FakePlugin(cache)
+
+    async def scenario():
+        for symbol in ("A", "B", "C"):
+            await plugin._rate_limited_request(f"https://api/chart/{symbol}")
+        # "A" was evicted from memory and is promoted again from disk
+        await plugin._rate_limited_request("https://api/chart/A")
+
+    asyncio.run(scenario())
+
+    assert len(plugin.calls) == 3
+    assert cache.get_stats()["memory_entries"] == 2
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_plugin_without_cache_calls_through():
+    plugin = FakePlugin(None)
+    asyncio.run(plugin._rate_limited_request("https://api/chart/AAPL"))
+    asyncio.run(plugin._rate_limited_request("https://api/chart/AAPL"))
+    assert len(plugin.calls) == 2
+
+
+def test_disk_tier_runs_off_the_event_loop_in_batches(cache, monkeypatch):
+    writes, threads = [], []
+    write_rows, read_row = cache._write_rows, cache._read_row
+
+    def recording_write(rows):
+        writes.append([row[0] for row in rows])
+        threads.append(threading.current_thread())
+        write_rows(rows)
+
+    def recording_read(key):
+        threads.append(threading.current_thread())
+        return read_row(key)
+
+    monkeypatch.setattr(cache, "_write_rows", recording_write)
+    monkeypatch.setattr(cache, "_read_row", recording_read)
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            cache.set(key, "FakePlugin", "ohlcv", {"key": key})
+        assert cache._conn is None  # nothing written on the event loop
+        await cache.close()
+        cache._memory.clear()
+        return await cache.get("a")
+
+    entry = asyncio.run(scenario())
+
+    assert writes == [["a", "b", "c"]]
+    assert entry[1] == {"key": "a"}
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,88 @@
+"""
+Tests for the technical ScoringEngine.
+"""
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backend_components.scoring_engine import ScoringEngine
+from src.technical_indicators import indicators
+
+
+def _history(days: int, seed: int, with_indicators: bool = False) -> pd.DataFrame:
+    """Synthetic OHLCV history in the layout of the historical_data table."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, days)))
+    frame = pd.DataFrame({
+        "date": pd.bdate_range("2023-01-02", periods=days).strftime("%Y-%m-%d"),
+        "open": close,
+        "high": close * 1.01,
+        "low": close * 0.99,
+        "close": close,
+        "volume": rng.integers(100_000, 1_000_000, days),
+    })
+    if with_indicators:
+        panel = indicators.calculate_all_indicators_panel(
+            frame[["close"]], frame[["high"]].set_axis(["close"], axis=1), frame[["low"]].set_axis(["close"], axis=1)
+        )
+        for column, values in panel.items():
+            frame[column] = values["close"]
+    return frame
+
+
+@pytest.fixture
+def engine():
+    return ScoringEngine()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_stored_indicators_give_same_score(engine, seed):
+    """Stored indicator columns and locally computed ones lead to the same score."""
+    raw = _history(120, seed).to_dict(orient="records")
+    stored_frame = _history(120, seed, with_indicators=True)
+    stored = stored_frame.astype(object).where(stored_frame.notna(), None).to_dict(orient="records")
+
+    raw_score = asyncio.run(engine.calculate_total_score("TEST", raw))
+    stored_score = asyncio.run(engine.calculate_total_score("TEST", stored))
+    assert raw_score == stored_score
+
+
+def test_prepare_indicator_frame_recomputes_gappy_columns(engine):
+    """A stored column with gaps after its first valid value is recomputed."""
+    frame = _history(80, 1, with_indicators=True).set_index("date")
+    expected_rsi = frame["rsi"].copy()
+    frame.loc[frame.index[40], "rsi"] = np.nan
+
+    prepared = engine._prepare_indicator_frame(frame)
+    pd.testing.assert_series_equal(prepared["rsi"], expected_rsi)
+
+
+def test_empty_history_returns_neutral_score(engine):
+    result = asyncio.run(engine.calculate_total_score("TEST", []))
+    assert result["recommendation"] == "HOLD"
+    assert result["total_score"] == 0.0
+
+
+def test_batch_scores_match_single_ticker_scores(engine):
+    """calculate_total_scores gives the same result as calculate_total_score per ticker."""
+    frames = []
+    for i, days in enumerate([5, 25, 45, 120, 200]):
+        frame = _history(days, seed=i, with_indicators=(i % 2 == 0))
+        frame["ticker"] = f"T{i}"
+        frames.append(frame)
+    panel = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0)
+
+    batch = asyncio.run(engine.calculate_total_scores(panel))
+
+    assert set(batch) == {f"T{i}" for i in range(len(frames))}
+    for frame in frames:
+        records = frame.drop(columns="ticker")
+        records = records.astype(object).where(records.notna(), None).to_dict(orient="records")
+        single = asyncio.run(engine.calculate_total_score(frame["ticker"].iloc[0], records))
+        assert batch[frame["ticker"].iloc[0]] == single
+
+
+def test_batch_scores_empty_panel(engine):
+    assert asyncio.run(engine.calculate_total_scores(pd.DataFrame())) == {}
@@ -0,0 +1,161 @@
+"""
+Tests for the compiled sentiment lexicon used by the news and Reddit sentiment plugins.
+"""
+import asyncio
+
+import numpy as np
+
+from src.plugins.data_sources.news_sentiment_plugin import NewsSentimentPlugin
+from src.plugins.data_sources.reddit_sentiment_plugin import RedditSentimentPlugin
+from src.plugins.sentiment_lexicon import (
+    LABELS, KeywordMatcher, SentimentLexicon, SentimentScorer, close_process_pool, count_ticker_mentions,
+    count_universe_mentions
+)
+
+
+def _naive_counts(text, *keyword_lists):
+    text_lower = text.lower()
+    return tuple(sum(1 for keyword in keywords if keyword in text_lower) for keywords in keyword_lists)
+
+
+def test_matcher_finds_keywords_like_substring_search():
+    matcher = KeywordMatcher(["loss", "losses", "up", "upgrade", "fda approval", "sec"])
+
+    assert matcher.find("massive losses before the upgrade") == {"loss", "losses", "up", "upgrade"}
+    assert matcher.find("awaiting fda approval; second quarter") == {"fda approval", "sec"}
+    assert matcher.find("") == set()
+    assert KeywordMatcher([]).find("anything") == set()
+
+
+def test_plugin_scores_match_keyword_scan():
+    news, reddit = NewsSentimentPlugin(), RedditSentimentPlugin()
+    texts = [
+        "Strong earnings beat lifts shares despite lawsuit concerns",
+        "Bearish DD: paper hands sell, massive losses and a crash incoming",
+        "",
+        "Nothing to see here",
+    ]
+
+    news_scores = news.score_sentiment_batch(texts)
+    reddit_scores = reddit.score_sentiment_batch(texts)
+
+    for text, news_score, reddit_score in zip(texts, news_scores, reddit_scores):
+        assert news_score == news._calculate_sentiment_score(text)
+        assert reddit_score == reddit._calculate_basic_sentiment(text)
+        if text:
+            positive, negative, high_impact = _naive_counts(
+                text, news.positive_keywords, news.negative_keywords, news.high_impact_keywords
+            )
+            assert (news_score["positive_count"], news_score["negative_count"], news_score["high_impact_count"]) == (
+                positive, negative, high_impact
+            )
+            assert (reddit_score["positive_count"], reddit_score["negative_count"]) == _naive_counts(
+                text, reddit.positive_keywords, reddit.negative_keywords
+            )
+
+
+def test_lexicon_batch_counts_shape():
+    lexicon = SentimentLexicon(positive=["gain"], negative=["loss"], context=["stock"])
+
+    counts = lexicon.count_batch(["gain and loss of the stock", "", "gain"])
+
+    assert lexicon.group_names == ("positive", "negative", "context")
+    assert counts.tolist() == [[1, 1, 1], [0, 0, 0], [1, 0, 0]]
+    assert lexicon.count_batch([]).shape == (0, 3)
+
+
+def test_ticker_mentions():
+    text = "aapl stock rose while aapl inc and msft shares fell; brk.b flat, aaplx unrelated"
+
+    assert count_ticker_mentions(text, "AAPL") == (2, 2)
+    assert count_ticker_mentions(text, "BRK.B") == (1, 0)
+    assert count_universe_mentions(text, ("AAPL", "MSFT", "BRK.B", "GOOG")) == {
+        "aapl": [2, 2], "msft": [1, 1], "brk.b": [1, 0]
+    }
+
+
+def test_relevance_batch_matches_single_article_scoring():
+    plugin = NewsSentimentPlugin()
+    articles = [
+        {"title": "AAPL beats earnings", "description": "AAPL stock and MSFT shares rally", "content": None},
+        {"title": "Market wrap", "description": "Trading was quiet", "content": "revenue data pending"},
+    ]
+    tickers = ["AAPL", "MSFT", "GOOG"]
+
+    batch = plugin.score_relevance_batch(articles, tickers)
+
+    assert batch == [{ticker: plugin._calculate_relevance_score(article, ticker) for ticker in tickers}
+                     for article in articles]
+    assert batch[0]["AAPL"] > batch[0]["MSFT"] > batch[0]["GOOG"]
+
+
+def _as_dicts(arrays):
+    scores, labels, confidences = arrays
+    return [{"score": score, "label": LABELS[label + 1], "confidence": confidence}
+            for score, label, confidence in zip(scores.tolist(), labels.tolist(), confidences.tolist())]
+
+
+TEXTS = [
+    "Strong earnings beat, FDA approval expected",
+    "Lawsuit and investigation weigh on shares, analysts downgrade",
+    "bullish, diamond hands, to the moon",
+    "",
+    "Quiet day",
+] * 3
+
+
+def test_score_batch_matches_single_text_scores():
+    news, reddit = NewsSentimentPlugin(), RedditSentimentPlugin()
+
+    news_arrays = asyncio.run(news.score_batch(TEXTS))
+    reddit_arrays = asyncio.run(reddit.score_batch(TEXTS))
+
+    assert news_arrays[1].dtype == np.int8
+    for expected, actual in zip([news._calculate_sentiment_score(text) for text in TEXTS], _as_dicts(news_arrays)):
+        assert {key: expected[key] for key in actual} == actual
+    for expected, actual in zip([reddit._calculate_basic_sentiment(text) for text in TEXTS], _as_dicts(reddit_arrays)):
+        assert {key: expected[key] for key in actual} == actual
+
+
+def test_large_batches_are_scored_in_process_pool_chunks():
+    plugin = NewsSentimentPlugin()
+    scorer = SentimentScorer(plugin.positive_keywords, plugin.negative_keywords, plugin.high_impact_keywords,
+                             label_threshold=0.3, impact_multiplier=1.5, workers=1, chunk_size=4, inline_max=0)
+    try:
+        pooled = asyncio.run(scorer.score_batch(TEXTS))
+    finally:
+        close_process_pool()
+
+    inline = scorer.score_arrays(TEXTS)
+    assert all(np.array_equal(a, b) for a, b in zip(pooled, inline))
+    assert len(pooled[0]) == len(TEXTS)
+
+
+def test_fetch_fills_sentiment_from_one_batch():
+    plugin = NewsSentimentPlugin()
+    plugin.min_relevance_score = 0.0
+    articles = [
+        {"datetime": 1704196800, "headline": f"AAPL stock {text}", "summary": text, "source": "wire", "url": ""}
+        for text in TEXTS[:3]
+    ]
+
+    async def request(url, params=None):
+        return articles
+
+    batches = []
+    score_batch = plugin.score_batch
+
+    async def recording_score_batch(texts):
+        batches.append(len(texts))
+        return await score_batch(texts)
+
+    plugin._rate_limited_request = request
+    plugin.score_batch = recording_score_batch
+    records = asyncio.run(plugin._fetch_finnhub_news("AAPL", "2024-01-01", "2024-01-05"))
+
+    assert batches == [3]
+    for article, record in zip(articles, records):
+        expected = plugin._calculate_sentiment_score(f"{article['headline']} {article['summary']}")
+        assert record["close"] == expected["score"]
+        assert record["sentiment_label"] == expected["label"]
+        assert record["sentiment_confidence"] == expected["confidence"]
@@ -0,0 +1,69 @@
+"""
+Tests for the ticker mention extractor used by the Reddit sentiment plugin.
+"""
+import asyncio
+import sqlite3
+
+from src.plugins.data_sources.reddit_sentiment_plugin import RedditSentimentPlugin
+from src.plugins.ticker_extractor import TickerExtractor, load_candidate_symbols, load_symbol_file
+
+
+def test_cashtags_first_and_bare_words_validated_against_universe():
+    extractor = TickerExtractor(["AAPL", "TSLA", "AI", "BRK.B", "GME"])
+
+    mentions = extractor.extract("Holding TSLA and GME, adding $aapl and $AI. Also $BRK.B; the CEO said BUY")
+
+    assert mentions == ["AAPL", "AI", "BRK.B", "TSLA", "GME"]
+
+
+def test_lowercase_words_and_common_words_are_not_tickers():
+    extractor = TickerExtractor()
+
+    assert extractor.extract("it is all good, I think NVDA goes UP and AMD too") == ["NVDA", "AMD"]
+    assert extractor.extract("") == []
+    assert TickerExtractor(["ALL"]).extract("ALL in on $ALL") == ["ALL"]
+    assert TickerExtractor(["ALL"]).extract("ALL in") == []
+
+
+def test_batch_and_added_symbols():
+    extractor = TickerExtractor(["AAPL"])
+    extractor.add_symbols(["msft"])
+
+    assert extractor.extract_batch(["AAPL vs MSFT", "nothing", "$XYZ"]) == [["AAPL", "MSFT"], [], []]
+
+
+def test_universe_loaders(tmp_path):
+    symbol_file = tmp_path / "symbols.csv"
+    symbol_file.write_text("Symbol,Name\n# comment\naapl,Apple\n\nMSFT,Microsoft\n", encoding="utf-8")
+    db_path = tmp_path / "daki.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE candidates (id INTEGER PRIMARY KEY, ticker TEXT NOT NULL UNIQUE)")
+    conn.executemany("INSERT INTO candidates (ticker) VALUES (?)", [("NVDA",), ("AMD",)])
+    conn.commit()
+    conn.close()
+
+    assert load_symbol_file(str(symbol_file)) == ["AAPL", "MSFT"]
+    assert load_symbol_file(str(tmp_path / "missing.txt")) is None
+    assert sorted(load_candidate_symbols(str(db_path))) == ["AMD", "NVDA"]
+    assert load_candidate_symbols(str(tmp_path / "missing.db")) is None
+
+
+def test_search_keeps_posts_mentioning_the_searched_ticker():
+    plugin = RedditSentimentPlugin()
+    plugin.min_post_score = 0
+    plugin._ticker_extractor = TickerExtractor(["AAPL"])
+    posts = [
+        {"id": "1", "title": "$GME to the moon", "selftext": "bullish", "created_utc": 1704196800, "score": 5},
+        {"id": "2", "title": "GME and AAPL", "selftext": "", "created_utc": 1704196800, "score": 5},
+        {"id": "3", "title": "game over", "selftext": "gme", "created_utc": 1704196800, "score": 5},
+    ]
+
+    async def request(endpoint, params=None):
+        return {"data": {"children": [{"data": post} for post in posts]}}
+
+    plugin._rate_limited_request = request
+    records = asyncio.run(plugin._search_subreddit_posts("stocks", "GME", "2024-01-01", "2024-01-05"))
+
+    assert [record["post_id"] for record in records] == ["1", "2"]
+    assert records[1]["mentioned_tickers"] == ["GME", "AAPL"]
+    assert records[0]["sentiment_label"] == "positive"
@@ -0,0 +1,189 @@
+"""
+Tests for the cross-ticker training dataset builder.
+"""
+import asyncio
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from src.backend_components import training_dataset as training_dataset_module
+from src.backend_components.data_preparation import DataPreparation
+from src.backend_components.feature_store import FeatureStore
+from src.backend_components.ml_predictor import MLPredictor
+from src.backend_components.training_dataset import TrainingDataset, TrainingDatasetBuilder
+
+FEATURES = ["open", "close", "volume", "rsi", "close_lag1", "rsi_lag1", "close_rolling_mean5"]
+TICKERS = ["AAPL", "MSFT", "SAP"]
+
+
+def _create_db(path, days=80):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE candidates (id INTEGER PRIMARY KEY, ticker TEXT NOT NULL UNIQUE);
+        CREATE TABLE historical_data (id INTEGER PRIMARY KEY, candidate_id INTEGER NOT NULL, date TEXT NOT NULL,
+                                      open REAL, close REAL, volume INTEGER, rsi REAL);
+    """)
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2023-01-02", periods=days).strftime("%Y-%m-%d")
+    for candidate_id, ticker in enumerate(TICKERS, start=1):
+        conn.execute("INSERT INTO candidates (id, ticker) VALUES (?, ?)", (candidate_id, ticker))
+        close = 50 * candidate_id + np.cumsum(rng.normal(0, 1, days))
+        conn.executemany(
+            "INSERT INTO historical_data (candidate_id, date, open, close, volume, rsi) VALUES (?, ?, ?, ?, ?, ?)",
+            [(candidate_id, date, float(c) - 0.2, float(c), 1000 + i, 40.0 + i % 20) for i, (date, c) in enumerate(zip(dates, close))]
+        )
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def _builder(db_path, workers=0):
+    return TrainingDatasetBuilder(db_path, feature_names=FEATURES, forecast_period=5, workers=workers,
+                                  tickers_per_task=2, use_feature_store=False)
+
+
+def test_dataset_matches_per_ticker_preparation(tmp_path):
+    db_path = _create_db(tmp_path / "daki.db")
+
+    dataset = asyncio.run(_builder(db_path).build())
+
+    assert dataset.X.dtype == np.float32 and dataset.X.shape[1] == len(FEATURES)
+    assert list(dict.fromkeys(dataset.tickers)) == TICKERS
+    conn = sqlite3.connect(db_path)
+    for ticker in TICKERS:
+        raw = pd.read_sql_query(
+            "SELECT hd.date, hd.open, hd.close, hd.volume, hd.rsi FROM historical_data hd "
+            "JOIN candidates c ON hd.candidate_id = c.id WHERE c.ticker = ?", conn, params=(ticker,)
+        )
+        expected = asyncio.run(DataPreparation().prepare_data_for_ml(ticker, raw, forecast_period=5))
+        rows = dataset.tickers == ticker
+        np.testing.assert_allclose(dataset.X[rows], expected[FEATURES].to_numpy(dtype=np.float32))
+        np.testing.assert_allclose(dataset.y[rows], expected["target"].to_numpy(dtype=np.float32))
+    conn.close()
+
+
+def test_process_pool_build_matches_inline_build(tmp_path):
+    db_path = _create_db(tmp_path / "daki.db")
+
+    inline = asyncio.run(_builder(db_path).build(["SAP", "AAPL"]))
+    pooled = asyncio.run(_builder(db_path, workers=2).build(["SAP", "AAPL"]))
+
+    np.testing.assert_array_equal(inline.X, pooled.X)
+    np.testing.assert_array_equal(inline.dates, pooled.dates)
+    assert list(pooled.tickers[:1]) == ["SAP"]
+
+
+def test_build_holds_at_most_workers_blocks(tmp_path):
+    db_path = _create_db(tmp_path / "daki.db")
+    inline = _builder(db_path)
+    pooled = _builder(db_path, workers=2)
+    inline.tickers_per_task = pooled.tickers_per_task = 1
+
+    expected = asyncio.run(inline.build())
+    dataset = asyncio.run(pooled.build())
+
+    assert inline.peak_pending_blocks == 1
+    assert pooled.peak_pending_blocks == 2  # three blocks, never more than two in flight
+    assert list(dict.fromkeys(dataset.tickers)) == TICKERS
+    np.testing.assert_array_equal(dataset.X, expected.X)
+    np.testing.assert_array_equal(dataset.y, expected.y)
+    assert dataset.X.flags.owndata and len(dataset.X) < 3 * 80  # trimmed to the prepared rows
+
+
+def test_feature_store_history_beyond_the_database_is_ignored(tmp_path, monkeypatch):
+    db_path = _create_db(tmp_path / "daki.db", days=60)
+    store = FeatureStore(str(tmp_path / "store"))
+    # The store already holds a longer history than the database (e.g. from an earlier, larger import)
+    dates = pd.bdate_range("2022-06-01", periods=200)
+    long_history = pd.DataFrame(
+        {"open": np.arange(200.0), "close": np.arange(200.0) + 1, "volume": 1000.0, "rsi": 50.0},
+        index=pd.DatetimeIndex(dates, name="date")
+    )
+    for ticker in TICKERS:
+        store.update(ticker, long_history)
+    monkeypatch.setattr(training_dataset_module, "_worker_preparations", {True: DataPreparation(feature_store=store)})
+    builder = TrainingDatasetBuilder(db_path, feature_names=FEATURES, forecast_period=5, workers=0,
+                                     tickers_per_task=2, use_feature_store=True)
+
+    dataset = asyncio.run(builder.build())
+
+    assert dataset.dates.min() >= np.datetime64("2023-01-02")
+    assert len(dataset) <= 3 * 60
+
+
+def test_rows_added_after_counting_grow_the_matrix(tmp_path, monkeypatch):
+    db_path = _create_db(tmp_path / "daki.db")
+    expected = asyncio.run(_builder(db_path).build())
+    builder = _builder(db_path)
+    monkeypatch.setattr(builder, "_count_rows", lambda tickers: 10)  # rows written by ingestion during the build
+
+    dataset = asyncio.run(builder.build())
+
+    np.testing.assert_array_equal(dataset.X, expected.X)
+    np.testing.assert_array_equal(dataset.tickers, expected.tickers)
+
+
+def test_time_split_keeps_a_gap_before_validation():
+    dates = np.tile(pd.bdate_range("2024-01-01", periods=10).values, 2)
+    dataset = TrainingDataset(np.zeros((20, 1), dtype=np.float32), np.zeros(20, dtype=np.float32), dates,
+                              np.repeat(["A", "B"], 10).astype(object), ["x"])
+
+    train, validation = dataset.time_split(validation_fraction=0.3, gap=2)
+
+    assert validation.sum() == 6 and train.sum() == 10
+    assert dates[train].max() < dates[validation].min()
+    assert len(np.unique(dates[~train & ~validation])) == 2
+
+
+def test_train_from_database(tmp_path):
+    db_path = _create_db(tmp_path / "daki.db")
+    predictor = MLPredictor(model_path=str(tmp_path / "model.ubj"))
+
+    asyncio.run(predictor.train_from_database(dataset_builder=_builder(db_path)))
+
+    assert predictor.model is not None
+    assert (tmp_path / "model.ubj").exists() and (tmp_path / "model.schema.json").exists()
+
+
+def _append_days(db_path, days):
+    conn = sqlite3.connect(db_path)
+    for candidate_id in range(1, len(TICKERS) + 1):
+        last_date, last_close = conn.execute(
+            "SELECT date, close FROM historical_data WHERE candidate_id = ? ORDER BY date DESC LIMIT 1", (candidate_id,)
+        ).fetchone()
+        dates = pd.bdate_range(pd.Timestamp(last_date) + pd.offsets.BDay(), periods=days).strftime("%Y-%m-%d")
+        conn.executemany(
+            "INSERT INTO historical_data (candidate_id, date, open, close, volume, rsi) VALUES (?, ?, ?, ?, ?, ?)",
+            [(candidate_id, date, last_close + i, last_close + i, 1000, 50.0) for i, date in enumerate(dates)]
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_retraining_continues_the_previous_booster(tmp_path):
+    db_path = _create_db(tmp_path / "daki.db")
+    model_path = str(tmp_path / "model.ubj")
+    first = MLPredictor(model_path=model_path)
+    asyncio.run(first.train_from_database(dataset_builder=_builder(db_path)))
+    first_rounds = first.last_training["total_rounds"]
+
+    assert first.last_training["mode"] == "full"
+    assert first_rounds < 1000  # early stopping on the validation days
+
+    # No new dates: nothing to train
+    unchanged = MLPredictor(model_path=model_path)
+    asyncio.run(unchanged.train_from_database(dataset_builder=_builder(db_path)))
+    assert unchanged.last_training is None
+
+    _append_days(db_path, 10)
+    retrained = MLPredictor(model_path=model_path)
+    asyncio.run(retrained.train_from_database(dataset_builder=_builder(db_path)))
+
+    assert retrained.last_training["mode"] == "incremental"
+    assert first_rounds <= retrained.last_training["total_rounds"] <= first_rounds + 50
+    assert retrained.schema["data_end_date"] > first.schema["data_end_date"]
+
+    full = MLPredictor(model_path=model_path)
+    asyncio.run(full.train_from_database(dataset_builder=_builder(db_path), incremental=False))
+    assert full.last_training["mode"] == "full"